@@ -0,0 +1,115 @@
+"""
+Benchmark: dataset comparison.
+
+WHAT: Times /datasets/compare/ work (compare_datasets) for two synthetic
+      datasets, split into loading records and the merge itself.
+WHY: Comparisons should stay interactive for 100k-record datasets.
+HOW: Build a throwaway SQLite database with two overlapping datasets
+     (1% of equipment added/removed), then time load_records_frame and
+     the full comparison.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_compare
+    python -m benchmarks.bench_compare --rows 10000 100000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_ROWS = [10_000, 100_000]
+EQUIPMENT_TYPES = ['Reactor', 'Pump', 'Heat Exchanger', 'Compressor', 'Valve', 'Condenser']
+
+
+def setup_django(work_dir):
+    """Point Django at a scratch database, then set it up"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = os.path.join(work_dir, 'bench.sqlite3')
+    settings.DEBUG = False  # DEBUG keeps every query in memory
+
+    import django
+    django.setup()
+
+
+def create_dataset(user, rows, offset, seed):
+    """Create a ready dataset named Unit-<offset> .. Unit-<offset + rows - 1>"""
+    from equipment.models import Dataset, EquipmentData
+
+    rng = np.random.default_rng(seed)
+    types = rng.choice(EQUIPMENT_TYPES, size=rows)
+    dataset = Dataset.objects.create(
+        user=user,
+        total_equipment=rows,
+        equipment_types=json.dumps({name: int((types == name).sum()) for name in EQUIPMENT_TYPES})
+    )
+    EquipmentData.objects.bulk_create(
+        (
+            EquipmentData(
+                dataset=dataset,
+                equipment_name=f'Unit-{offset + i}',
+                equipment_type=eq_type,
+                flowrate=flowrate,
+                pressure=pressure,
+                temperature=temperature
+            )
+            for i, (eq_type, flowrate, pressure, temperature) in enumerate(zip(
+                types.tolist(),
+                rng.uniform(50, 300, rows).tolist(),
+                rng.uniform(0.5, 10, rows).tolist(),
+                rng.uniform(20, 400, rows).tolist()
+            ))
+        ),
+        batch_size=2000
+    )
+    return dataset
+
+
+def best_of(repeat, func):
+    """Return the fastest of `repeat` calls, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS,
+                        help='Records per dataset (default: 10k 100k)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs per measurement; the fastest is reported')
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} | {'load both':>10} | {'compare':>10} | {'matched':>8}")
+    print('-' * 46)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        setup_django(work_dir)
+        from django.contrib.auth.models import User
+        from django.core.management import call_command
+        from equipment.compare import compare_datasets, load_records_frame
+        call_command('migrate', verbosity=0)
+        user = User.objects.create_user(username='bench')
+
+        for rows in args.rows:
+            base = create_dataset(user, rows, offset=0, seed=1)
+            target = create_dataset(user, rows, offset=rows // 100, seed=2)
+
+            load = best_of(args.repeat, lambda: (load_records_frame(base), load_records_frame(target)))
+            compare = best_of(args.repeat, lambda: compare_datasets(base, target))
+            matched = compare_datasets(base, target)['summary']['matched']
+            print(f'{rows:>8} | {load:>9.3f}s | {compare:>9.3f}s | {matched:>8}')
+
+
+if __name__ == '__main__':
+    main()
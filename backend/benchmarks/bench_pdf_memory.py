@@ -0,0 +1,199 @@
+"""
+Benchmark: peak memory per PDF report.
+
+WHAT: Compares peak RSS of the old BytesIO report path with the spooled
+      temporary file path and with serving a cached report.
+WHY: The old path kept three copies of the document in memory (the BytesIO
+     buffer, getvalue() and the HttpResponse body), which adds up for
+     full-detail reports.
+HOW: Build a throwaway SQLite database with one synthetic dataset, then run
+     each mode in a fresh subprocess so peak RSS is not shared between modes.
+     Each worker resets its high-water mark (or falls back to ru_maxrss)
+     right before rendering and reports the increase.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_pdf_memory
+    python -m benchmarks.bench_pdf_memory --rows 500 5000
+"""
+
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+DEFAULT_ROWS = [1_000, 10_000]
+MODES = ['legacy', 'spooled', 'cached']
+EQUIPMENT_TYPES = ['Reactor', 'Pump', 'Heat Exchanger', 'Compressor', 'Valve', 'Condenser']
+
+
+def setup_django(work_dir):
+    """Point Django at a scratch database and media folder, then set it up"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = os.path.join(work_dir, 'bench.sqlite3')
+    settings.MEDIA_ROOT = os.path.join(work_dir, 'media')
+    settings.DEBUG = False  # DEBUG keeps every query in memory
+
+    import django
+    django.setup()
+
+
+def create_dataset(rows):
+    """Create a user and a ready dataset with `rows` synthetic records"""
+    import random
+    from django.contrib.auth.models import User
+    from equipment.models import Dataset, EquipmentData
+
+    user, _ = User.objects.get_or_create(username='bench')
+    dataset = Dataset.objects.create(
+        user=user,
+        total_equipment=rows,
+        equipment_types=json.dumps({name: rows // len(EQUIPMENT_TYPES) for name in EQUIPMENT_TYPES})
+    )
+    rng = random.Random(42)
+    EquipmentData.objects.bulk_create(
+        (
+            EquipmentData(
+                dataset=dataset,
+                equipment_name=f'Unit-{i}',
+                equipment_type=rng.choice(EQUIPMENT_TYPES),
+                flowrate=rng.uniform(50, 300),
+                pressure=rng.uniform(0.5, 10),
+                temperature=rng.uniform(20, 400)
+            )
+            for i in range(rows)
+        ),
+        batch_size=2000
+    )
+    return dataset
+
+
+def read_status_kb(field):
+    """Read a VmRSS/VmHWM value (in KB) from /proc/self/status"""
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def reset_peak_rss():
+    """Reset the kernel's peak RSS counter; return False if unsupported"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def render(mode, dataset):
+    """Produce one report download in the given mode; return bytes sent"""
+    from django.http import HttpResponse
+    from django.test import override_settings
+    from equipment.pdf_generator import build_pdf_report, generate_pdf_report
+
+    if mode == 'legacy':
+        # The original implementation: buffer, copy out, copy into response
+        buffer = io.BytesIO()
+        build_pdf_report(dataset, buffer)
+        pdf = buffer.getvalue()
+        buffer.close()
+        response = HttpResponse(content_type='application/pdf')
+        response.write(pdf)
+        return len(response.content)
+
+    with override_settings(PDF_CACHE_ENABLED=(mode == 'cached')):
+        response = generate_pdf_report(dataset)
+    sent = sum(len(chunk) for chunk in response.streaming_content)
+    response.close()
+    return sent
+
+
+def run_worker(args):
+    """Subprocess entry point: measure one mode and print JSON"""
+    setup_django(args.work_dir)
+    from django.test import override_settings
+    from equipment.models import Dataset
+
+    override_settings(PDF_DETAIL_ROWS=0).enable()
+    dataset = Dataset.objects.select_related('user').get(pk=args.dataset_id)
+
+    baseline_kb = read_status_kb('VmRSS')
+    exact = reset_peak_rss()
+    if not exact:
+        baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    size = render(args.worker, dataset)
+    seconds = time.perf_counter() - start
+
+    peak_kb = read_status_kb('VmHWM') if exact else resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        'bytes': size,
+        'seconds': seconds,
+        'peak_delta_kb': max(peak_kb - baseline_kb, 0),
+        'exact': exact,
+    }))
+
+
+def measure(mode, work_dir, dataset_id):
+    """Run one mode in a fresh interpreter and return its JSON result"""
+    output = subprocess.check_output(
+        [sys.executable, '-m', 'benchmarks.bench_pdf_memory', '--worker', mode,
+         '--work-dir', work_dir, '--dataset-id', str(dataset_id)],
+        cwd=BACKEND_DIR
+    )
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS,
+                        help='Records per report (default: 1k 10k)')
+    parser.add_argument('--worker', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--work-dir', help=argparse.SUPPRESS)
+    parser.add_argument('--dataset-id', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    print(f"{'rows':>8} | {'mode':>8} | {'pdf size':>10} | {'peak RSS +':>11} | {'seconds':>8}")
+    print('-' * 58)
+
+    approximate = False
+    with tempfile.TemporaryDirectory() as work_dir:
+        setup_django(work_dir)
+        from django.core.management import call_command
+        from django.test import override_settings
+        from equipment.pdf_generator import get_or_create_pdf_report
+        call_command('migrate', verbosity=0)
+
+        for rows in args.rows:
+            dataset = create_dataset(rows)
+            with override_settings(PDF_DETAIL_ROWS=0):
+                get_or_create_pdf_report(dataset)  # warm the cache for 'cached'
+
+            for mode in MODES:
+                result = measure(mode, work_dir, dataset.id)
+                marker = '' if result['exact'] else ' *'
+                approximate = approximate or not result['exact']
+                print(f"{rows:>8} | {mode:>8} | {result['bytes'] / 1024:>7,.0f} KB | "
+                      f"{result['peak_delta_kb'] / 1024:>8,.1f} MB | {result['seconds']:>8.2f}{marker}")
+
+    if approximate:
+        print('\n* peak measured with ru_maxrss (VmHWM reset unavailable), includes startup')
+
+
+if __name__ == '__main__':
+    main()
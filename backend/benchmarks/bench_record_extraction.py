@@ -0,0 +1,107 @@
+"""
+Benchmark: equipment record extraction.
+
+WHAT: Compares the old df.iterrows() loop with extract_equipment_records().
+WHY: Record extraction used to dominate upload time on large CSVs.
+HOW: Generate synthetic CSVs, clean them like process_csv_file does, then
+     time both extraction paths and report rows/sec.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_record_extraction
+    python -m benchmarks.bench_record_extraction --sizes 10000 100000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from equipment.utils import extract_equipment_records  # noqa: E402
+
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+EQUIPMENT_TYPES = ['Reactor', 'Pump', 'Heat Exchanger', 'Compressor', 'Valve', 'Condenser']
+
+
+def write_synthetic_csv(path, rows, seed=42):
+    """Write a CSV with the required columns and `rows` random records"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Equipment Name': [f'Unit-{i}' for i in range(rows)],
+        'Type': rng.choice(EQUIPMENT_TYPES, size=rows),
+        'Flowrate': rng.uniform(50, 300, size=rows).round(2),
+        'Pressure': rng.uniform(0.5, 10, size=rows).round(2),
+        'Temperature': rng.uniform(20, 400, size=rows).round(2),
+    })
+    df.to_csv(path, index=False)
+
+
+def load_clean_frame(path):
+    """Read and clean a CSV the same way process_csv_file does"""
+    df = pd.read_csv(path)
+    df = df.dropna(subset=['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature'])
+    for col in ['Flowrate', 'Pressure', 'Temperature']:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df.dropna(subset=['Flowrate', 'Pressure', 'Temperature'])
+
+
+def extract_with_iterrows(df):
+    """The original per-row implementation (baseline)"""
+    records = []
+    for _, row in df.iterrows():
+        records.append({
+            'equipment_name': str(row['Equipment Name']),
+            'equipment_type': str(row['Type']),
+            'flowrate': float(row['Flowrate']),
+            'pressure': float(row['Pressure']),
+            'temperature': float(row['Temperature'])
+        })
+    return records
+
+
+def time_call(func, df):
+    """Return (seconds, result) for a single call"""
+    start = time.perf_counter()
+    result = func(df)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Row counts to benchmark (default: 10k 100k 1M)')
+    parser.add_argument('--skip-baseline', action='store_true',
+                        help='Only time the columnar path (iterrows is slow at 1M rows)')
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} | {'iterrows rows/s':>16} | {'columnar rows/s':>16} | {'speedup':>8}")
+    print('-' * 60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in args.sizes:
+            path = os.path.join(tmp_dir, f'synthetic_{rows}.csv')
+            write_synthetic_csv(path, rows)
+            df = load_clean_frame(path)
+
+            new_seconds, new_records = time_call(extract_equipment_records, df)
+            new_rate = rows / new_seconds
+
+            if args.skip_baseline:
+                print(f'{rows:>10} | {"-":>16} | {new_rate:>16,.0f} | {"-":>8}')
+                continue
+
+            old_seconds, old_records = time_call(extract_with_iterrows, df)
+            old_rate = rows / old_seconds
+            assert old_records == new_records, 'Columnar output differs from iterrows output'
+
+            print(f'{rows:>10} | {old_rate:>16,.0f} | {new_rate:>16,.0f} | {old_seconds / new_seconds:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""
+Benchmark: concurrent uploads and summary reads on SQLite.
+
+WHAT: Throughput and p50/p99 latency of summary reads while CSV uploads
+      run at the same time, with SQLite's defaults and with the tuning
+      profile (WAL, synchronous=NORMAL, cache/mmap, busy_timeout, reused
+      connections).
+WHY: In rollback-journal mode an upload holding the write lock stalls every
+     reader, and each request pays for a new connection.
+HOW: Each profile runs in a fresh subprocess (the settings are read at
+     startup) against its own scratch database. The worker serves the
+     real WSGI app from a threaded HTTP server, then uploader threads POST
+     synthetic CSVs and reader threads GET one dataset's summary for a
+     fixed duration. The summary cache is disabled so every read hits
+     the database.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_sqlite_concurrency
+    python -m benchmarks.bench_sqlite_concurrency --duration 20 --readers 8 --uploaders 2
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Environment for each profile
+PROFILES = {
+    'default': {'SQLITE_TUNING': 'False', 'CONN_MAX_AGE': '0'},
+    'tuned': {'SQLITE_TUNING': 'True', 'CONN_MAX_AGE': '60'},
+}
+EQUIPMENT_TYPES = ['Reactor', 'Pump', 'Heat Exchanger', 'Compressor', 'Valve', 'Condenser']
+
+
+def setup_django(work_dir):
+    """Point Django at a scratch database and media folder, then set it up"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = os.path.join(work_dir, 'bench.sqlite3')
+    settings.MEDIA_ROOT = os.path.join(work_dir, 'media')
+    settings.DEBUG = False  # DEBUG keeps every query in memory
+    settings.UPLOAD_ASYNC = False  # uploads write inside the request
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+    import django
+    django.setup()
+
+
+def make_csv(rows, seed):
+    """Synthetic CSV upload body"""
+    rng = random.Random(seed)
+    lines = ['Equipment Name,Type,Flowrate,Pressure,Temperature']
+    for i in range(rows):
+        lines.append(
+            f'Unit-{i},{rng.choice(EQUIPMENT_TYPES)},{rng.uniform(50, 300):.2f},'
+            f'{rng.uniform(0.5, 10):.2f},{rng.uniform(20, 400):.1f}'
+        )
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def start_server():
+    """Serve the WSGI app from a threaded HTTP server on a free port"""
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+    from django.core.wsgi import get_wsgi_application
+
+    class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    server = make_server('127.0.0.1', 0, get_wsgi_application(),
+                         server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_worker(args):
+    """Subprocess entry point: run one profile and print JSON"""
+    import requests
+
+    setup_django(args.work_dir)
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from rest_framework.authtoken.models import Token
+    call_command('migrate', verbosity=0)
+
+    tokens = {}
+    for name in ('reader', 'uploader'):
+        user = User.objects.create_user(username=name)
+        tokens[name] = Token.objects.create(user=user).key
+
+    server = start_server()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}/api'
+
+    def upload(session, body, token):
+        response = session.post(
+            f'{base_url}/upload-csv/',
+            files={'file': ('bench.csv', io.BytesIO(body), 'text/csv')},
+            headers={'Authorization': f'Token {token}'}
+        )
+        response.raise_for_status()
+        return response
+
+    # The dataset every reader fetches
+    with requests.Session() as session:
+        dataset_id = upload(session, make_csv(args.read_rows, seed=0), tokens['reader']).json()['id']
+
+    results = {'read': [], 'upload': []}
+    errors = {'read': 0, 'upload': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def reader():
+        with requests.Session() as session:
+            session.headers['Authorization'] = f"Token {tokens['reader']}"
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                ok = session.get(f'{base_url}/datasets/{dataset_id}/summary/').status_code == 200
+                with lock:
+                    if ok:
+                        results['read'].append(time.perf_counter() - start)
+                    else:
+                        errors['read'] += 1
+
+    def uploader(seed):
+        body = make_csv(args.upload_rows, seed)
+        with requests.Session() as session:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    upload(session, body, tokens['uploader'])
+                    ok = True
+                except requests.RequestException:
+                    ok = False
+                with lock:
+                    if ok:
+                        results['upload'].append(time.perf_counter() - start)
+                    else:
+                        errors['upload'] += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=uploader, args=(seed,)) for seed in range(1, args.uploaders + 1)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    print(json.dumps({
+        kind: {
+            'count': len(latencies),
+            'per_second': len(latencies) / elapsed,
+            'p50_ms': percentile(latencies, 0.50) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+            'errors': errors[kind],
+        }
+        for kind, latencies in results.items()
+    }))
+
+
+def measure(profile, args, work_dir):
+    """Run one profile in a fresh interpreter and return its JSON result"""
+    profile_dir = os.path.join(work_dir, profile)
+    os.makedirs(profile_dir)
+    output = subprocess.check_output(
+        [sys.executable, '-m', 'benchmarks.bench_sqlite_concurrency', '--worker', profile,
+         '--work-dir', profile_dir, '--duration', str(args.duration),
+         '--readers', str(args.readers), '--uploaders', str(args.uploaders),
+         '--read-rows', str(args.read_rows), '--upload-rows', str(args.upload_rows)],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **PROFILES[profile]}
+    )
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--duration', type=float, default=10,
+                        help='Seconds of load per profile (default: 10)')
+    parser.add_argument('--readers', type=int, default=4,
+                        help='Concurrent summary readers (default: 4)')
+    parser.add_argument('--uploaders', type=int, default=1,
+                        help='Concurrent uploaders (default: 1)')
+    parser.add_argument('--read-rows', type=int, default=500,
+                        help='Records in the dataset being read (default: 500)')
+    parser.add_argument('--upload-rows', type=int, default=20_000,
+                        help='Records per uploaded CSV (default: 20k)')
+    parser.add_argument('--worker', choices=PROFILES, help=argparse.SUPPRESS)
+    parser.add_argument('--work-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    print(f"{'profile':>8} | {'kind':>6} | {'req/s':>7} | {'p50':>9} | {'p99':>9} | {'errors':>6}")
+    print('-' * 60)
+    with tempfile.TemporaryDirectory() as work_dir:
+        for profile in PROFILES:
+            result = measure(profile, args, work_dir)
+            for kind in ('read', 'upload'):
+                row = result[kind]
+                print(f"{profile:>8} | {kind:>6} | {row['per_second']:>7.2f} | "
+                      f"{row['p50_ms']:>7.1f}ms | {row['p99_ms']:>7.1f}ms | {row['errors']:>6}")
+
+
+if __name__ == '__main__':
+    main()
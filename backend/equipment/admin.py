@@ -7,16 +7,18 @@ HOW: We use @admin.register decorator to register models.
 """
 
 from django.contrib import admin
-from .models import Dataset, EquipmentData
+from .models import (
+    Dataset, DatasetColumnStats, EquipmentData, RetentionPolicy, UploadJob, UploadSession
+)
 
 
 @admin.register(Dataset)
 class DatasetAdmin(admin.ModelAdmin):
     """Admin interface for Dataset model"""
-    list_display = ['id', 'user', 'uploaded_at', 'total_equipment', 'avg_flowrate', 'avg_pressure', 'avg_temperature']
-    list_filter = ['uploaded_at', 'user']
-    search_fields = ['user__username']
-    readonly_fields = ['uploaded_at']
+    list_display = ['id', 'user', 'uploaded_at', 'status', 'total_equipment', 'avg_flowrate', 'avg_pressure', 'avg_temperature']
+    list_filter = ['uploaded_at', 'status', 'user']
+    search_fields = ['user__username', 'content_hash']
+    readonly_fields = ['uploaded_at', 'content_hash']
     
     def has_add_permission(self, request):
         """Disable manual addition through admin"""
@@ -33,3 +35,47 @@ class EquipmentDataAdmin(admin.ModelAdmin):
     def has_add_permission(self, request):
         """Disable manual addition through admin"""
         return False
+
+
+@admin.register(DatasetColumnStats)
+class DatasetColumnStatsAdmin(admin.ModelAdmin):
+    """Admin interface for DatasetColumnStats model"""
+    list_display = ['dataset', 'equipment_type', 'column', 'count', 'min', 'max', 'mean', 'p50']
+    list_filter = ['column']
+    exclude = ['sketch']
+    
+    def has_add_permission(self, request):
+        """Disable manual addition through admin"""
+        return False
+
+
+@admin.register(UploadJob)
+class UploadJobAdmin(admin.ModelAdmin):
+    """Admin interface for UploadJob model"""
+    list_display = ['id', 'user', 'dataset', 'phase', 'rows_processed', 'progress', 'created_at', 'finished_at']
+    list_filter = ['phase', 'user']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
+    
+    def has_add_permission(self, request):
+        """Disable manual addition through admin"""
+        return False
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    """Admin interface for UploadSession model"""
+    list_display = ['id', 'user', 'file_name', 'received_bytes', 'total_size', 'status', 'updated_at']
+    list_filter = ['status', 'user']
+    readonly_fields = ['created_at', 'updated_at']
+    
+    def has_add_permission(self, request):
+        """Disable manual addition through admin"""
+        return False
+
+
+@admin.register(RetentionPolicy)
+class RetentionPolicyAdmin(admin.ModelAdmin):
+    """Admin interface for RetentionPolicy model"""
+    list_display = ['user', 'keep_datasets', 'updated_at']
+    search_fields = ['user__username']
+    readonly_fields = ['updated_at']
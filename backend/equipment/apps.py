@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class EquipmentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'equipment'
+    
+    def ready(self):
+        from .database import configure_sqlite_connection
+        connection_created.connect(configure_sqlite_connection, dispatch_uid='equipment-sqlite-tuning')
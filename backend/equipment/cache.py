@@ -0,0 +1,115 @@
+"""
+Dataset Summary Cache.
+
+WHAT: Caches the JSON body of dataset summaries.
+WHY: Datasets never change after upload, but the dashboard and desktop app
+     request the same summary over and over, and each request re-serializes
+     every record and rebuilds the chart data.
+HOW: Store the serialized summary in Django's cache framework, keyed by
+     dataset id, a content version and the response variant. Entries are
+     removed when a dataset is deleted. Hit/miss counters are kept in the
+     same cache.
+"""
+
+from typing import Dict, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Dataset
+from .serializers import DatasetSerializer, DatasetSummarySerializer
+from .utils import get_equipment_type_chart_data
+
+HITS_KEY = 'summary-cache:hits'
+MISSES_KEY = 'summary-cache:misses'
+
+# Response variants cached separately (with and without equipment_records)
+VARIANTS = ('full', 'no-records')
+
+
+def content_version(dataset: Dataset) -> str:
+    """
+    Version string for a dataset's contents.
+    
+    Uploaded datasets are immutable, so the upload timestamp identifies the
+    contents. If a dataset id is ever reused the version changes with it.
+    """
+    return str(int(dataset.uploaded_at.timestamp() * 1_000_000))
+
+
+def summary_cache_key(dataset: Dataset, variant: str) -> str:
+    """Cache key for one variant of a dataset summary"""
+    return f'dataset-summary:{dataset.id}:{content_version(dataset)}:{variant}'
+
+
+def _count(key: str) -> None:
+    """Increment a hit/miss counter, creating it if needed"""
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Counter was evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def build_dataset_summary(dataset: Dataset, include_records: bool = True) -> Dict:
+    """Serialize a dataset summary (without using the cache)"""
+    serializer_class = DatasetSerializer if include_records else DatasetSummarySerializer
+    data = dict(serializer_class(dataset).data)
+    data['chart_data'] = get_equipment_type_chart_data(dataset.equipment_types)
+    return data
+
+
+def get_dataset_summary(dataset: Dataset, include_records: bool = True) -> Tuple[Dict, bool]:
+    """
+    Return a dataset summary, from the cache when possible.
+    
+    Only finished datasets are cached; datasets still being processed are
+    always serialized fresh.
+    
+    Args:
+        dataset: Dataset to summarize
+        include_records: Include the nested equipment_records list
+    
+    Returns:
+        Tuple of (summary_dict, cache_hit)
+    
+    Example:
+        data, hit = get_dataset_summary(dataset, include_records=False)
+    """
+    if dataset.status != Dataset.STATUS_READY:
+        return build_dataset_summary(dataset, include_records), False
+    
+    key = summary_cache_key(dataset, 'full' if include_records else 'no-records')
+    data = cache.get(key)
+    if data is not None:
+        _count(HITS_KEY)
+        return data, True
+    
+    _count(MISSES_KEY)
+    data = build_dataset_summary(dataset, include_records)
+    cache.set(key, data, timeout=settings.SUMMARY_CACHE_TIMEOUT)
+    return data, False
+
+
+def invalidate_dataset_summary(dataset: Dataset) -> None:
+    """Remove every cached summary variant for a dataset"""
+    cache.delete_many([summary_cache_key(dataset, variant) for variant in VARIANTS])
+
+
+def get_summary_cache_stats() -> Dict:
+    """
+    Return summary cache hit/miss counters.
+    
+    Example:
+        get_summary_cache_stats()
+        # Returns: {'hits': 42, 'misses': 5, 'hit_rate': 0.89}
+    """
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else 0.0
+    }
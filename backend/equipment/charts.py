@@ -0,0 +1,203 @@
+"""
+Server-Side Chart Data.
+
+WHAT: Histograms of the numeric columns and downsampled scatter points
+      for a dataset.
+WHY: The dashboards could only chart the type distribution. Anything
+     richer meant sending every equipment record to the client, so the
+     payload grew with the dataset.
+HOW: The numeric columns are loaded once into NumPy arrays (memory-mapped
+     from the dataset's column files when it has them). Histograms come
+     from np.histogram. Scatter data is reduced to at most N points with
+     Largest-Triangle-Three-Buckets (LTTB), which keeps the points that
+     shape the plot (peaks, dips, outliers). The result is deterministic.
+     Results are cached per dataset and parameters like summaries (see
+     cache.py), so the response size stays the same however large the
+     dataset gets.
+"""
+
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import content_version
+from .columnar import open_columns
+from .models import Dataset, EquipmentData
+
+CHART_COLUMNS = ('flowrate', 'pressure', 'temperature')
+MAX_HISTOGRAM_BINS = 200
+
+
+def load_columns(dataset: Dataset, fields: Sequence[str]) -> Dict[str, np.ndarray]:
+    """
+    Get numeric columns of a dataset as NumPy arrays.
+    
+    Uses the dataset's memory-mapped column files when it has them (no
+    copy, no database query). Otherwise rows are streamed from the database
+    straight into a NumPy array, without creating model instances or
+    per-record dicts.
+    
+    Example:
+        columns = load_columns(dataset, ['pressure', 'temperature'])
+        columns['pressure'].mean()
+    """
+    stored = open_columns(dataset)
+    if stored is not None:
+        return {field: stored.numeric(field) for field in fields}
+    
+    rows = EquipmentData.objects.filter(dataset=dataset).order_by().values_list(*fields)
+    dtype = [(field, 'f8') for field in fields]
+    array = np.fromiter(rows.iterator(chunk_size=2000), dtype=dtype)
+    return {field: array[field] for field in fields}
+
+
+def build_histograms(dataset: Dataset, bins: int) -> Dict:
+    """
+    Bin every numeric column of a dataset.
+    
+    Returns:
+        {'bins': 30, 'histograms': {'flowrate': {'edges': [...], 'counts': [...]}, ...}}
+        where edges has one more entry than counts
+    """
+    columns = load_columns(dataset, CHART_COLUMNS)
+    histograms = {}
+    for field in CHART_COLUMNS:
+        counts, edges = np.histogram(columns[field], bins=bins)
+        histograms[field] = {
+            'edges': edges.tolist(),
+            'counts': counts.tolist()
+        }
+    total = len(columns[CHART_COLUMNS[0]])
+    return {'bins': bins, 'total_points': total, 'histograms': histograms}
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Pick the indexes of at most `threshold` points that keep the shape
+    of the series (Largest-Triangle-Three-Buckets).
+    
+    The first and last points are always kept. The points in between are
+    split into threshold - 2 buckets, and from each bucket the point forming
+    the largest triangle with the previous pick and the next bucket's
+    average is kept.
+    
+    Args:
+        x: X values, sorted ascending
+        y: Y values
+        threshold: Maximum number of points to keep
+    
+    Returns:
+        Sorted array of selected indexes
+    """
+    count = len(x)
+    if threshold >= count or count <= 2:
+        return np.arange(count)
+    if threshold < 3:
+        return np.array([0, count - 1])[:threshold]
+    
+    # Bucket boundaries for the points between the first and last one
+    edges = np.linspace(1, count - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = count - 1
+    
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        next_start = end
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else count
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        
+        # Twice the triangle area for every candidate in the bucket at once
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(area.argmax())
+        selected[bucket + 1] = previous
+    
+    return selected
+
+
+def build_scatter(dataset: Dataset, x_field: str, y_field: str, max_points: int) -> Dict:
+    """
+    Downsample a dataset to at most max_points (x, y) pairs.
+    
+    Points are sorted by x (then y) before reducing, so the same dataset
+    always gives the same points.
+    
+    Returns:
+        {'x': 'pressure', 'y': 'temperature', 'total_points': 100000,
+         'points': [[x, y], ...]}
+    """
+    columns = load_columns(dataset, [x_field, y_field])
+    x, y = columns[x_field], columns[y_field]
+    order = np.lexsort((y, x))
+    x, y = x[order], y[order]
+    
+    keep = lttb(x, y, max_points)
+    return {
+        'x': x_field,
+        'y': y_field,
+        'total_points': len(x),
+        'points': np.column_stack((x[keep], y[keep])).tolist()
+    }
+
+
+def chart_cache_key(dataset: Dataset, kind: str, params: Tuple) -> str:
+    """Cache key for one chart of a dataset"""
+    suffix = ':'.join(str(param) for param in params)
+    return f'dataset-chart:{dataset.id}:{content_version(dataset)}:{kind}:{suffix}'
+
+
+def get_histograms(dataset: Dataset, bins: int) -> Tuple[Dict, bool]:
+    """
+    Return a dataset's histograms, from the cache when possible.
+    
+    Returns:
+        Tuple of (histogram_dict, cache_hit)
+    """
+    key = chart_cache_key(dataset, 'histogram', (bins,))
+    data = cache.get(key)
+    if data is not None:
+        return data, True
+    data = build_histograms(dataset, bins)
+    cache.set(key, data, timeout=settings.SUMMARY_CACHE_TIMEOUT)
+    return data, False
+
+
+def get_scatter(dataset: Dataset, x_field: str, y_field: str, max_points: int) -> Tuple[Dict, bool]:
+    """
+    Return downsampled scatter points, from the cache when possible.
+    
+    Returns:
+        Tuple of (scatter_dict, cache_hit)
+    """
+    key = chart_cache_key(dataset, 'scatter', (x_field, y_field, max_points))
+    data = cache.get(key)
+    if data is not None:
+        return data, True
+    data = build_scatter(dataset, x_field, y_field, max_points)
+    cache.set(key, data, timeout=settings.SUMMARY_CACHE_TIMEOUT)
+    return data, False
+
+
+def invalidate_dataset_charts(dataset: Dataset) -> None:
+    """
+    Remove a dataset's charts cached with the default parameters.
+    
+    Charts with other parameters expire on their own; their keys include the
+    content version, so they are never served for a different dataset.
+    """
+    keys = [chart_cache_key(dataset, 'histogram', (settings.CHART_HISTOGRAM_BINS,))]
+    for x_field in CHART_COLUMNS:
+        for y_field in CHART_COLUMNS:
+            if x_field != y_field:
+                keys.append(chart_cache_key(
+                    dataset, 'scatter', (x_field, y_field, settings.CHART_SCATTER_MAX_POINTS)
+                ))
+    cache.delete_many(keys)
@@ -0,0 +1,224 @@
+"""
+Columnar Record Storage.
+
+WHAT: A per-dataset folder of raw column files written next to the CSV at
+      ingest, read back as memory-mapped NumPy arrays.
+WHY: The chart, statistics, comparison and PDF paths only ever need whole
+     columns. Reading them from EquipmentData means fetching and converting
+     every SQLite row (id, FK and two varchar columns included) just to
+     pull a few floats out.
+HOW: Each cleaned chunk is appended to plain little-endian files:
+         flowrate.f8, pressure.f8, temperature.f8   float64 values
+         type_codes.i4                               int32 index into type_names
+         names.bin + names_offsets.i8                UTF-8 names, Arrow-style
+     meta.json records the row count and type names. Files are written to a
+     .tmp folder that is renamed into place once ingest succeeds, so readers
+     never see a half-written sidecar. np.memmap maps the files without
+     copying them. The SQLite rows stay the source for row-level access.
+"""
+
+import json
+import os
+import shutil
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from .models import Dataset
+
+COLUMNS_FORMAT_VERSION = 1
+# CSV column -> EquipmentData field
+NUMERIC_COLUMNS = {
+    'Flowrate': 'flowrate',
+    'Pressure': 'pressure',
+    'Temperature': 'temperature',
+}
+
+
+class ColumnarWriter:
+    """
+    Appends cleaned DataFrame chunks to a dataset's column files.
+    
+    Example:
+        writer = ColumnarWriter(dataset.columns_path)
+        for chunk in chunks:
+            writer.append(chunk)
+        writer.commit()   # or writer.abort() if ingest failed
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_path = path + '.tmp'
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+        os.makedirs(self.tmp_path)
+        
+        self.files = {
+            field: open(os.path.join(self.tmp_path, f'{field}.f8'), 'wb')
+            for field in NUMERIC_COLUMNS.values()
+        }
+        self.files['type_codes'] = open(os.path.join(self.tmp_path, 'type_codes.i4'), 'wb')
+        self.files['names'] = open(os.path.join(self.tmp_path, 'names.bin'), 'wb')
+        self.files['names_offsets'] = open(os.path.join(self.tmp_path, 'names_offsets.i8'), 'wb')
+        np.zeros(1, dtype='<i8').tofile(self.files['names_offsets'])
+        
+        self.rows = 0
+        self.name_bytes = 0
+        self.type_index: Dict[str, int] = {}
+    
+    def append(self, df: pd.DataFrame) -> None:
+        """Add a cleaned chunk (standardized column names)"""
+        if len(df) == 0:
+            return
+        for column, field in NUMERIC_COLUMNS.items():
+            df[column].to_numpy(dtype='<f8').tofile(self.files[field])
+        
+        codes, type_names = pd.factorize(df['Type'].astype(str), sort=False)
+        mapping = np.array(
+            [self.type_index.setdefault(name, len(self.type_index)) for name in type_names],
+            dtype='<i4'
+        )
+        mapping[codes].tofile(self.files['type_codes'])
+        
+        encoded = [name.encode('utf-8') for name in df['Equipment Name'].astype(str).tolist()]
+        lengths = np.fromiter((len(name) for name in encoded), dtype='<i8', count=len(encoded))
+        (self.name_bytes + np.cumsum(lengths)).astype('<i8').tofile(self.files['names_offsets'])
+        self.files['names'].write(b''.join(encoded))
+        self.name_bytes += int(lengths.sum())
+        self.rows += len(df)
+    
+    def _close_files(self) -> None:
+        for handle in self.files.values():
+            handle.close()
+    
+    def commit(self) -> None:
+        """Finish writing and move the columns into place"""
+        self._close_files()
+        meta = {
+            'version': COLUMNS_FORMAT_VERSION,
+            'rows': self.rows,
+            'type_names': list(self.type_index),
+        }
+        with open(os.path.join(self.tmp_path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.replace(self.tmp_path, self.path)
+    
+    def abort(self) -> None:
+        """Discard everything written so far"""
+        self._close_files()
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+
+
+class DatasetColumns:
+    """
+    Read-only, memory-mapped view of a dataset's column files.
+    
+    Numeric columns and type codes are NumPy arrays backed by the files;
+    nothing is read until it is used.
+    """
+    
+    def __init__(self, path: str, meta: Dict):
+        self.rows = meta['rows']
+        self.type_names: List[str] = meta['type_names']
+        self.flowrate = self._map(path, 'flowrate.f8', '<f8', self.rows)
+        self.pressure = self._map(path, 'pressure.f8', '<f8', self.rows)
+        self.temperature = self._map(path, 'temperature.f8', '<f8', self.rows)
+        self.type_codes = self._map(path, 'type_codes.i4', '<i4', self.rows)
+        self.name_offsets = self._map(path, 'names_offsets.i8', '<i8', self.rows + 1)
+        self.name_data = self._map(path, 'names.bin', 'u1', int(self.name_offsets[-1]))
+    
+    @staticmethod
+    def _map(path: str, file_name: str, dtype: str, count: int) -> np.ndarray:
+        if count == 0:
+            # np.memmap cannot map an empty file
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(path, file_name), dtype=dtype, mode='r', shape=(count,))
+    
+    def __len__(self) -> int:
+        return self.rows
+    
+    def numeric(self, field: str) -> np.ndarray:
+        """flowrate, pressure or temperature as a float64 array"""
+        return getattr(self, field)
+    
+    def types(self, start: int = 0, stop: Optional[int] = None) -> pd.Categorical:
+        """Equipment types of rows [start, stop) as a pandas Categorical"""
+        return pd.Categorical.from_codes(
+            np.asarray(self.type_codes[start:stop]), categories=self.type_names
+        )
+    
+    def names(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        """Equipment names of rows [start, stop)"""
+        stop = self.rows if stop is None else min(stop, self.rows)
+        offsets = self.name_offsets[start:stop + 1].tolist()
+        if not offsets:
+            return []
+        data = bytes(self.name_data[offsets[0]:offsets[-1]])
+        base = offsets[0]
+        return [
+            data[begin - base:end - base].decode('utf-8')
+            for begin, end in zip(offsets[:-1], offsets[1:])
+        ]
+
+
+def sidecar_enabled() -> bool:
+    """True if new uploads should get column files"""
+    return settings.COLUMNAR_SIDECAR
+
+
+def open_columns(dataset: Dataset) -> Optional[DatasetColumns]:
+    """
+    Open a dataset's column files.
+    
+    Returns None if the dataset has none (uploaded before they existed or
+    with COLUMNAR_SIDECAR off) or they do not match the dataset, so callers
+    fall back to EquipmentData.
+    
+    Example:
+        columns = open_columns(dataset)
+        if columns is not None:
+            columns.flowrate.mean()
+    """
+    path = dataset.columns_path
+    try:
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta.get('version') != COLUMNS_FORMAT_VERSION or meta['rows'] != dataset.total_equipment:
+            return None
+        return DatasetColumns(path, meta)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def link_columns(source: Dataset, target: Dataset) -> bool:
+    """
+    Give a copied dataset the column files of the dataset it was copied from.
+    
+    The files are hard-linked into a .tmp folder that is renamed into place
+    (copied if the filesystem has no hard links). They are never modified
+    after ingest, so sharing them is safe.
+    
+    Returns:
+        True if the columns were linked, False if the source has none
+    """
+    if open_columns(source) is None:
+        return False
+    
+    tmp_path = target.columns_path + '.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    try:
+        for name in os.listdir(source.columns_path):
+            source_file = os.path.join(source.columns_path, name)
+            try:
+                os.link(source_file, os.path.join(tmp_path, name))
+            except OSError:
+                shutil.copy2(source_file, os.path.join(tmp_path, name))
+        shutil.rmtree(target.columns_path, ignore_errors=True)
+        os.replace(tmp_path, target.columns_path)
+    except OSError:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    return True
@@ -0,0 +1,198 @@
+"""
+Dataset Comparison.
+
+WHAT: Compares two of a user's datasets: per-equipment changes in
+      flowrate, pressure and temperature, equipment added or removed, and
+      how the type distribution shifted.
+WHY: Comparing two uploads meant downloading both summaries and diffing
+     them on the client.
+HOW: Each dataset's records are read into a DataFrame from its column
+     files (or a single values_list query for older datasets). The two
+     frames are joined on equipment_name with one outer pd.merge, and every
+     delta is computed on whole columns.
+     Type counts come from the stored equipment_types, without reading
+     records. Results are cached by the (base, target) id pair and the
+     request options.
+"""
+
+import json
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import content_version
+from .columnar import open_columns
+from .models import Dataset, EquipmentData
+
+COMPARE_COLUMNS = ('flowrate', 'pressure', 'temperature')
+MAX_COMPARE_ROWS = 1000
+
+
+def load_records_frame(dataset: Dataset) -> pd.DataFrame:
+    """
+    Read a dataset's records into a DataFrame, one row per equipment_name.
+    
+    Uses the dataset's column files when it has them, otherwise one
+    values_list query.
+    
+    Equipment listed more than once in a CSV is averaged into one row.
+    """
+    columns = open_columns(dataset)
+    if columns is not None:
+        frame = pd.DataFrame({
+            'equipment_name': columns.names(),
+            'equipment_type': columns.types().astype(str),
+            **{column: columns.numeric(column) for column in COMPARE_COLUMNS}
+        })
+    else:
+        fields = ('equipment_name', 'equipment_type') + COMPARE_COLUMNS
+        rows = EquipmentData.objects.filter(dataset=dataset).order_by().values_list(*fields)
+        frame = pd.DataFrame.from_records(rows.iterator(chunk_size=2000), columns=fields)
+        frame = frame.astype({column: 'float64' for column in COMPARE_COLUMNS})
+    if frame['equipment_name'].duplicated().any():
+        frame = frame.groupby('equipment_name', sort=False).agg(
+            {'equipment_type': 'first', **{column: 'mean' for column in COMPARE_COLUMNS}}
+        ).reset_index()
+    return frame
+
+
+def dataset_info(dataset: Dataset) -> Dict:
+    """Identifying fields of a compared dataset"""
+    return {
+        'id': dataset.id,
+        'uploaded_at': dataset.uploaded_at.isoformat(),
+        'total_equipment': dataset.total_equipment,
+    }
+
+
+def compare_type_counts(base: Dataset, target: Dataset) -> List[Dict]:
+    """
+    Type distribution change between two datasets.
+    
+    Returns:
+        [{'equipment_type': 'Pump', 'base': 4, 'target': 6, 'delta': 2}, ...]
+        largest absolute change first
+    """
+    base_counts = json.loads(base.equipment_types or '{}')
+    target_counts = json.loads(target.equipment_types or '{}')
+    rows = []
+    for equipment_type in dict.fromkeys(list(base_counts) + list(target_counts)):
+        before = base_counts.get(equipment_type, 0)
+        after = target_counts.get(equipment_type, 0)
+        rows.append({
+            'equipment_type': equipment_type,
+            'base': before,
+            'target': after,
+            'delta': after - before
+        })
+    rows.sort(key=lambda row: -abs(row['delta']))
+    return rows
+
+
+def compare_datasets(base: Dataset, target: Dataset, sort: str = 'flowrate',
+                     limit: int = 100) -> Dict:
+    """
+    Compare two datasets record by record.
+    
+    Args:
+        base: Dataset to compare from
+        target: Dataset to compare to
+        sort: Column whose absolute delta orders the 'equipment' list
+        limit: Matched equipment rows returned (the summary covers all)
+    
+    Returns:
+        Dictionary with 'summary', 'type_distribution', 'equipment'
+        (matched rows, largest change first), 'added' and 'removed'
+    
+    Example:
+        result = compare_datasets(last_week, today, sort='pressure', limit=20)
+        result['summary']['changed']
+    """
+    merged = pd.merge(
+        load_records_frame(base), load_records_frame(target),
+        on='equipment_name', how='outer', suffixes=('_base', '_target'), indicator=True
+    )
+    matched = merged[merged['_merge'] == 'both']
+    added = merged.loc[merged['_merge'] == 'right_only', 'equipment_name']
+    removed = merged.loc[merged['_merge'] == 'left_only', 'equipment_name']
+    
+    deltas = {
+        column: matched[f'{column}_target'].to_numpy() - matched[f'{column}_base'].to_numpy()
+        for column in COMPARE_COLUMNS
+    }
+    changed = np.zeros(len(matched), dtype=bool)
+    for delta in deltas.values():
+        changed |= delta != 0
+    type_changed = (matched['equipment_type_base'] != matched['equipment_type_target']).to_numpy()
+    
+    # Largest absolute change in the sort column first, then by name. Only
+    # the top `limit` rows are sorted (argpartition picks them in O(n))
+    magnitude = -np.abs(deltas[sort])
+    order = np.arange(len(magnitude))
+    if len(order) > limit:
+        order = np.argpartition(magnitude, limit - 1)[:limit]
+    names = matched['equipment_name'].to_numpy()
+    order = order[np.lexsort((names[order], magnitude[order]))]
+    top = matched.iloc[order]
+    equipment = pd.DataFrame({
+        'equipment_name': top['equipment_name'].to_numpy(),
+        'equipment_type': top['equipment_type_target'].to_numpy(),
+        'type_changed': type_changed[order],
+        **{
+            name: values
+            for column in COMPARE_COLUMNS
+            for name, values in (
+                (f'{column}_base', top[f'{column}_base'].to_numpy()),
+                (f'{column}_target', top[f'{column}_target'].to_numpy()),
+                (f'{column}_delta', deltas[column][order]),
+            )
+        }
+    })
+    
+    return {
+        'base': dataset_info(base),
+        'target': dataset_info(target),
+        'summary': {
+            'matched': int(len(matched)),
+            'changed': int((changed | type_changed).sum()),
+            'added': int(len(added)),
+            'removed': int(len(removed)),
+            'mean_delta': {
+                column: float(delta.mean()) if len(delta) else 0.0
+                for column, delta in deltas.items()
+            },
+        },
+        'type_distribution': compare_type_counts(base, target),
+        'sort': sort,
+        'equipment': equipment.to_dict('records'),
+        'added': sorted(added.tolist())[:limit],
+        'removed': sorted(removed.tolist())[:limit],
+    }
+
+
+def compare_cache_key(base: Dataset, target: Dataset, sort: str, limit: int) -> str:
+    """Cache key for a comparison (ordered id pair plus options)"""
+    return (
+        f'dataset-compare:{base.id}:{content_version(base)}:'
+        f'{target.id}:{content_version(target)}:{sort}:{limit}'
+    )
+
+
+def get_comparison(base: Dataset, target: Dataset, sort: str = 'flowrate',
+                   limit: int = 100) -> Tuple[Dict, bool]:
+    """
+    Return a comparison, from the cache when possible.
+    
+    Returns:
+        Tuple of (comparison_dict, cache_hit)
+    """
+    key = compare_cache_key(base, target, sort, limit)
+    data = cache.get(key)
+    if data is not None:
+        return data, True
+    data = compare_datasets(base, target, sort, limit)
+    cache.set(key, data, timeout=settings.SUMMARY_CACHE_TIMEOUT)
+    return data, False
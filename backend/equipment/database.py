@@ -0,0 +1,43 @@
+"""
+SQLite Connection Tuning.
+
+WHAT: Applies the SQLite performance profile (settings.SQLITE_TUNING) to
+      every new database connection.
+WHY: The default rollback journal makes readers wait while an upload holds
+     the write lock, and synchronous=FULL syncs the disk on every commit.
+HOW: A connection_created receiver (connected in EquipmentConfig.ready)
+     runs the PRAGMAs once per connection. With CONN_MAX_AGE connections
+     are reused, so this happens once per worker thread, not per request.
+"""
+
+from django.conf import settings
+
+
+def sqlite_pragmas():
+    """
+    PRAGMA statements for the configured profile.
+    
+    Example:
+        sqlite_pragmas()
+        # Returns: ['PRAGMA journal_mode=WAL', 'PRAGMA synchronous=NORMAL', ...]
+    """
+    return [
+        # Readers see the last commit while a writer appends to the WAL
+        'PRAGMA journal_mode=WAL',
+        # In WAL mode only checkpoints sync; a crash can lose the last
+        # commits but never corrupts the database
+        'PRAGMA synchronous=NORMAL',
+        # Negative values are KiB
+        f'PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_MB * 1024}',
+        f'PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024}',
+        f'PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}',
+    ]
+
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """connection_created receiver: tune new SQLite connections"""
+    if connection.vendor != 'sqlite' or not settings.SQLITE_TUNING:
+        return
+    with connection.cursor() as cursor:
+        for pragma in sqlite_pragmas():
+            cursor.execute(pragma)
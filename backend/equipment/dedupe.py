@@ -0,0 +1,252 @@
+"""
+Deduplicated Upload Storage.
+
+WHAT: Stores uploaded CSVs under the SHA-256 of their content and lets an
+      upload of a file the user already has copy that dataset instead of
+      processing it again.
+WHY: Teams re-upload the same daily export many times. Each upload wrote a
+     new file under media/datasets/ and parsed and inserted every row again.
+HOW: The upload is hashed while it is written to a temporary file. The
+     Dataset row (with the hash in content_hash) is created first, then the
+     file is renamed to datasets/<aa>/<sha256>.csv - or dropped if that
+     file already exists, so identical files are stored once. When the
+     upload job finds a finished dataset of the same user with the same
+     hash, it copies the analytics onto the new dataset and its records and
+     column statistics with one INSERT ... SELECT per table, inside the
+     database, and hard-links the column files.
+
+     Files are reference counted by content_hash. After datasets are
+     deleted, release_content_file moves a file aside, then checks for
+     datasets with its hash: an upload registered before the check gets
+     the file back, and one registered after it finds no file and stores
+     its own copy. Because uploads register before they look for the file,
+     no upload is left pointing at a removed file, without any lock.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+
+from .columnar import link_columns, sidecar_enabled
+from .models import Dataset, DatasetColumnStats, EquipmentData
+
+logger = logging.getLogger(__name__)
+
+# Columns copied when a dataset's rows are cloned (dataset_id is replaced)
+CLONED_RECORD_FIELDS = ['equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+CLONED_STATS_FIELDS = [
+    'equipment_type', 'column', 'count', 'min', 'max', 'mean', 'variance',
+    'p5', 'p50', 'p95', 'sketch',
+]
+# Analytics copied onto the new dataset
+CLONED_DATASET_FIELDS = [
+    'total_equipment', 'avg_flowrate', 'avg_pressure', 'avg_temperature', 'equipment_types',
+]
+
+
+def content_file_name(content_hash: str) -> str:
+    """
+    Storage name of the file holding content with this hash.
+    
+    Example:
+        content_file_name('9f86d0...')
+        # Returns: 'datasets/9f/9f86d0....csv'
+    """
+    return f'datasets/{content_hash[:2]}/{content_hash}.csv'
+
+
+def store_file(path: str, content_hash: str) -> str:
+    """
+    Move a fully written file to its content-addressed name.
+    
+    If a file with the same content is already stored, `path` is removed
+    and the stored one is used.
+    
+    Args:
+        path: File to store (renamed, not copied)
+        content_hash: Hex SHA-256 of the file
+    
+    Returns:
+        Storage name for Dataset.file
+    """
+    name = content_file_name(content_hash)
+    destination = default_storage.path(name)
+    if os.path.exists(destination):
+        os.remove(path)
+    else:
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        os.replace(path, destination)
+    return name
+
+
+def receive_upload(uploaded_file) -> Tuple[str, str]:
+    """
+    Write an uploaded file to a temporary file, hashing it on the way.
+    
+    Args:
+        uploaded_file: Django UploadedFile (request.FILES entry)
+    
+    Returns:
+        Tuple of (temporary path, hex SHA-256) - pass both to
+        create_stored_dataset
+    
+    Example:
+        tmp_path, content_hash = receive_upload(request.FILES['file'])
+    """
+    folder = default_storage.path('datasets')
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(suffix='.csv.tmp', dir=folder)
+    digest = hashlib.sha256()
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            for chunk in uploaded_file.chunks():
+                digest.update(chunk)
+                tmp_file.write(chunk)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return tmp_path, digest.hexdigest()
+
+
+def create_stored_dataset(user, path: str, content_hash: str) -> Dataset:
+    """
+    Create a pending Dataset for a fully written file and store the file.
+    
+    The row is created before the file is stored, so a concurrent
+    release_content_file of the same hash either sees the new dataset and
+    keeps the file, or has already moved it aside and store_file writes
+    this copy in its place.
+    
+    Args:
+        user: Uploading user
+        path: Temporary file holding the upload (renamed or removed)
+        content_hash: Hex SHA-256 of the file
+    
+    Returns:
+        The new Dataset (status pending - start an UploadJob for it)
+    """
+    dataset = Dataset.objects.create(
+        user=user,
+        file=content_file_name(content_hash),
+        content_hash=content_hash,
+        status=Dataset.STATUS_PENDING
+    )
+    try:
+        store_file(path, content_hash)
+    except BaseException:
+        Dataset.objects.filter(pk=dataset.pk).delete()
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return dataset
+
+
+def release_content_file(content_hash: str) -> bool:
+    """
+    Remove a content-addressed file if no dataset uses it any more.
+    
+    Call it after the transaction that deleted the datasets has committed.
+    The file is renamed aside before the final check and put back if a
+    dataset with the same hash appeared meanwhile (see the module notes).
+    
+    Returns:
+        True if the file was removed
+    """
+    if Dataset.objects.filter(content_hash=content_hash).exists():
+        return False
+    
+    path = default_storage.path(content_file_name(content_hash))
+    aside = f'{path}.{uuid.uuid4().hex}.deleting'
+    try:
+        os.replace(path, aside)
+    except FileNotFoundError:
+        return False
+    
+    if Dataset.objects.filter(content_hash=content_hash).exists():
+        # An upload registered before the check - same bytes, so restoring
+        # over a copy it stored meanwhile is harmless
+        os.replace(aside, path)
+        return False
+    os.remove(aside)
+    return True
+
+
+def find_duplicate(dataset: Dataset) -> Optional[Dataset]:
+    """
+    The user's newest finished dataset with the same content, if any.
+    
+    Returns None for datasets without a content hash or with
+    UPLOAD_DEDUPLICATION off.
+    """
+    if not settings.UPLOAD_DEDUPLICATION or not dataset.content_hash:
+        return None
+    return (
+        Dataset.objects.filter(
+            user_id=dataset.user_id,
+            content_hash=dataset.content_hash,
+            status=Dataset.STATUS_READY
+        )
+        .exclude(pk=dataset.pk)
+        .order_by('-uploaded_at')
+        .first()
+    )
+
+
+def _copy_rows(model, fields, source_id: int, target_id: int) -> int:
+    """INSERT INTO table (dataset_id, fields) SELECT target_id, fields ... WHERE dataset_id = source_id"""
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    columns = ', '.join(quote(model._meta.get_field(field).column) for field in fields)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({quote("dataset_id")}, {columns}) '
+            f'SELECT %s, {columns} FROM {table} WHERE {quote("dataset_id")} = %s',
+            [target_id, source_id]
+        )
+        return cursor.rowcount
+
+
+def clone_dataset(source: Dataset, dataset: Dataset) -> Optional[Dict]:
+    """
+    Fill a pending dataset with the analytics and records of an identical one.
+    
+    Args:
+        source: Finished dataset with the same content
+        dataset: Dataset being processed
+    
+    Returns:
+        Ingest metrics ({'rows_written', 'write_seconds', 'duplicate_of'}),
+        or None if the source lost its records meanwhile (nothing is
+        written - process the file instead)
+    """
+    start = time.perf_counter()
+    with transaction.atomic():
+        rows = _copy_rows(EquipmentData, CLONED_RECORD_FIELDS, source.pk, dataset.pk)
+        if rows != source.total_equipment:
+            # The source was deleted after it was found
+            transaction.set_rollback(True)
+            return None
+        _copy_rows(DatasetColumnStats, CLONED_STATS_FIELDS, source.pk, dataset.pk)
+        for field in CLONED_DATASET_FIELDS:
+            setattr(dataset, field, getattr(source, field))
+        # update_fields fails if the dataset was deleted meanwhile
+        dataset.save(update_fields=CLONED_DATASET_FIELDS)
+    seconds = time.perf_counter() - start
+    
+    if sidecar_enabled():
+        try:
+            link_columns(source, dataset)
+        except OSError:
+            # The source may have been deleted meanwhile - reads fall back
+            # to EquipmentData
+            logger.warning('Could not link column files of dataset %s', source.pk, exc_info=True)
+    
+    return {'rows_written': rows, 'write_seconds': seconds, 'duplicate_of': source.pk}
@@ -0,0 +1,133 @@
+"""
+Conditional GET Validators.
+
+WHAT: ETag and Last-Modified functions for the read-only dataset endpoints.
+WHY: Clients re-download the same summaries, history lists and PDFs even
+     when nothing has changed. With validators they can send
+     If-None-Match / If-Modified-Since and get an empty 304 instead.
+HOW: Datasets are immutable once processed, so validators are derived from
+     the dataset id and uploaded_at. They are used with Django's
+     @condition decorator, which answers 304 before the view runs.
+"""
+
+import hashlib
+from typing import Optional
+
+from .export import EXPORT_FORMATS, accepts_gzip, parquet_available
+from .models import Dataset
+from .retention import kept_datasets
+
+
+def _get_ready_dataset(request, dataset_id) -> Optional[Dataset]:
+    """
+    Look up the user's dataset once per request.
+    
+    Returns None for missing datasets and for datasets still being
+    processed (their contents can still change, so no validators are sent).
+    """
+    cache_attr = f'_conditional_dataset_{dataset_id}'
+    if not hasattr(request, cache_attr):
+        dataset = Dataset.objects.filter(id=dataset_id, user=request.user).first()
+        setattr(request, cache_attr, dataset)
+    dataset = getattr(request, cache_attr)
+    if dataset is None or dataset.status != Dataset.STATUS_READY:
+        return None
+    return dataset
+
+
+def _dataset_tag(dataset: Dataset) -> str:
+    """Identifier for a dataset's immutable contents"""
+    return f'{dataset.id}-{int(dataset.uploaded_at.timestamp() * 1_000_000)}'
+
+
+def dataset_last_modified(request, dataset_id):
+    """Last-Modified for dataset endpoints: the upload time"""
+    dataset = _get_ready_dataset(request, dataset_id)
+    return dataset.uploaded_at if dataset else None
+
+
+def summary_etag(request, dataset_id):
+    """ETag for /datasets/<id>/summary/ (differs per include_records variant)"""
+    dataset = _get_ready_dataset(request, dataset_id)
+    if dataset is None:
+        return None
+    variant = request.GET.get('include_records', 'true').lower()
+    records = 'no-records' if variant in ('0', 'false', 'no') else 'full'
+    return f'summary-{_dataset_tag(dataset)}-{records}'
+
+
+def pdf_etag(request, dataset_id):
+    """ETag for /datasets/<id>/download-pdf/"""
+    dataset = _get_ready_dataset(request, dataset_id)
+    return f'pdf-{_dataset_tag(dataset)}' if dataset else None
+
+
+def stats_etag(request, dataset_id):
+    """ETag for /datasets/<id>/stats/"""
+    dataset = _get_ready_dataset(request, dataset_id)
+    return f'stats-{_dataset_tag(dataset)}' if dataset else None
+
+
+def export_etag(request, dataset_id):
+    """ETag for /datasets/<id>/export/ (one per format and content encoding)"""
+    dataset = _get_ready_dataset(request, dataset_id)
+    export_format = request.GET.get('format', 'csv')
+    if dataset is None or export_format not in EXPORT_FORMATS:
+        return None
+    if export_format == 'parquet' and not parquet_available():
+        return None
+    encoding = 'gzip' if accepts_gzip(request, export_format) else 'identity'
+    return f'export-{export_format}-{encoding}-{_dataset_tag(dataset)}'
+
+
+def _chart_etag(kind: str, request, dataset_id):
+    """ETag for a chart endpoint (one per query string)"""
+    dataset = _get_ready_dataset(request, dataset_id)
+    if dataset is None:
+        return None
+    params = hashlib.sha1(request.GET.urlencode().encode()).hexdigest()[:12]
+    return f'{kind}-{_dataset_tag(dataset)}-{params}'
+
+
+def histogram_etag(request, dataset_id):
+    """ETag for /datasets/<id>/histogram/"""
+    return _chart_etag('histogram', request, dataset_id)
+
+
+def scatter_etag(request, dataset_id):
+    """ETag for /datasets/<id>/scatter/"""
+    return _chart_etag('scatter', request, dataset_id)
+
+
+def compare_etag(request):
+    """
+    ETag for /datasets/compare/ (both datasets and the query string).
+    
+    Not sent unless every listed dataset exists and is ready.
+    """
+    try:
+        ids = [int(value) for value in request.GET.get('ids', '').split(',')]
+    except ValueError:
+        return None
+    datasets = [_get_ready_dataset(request, dataset_id) for dataset_id in ids]
+    if not datasets or None in datasets:
+        return None
+    tags = ';'.join(_dataset_tag(dataset) for dataset in datasets)
+    digest = hashlib.sha1(f'{tags}|{request.GET.urlencode()}'.encode()).hexdigest()
+    return f'compare-{digest[:16]}'
+
+
+def history_etag(request):
+    """
+    ETag for /upload-history/.
+    
+    Hashes the id, upload time and status of every dataset in the list, so
+    uploads, deletions and finished processing all change it. No
+    Last-Modified is sent for the history: deleting a dataset does not make
+    any remaining upload time newer.
+    """
+    rows = kept_datasets(request.user.id).values_list('id', 'uploaded_at', 'status')
+    digest = hashlib.sha1(
+        ';'.join(f'{pk}:{uploaded_at.timestamp()}:{status}' for pk, uploaded_at, status in rows).encode()
+    ).hexdigest()
+    return f'history-{request.user.id}-{digest[:16]}'
@@ -0,0 +1,171 @@
+"""
+Dataset Export.
+
+WHAT: Streams a dataset's cleaned equipment records back out as CSV,
+      JSON Lines or Parquet.
+WHY: The only way to get records out was the nested summary JSON, which is
+     built in memory and is not a format other tools read.
+HOW: Records are read with QuerySet.iterator(chunk_size=...) in upload
+     order and encoded one block of rows at a time, so memory stays flat
+     however large the dataset is. The view wraps the blocks in a
+     StreamingHttpResponse, gzip-compressing them when the client accepts
+     it. Parquet needs pyarrow, which is optional.
+"""
+
+import csv
+import importlib.util
+import io
+import json
+import re
+from itertools import islice
+from typing import Iterator, List, Tuple
+
+from rest_framework.negotiation import DefaultContentNegotiation
+
+from .models import Dataset, EquipmentData
+from .utils import REQUIRED_COLUMNS
+
+EXPORT_FIELDS = ('equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature')
+# format -> (content type, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+# Parquet pages are already compressed
+GZIP_FORMATS = ('csv', 'jsonl')
+
+ACCEPTS_GZIP_RE = re.compile(r'\bgzip\b')
+
+
+class ExportContentNegotiation(DefaultContentNegotiation):
+    """
+    Content negotiation that ignores ?format=.
+    
+    DRF reads ?format= as a renderer override and answers 404 for unknown
+    renderers; on the export endpoint it names the file format instead.
+    """
+    
+    def filter_renderers(self, renderers, format):
+        return renderers
+
+
+def parquet_available() -> bool:
+    """True if pyarrow is installed"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def accepts_gzip(request, export_format: str) -> bool:
+    """True if the export response should be gzip-compressed"""
+    if export_format not in GZIP_FORMATS:
+        return False
+    return bool(ACCEPTS_GZIP_RE.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+
+
+def iter_record_chunks(dataset: Dataset, chunk_size: int) -> Iterator[List[Tuple]]:
+    """
+    Yield a dataset's records as lists of up to chunk_size value tuples.
+    
+    Example:
+        for rows in iter_record_chunks(dataset, 5000):
+            rows[0]   # ('Pump A', 'Pump', 150.5, 2.3, 120.0)
+    """
+    rows = (
+        EquipmentData.objects.filter(dataset=dataset)
+        .order_by('id')
+        .values_list(*EXPORT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_csv(dataset: Dataset, chunk_size: int) -> Iterator[bytes]:
+    """CSV with the upload column headers, so an export can be uploaded again"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(REQUIRED_COLUMNS)
+    for rows in iter_record_chunks(dataset, chunk_size):
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Empty dataset: only the header
+        yield buffer.getvalue().encode('utf-8')
+
+
+def iter_jsonl(dataset: Dataset, chunk_size: int) -> Iterator[bytes]:
+    """One JSON object per record, keyed by EquipmentData field name"""
+    for rows in iter_record_chunks(dataset, chunk_size):
+        lines = [json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False) for row in rows]
+        lines.append('')
+        yield '\n'.join(lines).encode('utf-8')
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a generator"""
+    
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+        self.closed = False
+    
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self.position
+    
+    def flush(self) -> None:
+        pass
+    
+    def close(self) -> None:
+        self.closed = True
+    
+    def take(self) -> bytes:
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def iter_parquet(dataset: Dataset, chunk_size: int) -> Iterator[bytes]:
+    """Parquet file with one row group per chunk (requires pyarrow)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    schema = pa.schema([
+        ('equipment_name', pa.string()),
+        ('equipment_type', pa.string()),
+        ('flowrate', pa.float64()),
+        ('pressure', pa.float64()),
+        ('temperature', pa.float64()),
+    ])
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for rows in iter_record_chunks(dataset, chunk_size):
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+            yield sink.take()
+    yield sink.take()
+
+
+EXPORT_WRITERS = {
+    'csv': iter_csv,
+    'jsonl': iter_jsonl,
+    'parquet': iter_parquet,
+}
+
+
+def export_filename(dataset: Dataset, export_format: str) -> str:
+    """Download file name for an export"""
+    return f'equipment_data_{dataset.id}.{EXPORT_FORMATS[export_format][1]}'
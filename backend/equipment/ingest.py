@@ -0,0 +1,286 @@
+"""
+Database Ingest Pipeline.
+
+WHAT: Functions that write processed equipment records to the database.
+WHY: Creating one EquipmentData row at a time means one INSERT (and one
+     SQLite commit) per record, which is very slow for large CSVs.
+HOW: Build model instances in memory and save them with bulk_create in
+     fixed-size batches, all inside a single transaction. On PostgreSQL the
+     rows are streamed with COPY FROM STDIN instead, which skips building
+     model instances and SQL statements altogether. Large files are
+     streamed chunk by chunk so memory use stays bounded.
+"""
+
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+from django.conf import settings
+from django.db import connection, transaction
+
+from .columnar import ColumnarWriter, open_columns, sidecar_enabled
+from .models import Dataset, DatasetColumnStats, EquipmentData
+from .stats import DatasetProfiler
+from .utils import ProgressCallback, process_csv_file, process_csv_file_streaming
+
+# EquipmentData columns written by COPY, in order
+COPY_FIELDS = ('dataset', 'equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature')
+
+
+def get_batch_size() -> int:
+    """Return the configured bulk insert batch size"""
+    return getattr(settings, 'EQUIPMENT_BULK_BATCH_SIZE', 2000)
+
+
+def get_chunk_size() -> int:
+    """Return the number of CSV rows read per chunk when streaming"""
+    return getattr(settings, 'CSV_CHUNK_SIZE', 50000)
+
+
+def should_stream(file_size: int) -> bool:
+    """Return True if a file is large enough to use the streaming parser"""
+    threshold_mb = getattr(settings, 'CSV_STREAMING_THRESHOLD_MB', 5)
+    return file_size > threshold_mb * 1024 * 1024
+
+
+def use_copy_ingest() -> bool:
+    """True if records should be written with PostgreSQL COPY"""
+    if connection.vendor != 'postgresql' or not settings.POSTGRES_COPY_INGEST:
+        return False
+    # Row-by-row COPY needs psycopg 3; with psycopg2 bulk_create is used
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+    return is_psycopg3
+
+
+def copy_equipment_records(dataset: Dataset, records: Iterable[Dict]) -> int:
+    """
+    Stream equipment records into PostgreSQL with COPY FROM STDIN.
+    
+    Rows are sent as they are read from `records`, in one transaction.
+    
+    Returns:
+        Number of rows written
+    """
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(EquipmentData._meta.get_field(name).column) for name in COPY_FIELDS)
+    sql = f'COPY {quote(EquipmentData._meta.db_table)} ({columns}) FROM STDIN'
+    
+    rows = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        with cursor.cursor.copy(sql) as copy:
+            for record in records:
+                copy.write_row((
+                    dataset.id,
+                    record['equipment_name'],
+                    record['equipment_type'],
+                    record['flowrate'],
+                    record['pressure'],
+                    record['temperature'],
+                ))
+                rows += 1
+    return rows
+
+
+def write_equipment_records(dataset: Dataset, records: Iterable[Dict],
+                            batch_size: Optional[int] = None) -> Tuple[int, float]:
+    """
+    Bulk insert equipment records for a dataset (COPY on PostgreSQL).
+    
+    Args:
+        dataset: Dataset the records belong to
+        records: Iterable of record dictionaries (see process_csv_file)
+        batch_size: Rows per INSERT statement (default: EQUIPMENT_BULK_BATCH_SIZE;
+            not used with COPY)
+    
+    Returns:
+        Tuple of (rows_written, seconds_taken)
+    
+    Example:
+        rows, seconds = write_equipment_records(dataset, data['equipment_records'])
+    """
+    if use_copy_ingest():
+        start = time.perf_counter()
+        rows = copy_equipment_records(dataset, records)
+        return rows, time.perf_counter() - start
+    
+    batch_size = batch_size or get_batch_size()
+    start = time.perf_counter()
+    
+    objects = [EquipmentData(dataset=dataset, **record) for record in records]
+    with transaction.atomic():
+        EquipmentData.objects.bulk_create(objects, batch_size=batch_size)
+    
+    return len(objects), time.perf_counter() - start
+
+
+def save_analytics(dataset: Dataset, data: Dict) -> None:
+    """Copy calculated analytics onto the dataset and save it"""
+    dataset.total_equipment = data['total_equipment']
+    dataset.avg_flowrate = data['avg_flowrate']
+    dataset.avg_pressure = data['avg_pressure']
+    dataset.avg_temperature = data['avg_temperature']
+    dataset.equipment_types = data['equipment_types']
+    # update_fields makes this fail (instead of re-creating the row) if the
+    # dataset was deleted while it was being processed
+    dataset.save(update_fields=[
+        'total_equipment', 'avg_flowrate', 'avg_pressure', 'avg_temperature', 'equipment_types'
+    ])
+    if 'column_stats' in data:
+        save_column_stats(dataset, data['column_stats'])
+
+
+def save_column_stats(dataset: Dataset, profiles: Dict) -> int:
+    """
+    Replace a dataset's column statistics with freshly computed profiles.
+    
+    Args:
+        dataset: Dataset the statistics describe
+        profiles: DatasetProfiler.result() output
+    
+    Returns:
+        Number of statistics rows written
+    """
+    rows = []
+    scopes = [('', profiles['overall'])] + list(profiles['by_type'].items())
+    for equipment_type, columns in scopes:
+        for column, profile in columns.items():
+            rows.append(DatasetColumnStats(
+                dataset=dataset,
+                equipment_type=equipment_type,
+                column=column,
+                **profile
+            ))
+    
+    with transaction.atomic():
+        DatasetColumnStats.objects.filter(dataset=dataset).delete()
+        DatasetColumnStats.objects.bulk_create(rows, batch_size=get_batch_size())
+    return len(rows)
+
+
+def backfill_column_stats(dataset: Dataset, chunk_size: Optional[int] = None) -> int:
+    """
+    Compute column statistics for a dataset ingested before they existed.
+    
+    Columns are read from the dataset's column files when it has them,
+    otherwise records are read back from the database. Either way they are
+    processed in chunks, so memory use stays bounded.
+    
+    Returns:
+        Number of statistics rows written
+    """
+    chunk_size = chunk_size or get_chunk_size()
+    profiler = DatasetProfiler()
+    
+    columns = open_columns(dataset)
+    if columns is not None:
+        for start in range(0, len(columns), chunk_size):
+            stop = start + chunk_size
+            profiler.update(pd.DataFrame({
+                'Type': columns.types(start, stop),
+                'Flowrate': columns.flowrate[start:stop],
+                'Pressure': columns.pressure[start:stop],
+                'Temperature': columns.temperature[start:stop],
+            }))
+        return save_column_stats(dataset, profiler.result())
+    
+    fields = ['equipment_type', 'flowrate', 'pressure', 'temperature']
+    rows = EquipmentData.objects.filter(dataset=dataset).values_list(*fields)
+    
+    chunk = []
+    for row in rows.iterator(chunk_size=min(chunk_size, 2000)):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            profiler.update(_records_frame(chunk))
+            chunk = []
+    if chunk:
+        profiler.update(_records_frame(chunk))
+    
+    return save_column_stats(dataset, profiler.result())
+
+
+def _records_frame(rows) -> pd.DataFrame:
+    """DataFrame with the CSV column names DatasetProfiler expects"""
+    return pd.DataFrame(rows, columns=['Type', 'Flowrate', 'Pressure', 'Temperature'])
+
+
+def ingest_csv_file(dataset: Dataset, file_path: str, streaming: bool = False,
+                    on_progress: Optional[ProgressCallback] = None) -> Tuple[bool, Dict, str]:
+    """
+    Parse a CSV file and store its analytics and records on a dataset.
+    
+    WHAT: Runs the whole parse -> aggregate -> write pipeline.
+    WHY: Keeps upload_csv_view small and lets large files use streaming.
+    HOW:
+        - In-memory mode: process the whole file, then save analytics and
+          bulk insert all records in one transaction.
+        - Streaming mode: read the file in chunks and bulk insert each chunk
+          in its own transaction as soon as it is parsed. If processing
+          fails, the caller deletes the dataset (which removes partial rows).
+        - With COLUMNAR_SIDECAR, the cleaned columns are also written to
+          the dataset's column files (see columnar.py), which are only
+          moved into place once everything else succeeded.
+    
+    Args:
+        dataset: Dataset that owns the uploaded file
+        file_path: Path to the CSV file
+        streaming: Use the chunked parser (for files larger than memory)
+        on_progress: Optional callback, called as on_progress(phase, rows, fraction)
+    
+    Returns:
+        Tuple of (success, metrics, error_message)
+        - metrics: {'rows_written': int, 'write_seconds': float}
+    
+    Example:
+        success, metrics, error = ingest_csv_file(dataset, dataset.file.path)
+    """
+    if not sidecar_enabled():
+        return _ingest(dataset, file_path, streaming, on_progress)
+    
+    writer = ColumnarWriter(dataset.columns_path)
+    try:
+        success, metrics, error_msg = _ingest(dataset, file_path, streaming, on_progress, writer.append)
+    except Exception:
+        writer.abort()
+        raise
+    
+    if success:
+        writer.commit()
+    else:
+        writer.abort()
+    return success, metrics, error_msg
+
+
+def _ingest(dataset: Dataset, file_path: str, streaming: bool,
+            on_progress: Optional[ProgressCallback],
+            on_frame: Optional[Callable[[pd.DataFrame], None]] = None) -> Tuple[bool, Dict, str]:
+    """The parse -> aggregate -> write pipeline behind ingest_csv_file"""
+    if streaming:
+        metrics = {'rows_written': 0, 'write_seconds': 0.0}
+        
+        def write_chunk(records):
+            rows, seconds = write_equipment_records(dataset, records)
+            metrics['rows_written'] += rows
+            metrics['write_seconds'] += seconds
+        
+        success, data, error_msg = process_csv_file_streaming(
+            file_path, write_chunk, chunk_size=get_chunk_size(),
+            on_progress=on_progress, on_frame=on_frame
+        )
+        if not success:
+            return False, {}, error_msg
+        
+        save_analytics(dataset, data)
+        return True, metrics, ""
+    
+    success, data, error_msg = process_csv_file(file_path, on_progress=on_progress, on_frame=on_frame)
+    if not success:
+        return False, {}, error_msg
+    
+    if on_progress:
+        on_progress('writing', data['total_equipment'], 0.75)
+    
+    with transaction.atomic():
+        save_analytics(dataset, data)
+        rows_written, write_seconds = write_equipment_records(dataset, data['equipment_records'])
+    
+    return True, {'rows_written': rows_written, 'write_seconds': write_seconds}, ""
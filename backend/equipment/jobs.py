@@ -0,0 +1,257 @@
+"""
+Background Upload Processing.
+
+WHAT: Runs CSV processing for uploaded datasets outside the request.
+WHY: Parsing and inserting a large file inside the request ties up a
+     gunicorn worker and makes the client time out.
+HOW: upload_csv_view creates a Dataset and an UploadJob, then hands the job
+     id to a local thread pool. The worker updates the UploadJob row as it
+     moves through the parsing/aggregating/writing phases, so any process
+     can report progress from the database. A file the user has already
+     uploaded is copied from that dataset instead of being parsed (see
+     dedupe.py).
+
+Limitation: the pool lives in the web process, so queued and running jobs
+are lost when it restarts or crashes. Their UploadJob rows are left
+unfinished and their datasets pending/processing. Run
+`python manage.py recover_upload_jobs` after a restart (see
+recover_stale_jobs) to fail them - or re-run them with --requeue.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .dedupe import clone_dataset, find_duplicate, release_content_file
+from .ingest import ingest_csv_file, should_stream
+from .models import Dataset, DatasetColumnStats, EquipmentData, UploadJob
+from .pdf_generator import get_or_create_pdf_report
+from .retention import delete_dataset_objects, trim_user_datasets
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between progress writes for the same phase
+PROGRESS_UPDATE_INTERVAL = 0.5
+# Phases of a job that has not finished
+UNFINISHED_PHASES = [
+    UploadJob.PHASE_QUEUED, UploadJob.PHASE_PARSING,
+    UploadJob.PHASE_AGGREGATING, UploadJob.PHASE_WRITING,
+]
+# Error stored on jobs that were lost with their worker
+INTERRUPTED_ERROR = 'Processing was interrupted by a server restart - please upload the file again'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the process-wide worker pool, creating it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.UPLOAD_WORKERS,
+                thread_name_prefix='upload-worker'
+            )
+        return _executor
+
+
+def enqueue_upload_job(job: UploadJob) -> None:
+    """
+    Schedule a job for processing.
+    
+    With UPLOAD_WORKERS = 0 the job runs immediately in the calling thread
+    (useful for tests and single-process debugging). Otherwise it is
+    submitted to the thread pool once the current transaction commits, so
+    the worker always sees the job row.
+    """
+    if settings.UPLOAD_WORKERS <= 0:
+        run_upload_job(job.id)
+        return
+    
+    transaction.on_commit(lambda: get_executor().submit(_run_in_worker, job.id))
+
+
+def _run_in_worker(job_id: int) -> None:
+    """Thread pool entry point - manages the thread's database connection"""
+    close_old_connections()
+    try:
+        run_upload_job(job_id)
+    except Exception:
+        logger.exception('Upload job %s crashed', job_id)
+    finally:
+        connection.close()
+
+
+class JobProgress:
+    """
+    Progress callback that writes phase changes to the UploadJob row.
+    
+    Updates within the same phase are throttled to one write every
+    PROGRESS_UPDATE_INTERVAL seconds to keep database traffic low.
+    """
+    
+    def __init__(self, job: UploadJob):
+        self.job_id = job.id
+        self.phase = job.phase
+        self.last_write = 0.0
+    
+    def __call__(self, phase: str, rows: int, fraction: float) -> None:
+        now = time.monotonic()
+        if phase == self.phase and now - self.last_write < PROGRESS_UPDATE_INTERVAL:
+            return
+        self.phase = phase
+        self.last_write = now
+        UploadJob.objects.filter(pk=self.job_id).update(
+            phase=phase, rows_processed=rows, progress=fraction
+        )
+
+
+def run_upload_job(job_id: int) -> Optional[Dict]:
+    """
+    Process the CSV file attached to an UploadJob.
+    
+    Args:
+        job_id: Primary key of the UploadJob
+    
+    Returns:
+        Ingest metrics ({'rows_written', 'write_seconds'}, plus
+        'duplicate_of' if the records were copied from an identical
+        dataset) on success, None if processing failed (the error is
+        stored on the job)
+    """
+    job = UploadJob.objects.select_related('dataset').get(pk=job_id)
+    dataset = job.dataset
+    if dataset is None:
+        _finish_job(job, UploadJob.PHASE_FAILED, error='Dataset was deleted before processing started')
+        return None
+    
+    job.phase = UploadJob.PHASE_PARSING
+    job.started_at = timezone.now()
+    job.save(update_fields=['phase', 'started_at'])
+    Dataset.objects.filter(pk=dataset.pk).update(status=Dataset.STATUS_PROCESSING)
+    
+    file_path = dataset.file.path
+    try:
+        source = find_duplicate(dataset)
+        metrics = clone_dataset(source, dataset) if source is not None else None
+        if metrics is not None:
+            success, error_msg = True, ""
+        else:
+            success, metrics, error_msg = ingest_csv_file(
+                dataset,
+                file_path,
+                streaming=should_stream(os.path.getsize(file_path)),
+                on_progress=JobProgress(job)
+            )
+    except Exception as e:
+        logger.exception('Upload job %s failed', job_id)
+        success, metrics, error_msg = False, {}, f"Error processing CSV: {str(e)}"
+    
+    if not success:
+        # Remove the half-built dataset and its files (the CSV only if no
+        # other dataset uses it), keep the job for reporting
+        dataset.delete_files()
+        Dataset.objects.filter(pk=dataset.pk).delete()
+        if dataset.content_hash:
+            release_content_file(dataset.content_hash)
+        _finish_job(job, UploadJob.PHASE_FAILED, error=error_msg)
+        return None
+    
+    Dataset.objects.filter(pk=dataset.pk).update(status=Dataset.STATUS_READY)
+    _finish_job(job, UploadJob.PHASE_DONE, rows=metrics['rows_written'])
+    
+    if settings.PDF_PRECOMPUTE:
+        # Render the report now so the first download is instant
+        try:
+            get_or_create_pdf_report(Dataset.objects.get(pk=dataset.pk))
+        except Exception:
+            logger.exception('Could not pre-render PDF for dataset %s', dataset.pk)
+    
+    trim_user_datasets(dataset.user_id)
+    return metrics
+
+
+def _finish_job(job: UploadJob, phase: str, rows: Optional[int] = None, error: str = '') -> None:
+    """Mark a job as done or failed"""
+    job.phase = phase
+    job.error = error
+    job.finished_at = timezone.now()
+    update_fields = ['phase', 'error', 'finished_at']
+    if phase == UploadJob.PHASE_DONE:
+        job.progress = 1.0
+        update_fields.append('progress')
+    if rows is not None:
+        job.rows_processed = rows
+        update_fields.append('rows_processed')
+    job.save(update_fields=update_fields)
+
+
+def recover_stale_jobs(created_before: datetime, requeue: bool = False) -> Dict[str, int]:
+    """
+    Finish upload jobs whose worker was lost (server restart or crash).
+    
+    Jobs created before `created_before` that never finished are marked
+    failed and their half-built datasets deleted with their records and
+    files. Datasets still pending or processing from before the cutoff
+    without an unfinished job are deleted too. With requeue=True the jobs
+    are instead reset and run again in the calling thread.
+    
+    Args:
+        created_before: Only jobs and datasets older than this are touched,
+            so jobs still running in other processes are left alone
+        requeue: Re-run the jobs instead of failing them
+    
+    Returns:
+        {'failed': 2, 'requeued': 0, 'datasets': 2}
+    
+    Example:
+        recover_stale_jobs(timezone.now() - timedelta(minutes=60))
+    """
+    counts = {'failed': 0, 'requeued': 0, 'datasets': 0}
+    jobs = list(
+        UploadJob.objects.filter(phase__in=UNFINISHED_PHASES, created_at__lt=created_before)
+        .select_related('dataset')
+        .order_by('created_at')
+    )
+    
+    for job in jobs:
+        if requeue and job.dataset is not None:
+            _reset_job(job)
+            run_upload_job(job.id)
+            counts['requeued'] += 1
+        else:
+            _finish_job(job, UploadJob.PHASE_FAILED, error=INTERRUPTED_ERROR)
+            counts['failed'] += 1
+    
+    # Half-built datasets of failed jobs, and ones whose job was never created
+    stale = list(
+        Dataset.objects.filter(
+            status__in=[Dataset.STATUS_PENDING, Dataset.STATUS_PROCESSING],
+            uploaded_at__lt=created_before
+        )
+        .exclude(jobs__phase__in=UNFINISHED_PHASES)
+        .only('id', 'file', 'content_hash', 'uploaded_at')
+    )
+    counts['datasets'] = delete_dataset_objects(stale, background=False)['datasets']
+    return counts
+
+
+def _reset_job(job: UploadJob) -> None:
+    """Put a lost job back in the queue, dropping rows it had written"""
+    with transaction.atomic():
+        EquipmentData.objects.filter(dataset=job.dataset).delete()
+        DatasetColumnStats.objects.filter(dataset=job.dataset).delete()
+        Dataset.objects.filter(pk=job.dataset_id).update(status=Dataset.STATUS_PENDING)
+        UploadJob.objects.filter(pk=job.pk).update(
+            phase=UploadJob.PHASE_QUEUED, rows_processed=0, progress=0.0,
+            started_at=None, error=''
+        )
@@ -0,0 +1,68 @@
+"""
+Bulk dataset purge.
+
+WHAT: Deletes finished datasets beyond each user's retention count, or
+      older than a cutoff, across many users at once.
+WHY: Retention normally runs after each upload, so users who stop uploading
+     (or whose policy was lowered) keep old datasets forever.
+HOW: Selects dataset ids with retention.datasets_to_purge, then deletes
+     them set-based in batches with retention.delete_datasets.
+
+Usage (from the backend/ directory):
+    python manage.py purge_datasets
+    python manage.py purge_datasets --user alice --keep 2
+    python manage.py purge_datasets --older-than 90 --dry-run
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from equipment.retention import DELETE_BATCH_SIZE, datasets_to_purge, delete_datasets
+
+
+class Command(BaseCommand):
+    help = "Delete datasets beyond each user's retention count (or older than --older-than days)"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='usernames', metavar='USERNAME',
+                            help='Only purge this user (repeatable)')
+        parser.add_argument('--keep', type=int,
+                            help="Datasets kept per user (default: each user's retention count; 0 = all)")
+        parser.add_argument('--older-than', type=int, metavar='DAYS',
+                            help='Also delete every dataset uploaded more than DAYS days ago')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report what would be deleted without deleting it')
+    
+    def handle(self, *args, usernames=None, keep=None, older_than=None, dry_run=False, **options):
+        if keep is not None and keep < 0:
+            raise CommandError('--keep must be 0 or more')
+        if older_than is not None and older_than < 0:
+            raise CommandError('--older-than must be 0 or more')
+        
+        user_ids = None
+        if usernames:
+            users = dict(User.objects.filter(username__in=usernames).values_list('username', 'id'))
+            missing = sorted(set(usernames) - set(users))
+            if missing:
+                raise CommandError(f"Unknown user(s): {', '.join(missing)}")
+            user_ids = list(users.values())
+        
+        uploaded_before = timezone.now() - timedelta(days=older_than) if older_than is not None else None
+        dataset_ids = datasets_to_purge(user_ids, keep, uploaded_before)
+        
+        if dry_run:
+            self.stdout.write(f'Would delete {len(dataset_ids)} dataset(s)')
+            return
+        
+        totals = {'datasets': 0, 'records': 0}
+        for start in range(0, len(dataset_ids), DELETE_BATCH_SIZE):
+            # Files are removed inline: the command exits when it is done
+            deleted = delete_datasets(dataset_ids[start:start + DELETE_BATCH_SIZE], background=False)
+            for key in totals:
+                totals[key] += deleted[key]
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {totals['datasets']} dataset(s) and {totals['records']} record(s)"
+        ))
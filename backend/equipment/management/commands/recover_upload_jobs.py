@@ -0,0 +1,47 @@
+"""
+Recover lost upload jobs.
+
+WHAT: Fails (or re-runs) upload jobs that never finished and deletes the
+      half-built datasets they left behind.
+WHY: Jobs run on a thread pool inside the web process. After a restart or
+     crash the jobs it held are gone, but their rows stay queued or
+     running and their datasets stay pending forever.
+HOW: Selects jobs created more than --older-than minutes ago that are not
+     done or failed, then calls jobs.recover_stale_jobs. Run it after each
+     deploy or restart; the age cutoff keeps it away from jobs that other
+     processes are still working on.
+
+Usage (from the backend/ directory):
+    python manage.py recover_upload_jobs
+    python manage.py recover_upload_jobs --older-than 0 --requeue
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from equipment.jobs import recover_stale_jobs
+
+
+class Command(BaseCommand):
+    help = 'Fail or re-run upload jobs lost in a restart and delete their half-built datasets'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, metavar='MINUTES',
+                            help='Only jobs created at least MINUTES ago (default: UPLOAD_JOB_STALE_MINUTES)')
+        parser.add_argument('--requeue', action='store_true',
+                            help='Run the jobs again in this process instead of failing them')
+    
+    def handle(self, *args, older_than=None, requeue=False, **options):
+        if older_than is None:
+            older_than = settings.UPLOAD_JOB_STALE_MINUTES
+        if older_than < 0:
+            raise CommandError('--older-than must be 0 or more')
+        
+        counts = recover_stale_jobs(timezone.now() - timedelta(minutes=older_than), requeue=requeue)
+        self.stdout.write(self.style.SUCCESS(
+            f"Failed {counts['failed']} job(s), re-ran {counts['requeued']} job(s), "
+            f"deleted {counts['datasets']} dataset(s)"
+        ))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.10 on 2026-10-18 06:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', help_text='Processing state of the uploaded file', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='UploadJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phase', models.CharField(choices=[('queued', 'Queued'), ('parsing', 'Parsing'), ('aggregating', 'Aggregating'), ('writing', 'Writing'), ('done', 'Done'), ('failed', 'Failed')], default='queued', help_text='Current processing phase', max_length=20)),
+                ('rows_processed', models.IntegerField(default=0, help_text='Number of equipment rows processed so far')),
+                ('progress', models.FloatField(default=0.0, help_text='Fraction of work completed (0.0 - 1.0)')),
+                ('error', models.TextField(blank=True, default='', help_text='Error message if processing failed')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='When the job was queued')),
+                ('started_at', models.DateTimeField(blank=True, help_text='When a worker started processing', null=True)),
+                ('finished_at', models.DateTimeField(blank=True, help_text='When processing finished (successfully or not)', null=True)),
+                ('dataset', models.ForeignKey(blank=True, help_text='The dataset being processed', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='equipment.dataset')),
+                ('user', models.ForeignKey(help_text='The user who started this upload', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Upload Job',
+                'verbose_name_plural': 'Upload Jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
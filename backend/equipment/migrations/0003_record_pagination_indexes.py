@@ -0,0 +1,25 @@
+# Generated by Django 5.2.10 on 2026-10-18 06:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0002_upload_jobs'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='equipmentdata',
+            index=models.Index(fields=['dataset', 'flowrate', 'id'], name='equipment_ds_flowrate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipmentdata',
+            index=models.Index(fields=['dataset', 'pressure', 'id'], name='equipment_ds_pressure_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipmentdata',
+            index=models.Index(fields=['dataset', 'temperature', 'id'], name='equipment_ds_temp_idx'),
+        ),
+    ]
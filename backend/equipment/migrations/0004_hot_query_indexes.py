@@ -0,0 +1,27 @@
+# Generated by Django 5.2.10 on 2026-10-18 06:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0003_record_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dataset',
+            index=models.Index(fields=['user', '-uploaded_at'], name='dataset_user_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipmentdata',
+            index=models.Index(fields=['dataset', 'equipment_name'], name='equipment_ds_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipmentdata',
+            index=models.Index(fields=['dataset', 'equipment_type'], name='equipment_ds_type_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.10 on 2026-10-18 06:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0004_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(help_text='Original name of the uploaded file', max_length=255)),
+                ('total_size', models.BigIntegerField(help_text='Size of the complete file in bytes')),
+                ('received_bytes', models.BigIntegerField(default=0, help_text='Bytes received so far (offset of the next chunk)')),
+                ('status', models.CharField(choices=[('active', 'Active'), ('finalized', 'Finalized')], default='active', help_text='Upload state', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='When the upload was started')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='When the last chunk was received')),
+                ('dataset', models.ForeignKey(blank=True, help_text='Dataset created when the upload was finalized', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_sessions', to='equipment.dataset')),
+                ('user', models.ForeignKey(help_text='The user uploading the file', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Upload Session',
+                'verbose_name_plural': 'Upload Sessions',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
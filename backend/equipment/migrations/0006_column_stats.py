@@ -0,0 +1,38 @@
+# Generated by Django 5.2.10 on 2026-10-18 06:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    
+    dependencies = [
+        ('equipment', '0005_upload_sessions'),
+    ]
+    
+    operations = [
+        migrations.CreateModel(
+            name='DatasetColumnStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('equipment_type', models.CharField(blank=True, default='', help_text="Equipment type ('' for the whole dataset)", max_length=100)),
+                ('column', models.CharField(help_text='Numeric column (flowrate, pressure or temperature)', max_length=20)),
+                ('count', models.IntegerField(default=0, help_text='Number of values')),
+                ('min', models.FloatField(help_text='Smallest value', null=True)),
+                ('max', models.FloatField(help_text='Largest value', null=True)),
+                ('mean', models.FloatField(help_text='Mean value', null=True)),
+                ('variance', models.FloatField(default=0.0, help_text='Sample variance')),
+                ('p5', models.FloatField(help_text='Estimated 5th percentile', null=True)),
+                ('p50', models.FloatField(help_text='Estimated median', null=True)),
+                ('p95', models.FloatField(help_text='Estimated 95th percentile', null=True)),
+                ('sketch', models.TextField(default='{}', help_text='JSON quantile sketch (mergeable)')),
+                ('dataset', models.ForeignKey(help_text='The dataset these statistics describe', on_delete=django.db.models.deletion.CASCADE, related_name='column_stats', to='equipment.dataset')),
+            ],
+            options={
+                'verbose_name': 'Dataset Column Statistics',
+                'verbose_name_plural': 'Dataset Column Statistics',
+                'ordering': ['equipment_type', 'column'],
+                'constraints': [models.UniqueConstraint(fields=('dataset', 'equipment_type', 'column'), name='column_stats_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.10 on 2026-10-18 07:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    
+    dependencies = [
+        ('equipment', '0006_column_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+    
+    operations = [
+        migrations.CreateModel(
+            name='RetentionPolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('keep_datasets', models.PositiveIntegerField(help_text='Number of newest finished datasets to keep (0 = keep all)')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='When the policy was last changed')),
+                ('user', models.OneToOneField(help_text='The user this policy applies to', on_delete=django.db.models.deletion.CASCADE, related_name='retention_policy', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Retention Policy',
+                'verbose_name_plural': 'Retention Policies',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 07:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    
+    dependencies = [
+        ('equipment', '0007_retention_policy'),
+    ]
+    
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, default='', help_text='SHA-256 of the uploaded CSV (content-addressed file name)', max_length=64),
+        ),
+    ]
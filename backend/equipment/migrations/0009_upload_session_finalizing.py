@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 07:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0008_dataset_content_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='uploadsession',
+            name='status',
+            field=models.CharField(choices=[('active', 'Active'), ('finalizing', 'Finalizing'), ('finalized', 'Finalized')], default='active', help_text='Upload state', max_length=20),
+        ),
+    ]
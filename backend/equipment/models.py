@@ -6,8 +6,12 @@ WHY: Django uses these to create and manage the database automatically.
 HOW: Each class attribute becomes a column in the database.
 """
 
+import os
+import shutil
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 
 class Dataset(models.Model):
@@ -23,7 +27,21 @@ class Dataset(models.Model):
     - avg_pressure: Average pressure calculated from the CSV
     - avg_temperature: Average temperature calculated from the CSV
     - equipment_types: JSON string of equipment type distribution
+    - status: Processing state (pending, processing, ready, failed)
+    - content_hash: SHA-256 of the CSV ('' for files stored before
+      content-addressed storage); datasets with the same hash share one file
     """
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_READY = 'ready'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_READY, 'Ready'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
     user = models.ForeignKey(
         User, 
         on_delete=models.CASCADE,
@@ -59,15 +77,67 @@ class Dataset(models.Model):
         default='{}',
         help_text="JSON string containing equipment type distribution"
     )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_READY,
+        help_text="Processing state of the uploaded file"
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        db_index=True,
+        help_text="SHA-256 of the uploaded CSV (content-addressed file name)"
+    )
     
     class Meta:
         ordering = ['-uploaded_at']  # Newest first
         verbose_name = 'Dataset'
         verbose_name_plural = 'Datasets'
+        indexes = [
+            # History, retention trimming and summary lookups: user's newest first
+            models.Index(fields=['user', '-uploaded_at'], name='dataset_user_uploaded_idx'),
+        ]
     
     def __str__(self):
         """String representation of the dataset"""
         return f"Dataset {self.id} - {self.user.username} - {self.uploaded_at.strftime('%Y-%m-%d %H:%M')}"
+    
+    @property
+    def report_path(self):
+        """Path of the cached PDF report, stored next to the CSV file"""
+        if self.file and not self.content_hash:
+            return os.path.splitext(self.file.path)[0] + '.report.pdf'
+        # Content-addressed files are shared, so reports are per dataset
+        return os.path.join(settings.MEDIA_ROOT, 'datasets', f'dataset_{self.id}.report.pdf')
+    
+    @property
+    def columns_path(self):
+        """Folder of columnar record files, stored next to the CSV file"""
+        if self.file and not self.content_hash:
+            return os.path.splitext(self.file.path)[0] + '.columns'
+        return os.path.join(settings.MEDIA_ROOT, 'datasets', f'dataset_{self.id}.columns')
+    
+    def stored_paths(self, include_file=True):
+        """Files and folders kept on disk for this dataset"""
+        paths = [self.report_path, self.columns_path]
+        if self.file and include_file:
+            paths.append(self.file.path)
+        return paths
+    
+    def delete_files(self):
+        """
+        Remove the uploaded CSV, cached report and column files from disk.
+        
+        A content-addressed CSV can be shared, so it is left in place: call
+        dedupe.release_content_file once the dataset row is deleted.
+        """
+        for path in self.stored_paths(include_file=not self.content_hash):
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.exists(path):
+                os.remove(path)
 
 
 class EquipmentData(models.Model):
@@ -110,7 +180,323 @@ class EquipmentData(models.Model):
         ordering = ['equipment_name']
         verbose_name = 'Equipment Data'
         verbose_name_plural = 'Equipment Data'
+        indexes = [
+            # Records of a dataset in default (name) order, and type filtering
+            models.Index(fields=['dataset', 'equipment_name'], name='equipment_ds_name_idx'),
+            models.Index(fields=['dataset', 'equipment_type'], name='equipment_ds_type_idx'),
+            # Keyset pagination of /records/ ordered by a numeric column
+            models.Index(fields=['dataset', 'flowrate', 'id'], name='equipment_ds_flowrate_idx'),
+            models.Index(fields=['dataset', 'pressure', 'id'], name='equipment_ds_pressure_idx'),
+            models.Index(fields=['dataset', 'temperature', 'id'], name='equipment_ds_temp_idx'),
+        ]
     
     def __str__(self):
         """String representation of the equipment"""
         return f"{self.equipment_name} ({self.equipment_type})"
+
+
+class DatasetColumnStats(models.Model):
+    """
+    Statistics profile of one numeric column, computed at ingest.
+    
+    Fields:
+    - dataset: Link to the parent Dataset
+    - equipment_type: Type the profile covers ('' for all equipment)
+    - column: flowrate, pressure or temperature
+    - count / min / max / mean / variance: Running statistics
+      (sample variance)
+    - p5 / p50 / p95: Percentiles estimated from the quantile sketch
+    - sketch: JSON of the quantile sketch, so profiles can be merged later
+    """
+    dataset = models.ForeignKey(
+        Dataset,
+        on_delete=models.CASCADE,
+        related_name='column_stats',
+        help_text="The dataset these statistics describe"
+    )
+    equipment_type = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        help_text="Equipment type ('' for the whole dataset)"
+    )
+    column = models.CharField(
+        max_length=20,
+        help_text="Numeric column (flowrate, pressure or temperature)"
+    )
+    count = models.IntegerField(
+        default=0,
+        help_text="Number of values"
+    )
+    min = models.FloatField(
+        null=True,
+        help_text="Smallest value"
+    )
+    max = models.FloatField(
+        null=True,
+        help_text="Largest value"
+    )
+    mean = models.FloatField(
+        null=True,
+        help_text="Mean value"
+    )
+    variance = models.FloatField(
+        default=0.0,
+        help_text="Sample variance"
+    )
+    p5 = models.FloatField(
+        null=True,
+        help_text="Estimated 5th percentile"
+    )
+    p50 = models.FloatField(
+        null=True,
+        help_text="Estimated median"
+    )
+    p95 = models.FloatField(
+        null=True,
+        help_text="Estimated 95th percentile"
+    )
+    sketch = models.TextField(
+        default='{}',
+        help_text="JSON quantile sketch (mergeable)"
+    )
+    
+    class Meta:
+        ordering = ['equipment_type', 'column']
+        verbose_name = 'Dataset Column Statistics'
+        verbose_name_plural = 'Dataset Column Statistics'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dataset', 'equipment_type', 'column'],
+                name='column_stats_unique'
+            ),
+        ]
+    
+    def __str__(self):
+        """String representation of the statistics row"""
+        scope = self.equipment_type or 'all'
+        return f"Dataset {self.dataset_id} - {self.column} ({scope})"
+
+
+class UploadJob(models.Model):
+    """
+    Tracks background processing of an uploaded CSV file.
+    
+    Fields:
+    - user: Who started the upload
+    - dataset: The dataset being filled in (null if it was removed after failing)
+    - phase: Current step (queued, parsing, aggregating, writing, done, failed)
+    - rows_processed: Equipment rows processed so far
+    - progress: Fraction of the work completed (0.0 - 1.0)
+    - error: Error message if processing failed
+    - created_at / started_at / finished_at: Timing information
+    """
+    PHASE_QUEUED = 'queued'
+    PHASE_PARSING = 'parsing'
+    PHASE_AGGREGATING = 'aggregating'
+    PHASE_WRITING = 'writing'
+    PHASE_DONE = 'done'
+    PHASE_FAILED = 'failed'
+    PHASE_CHOICES = [
+        (PHASE_QUEUED, 'Queued'),
+        (PHASE_PARSING, 'Parsing'),
+        (PHASE_AGGREGATING, 'Aggregating'),
+        (PHASE_WRITING, 'Writing'),
+        (PHASE_DONE, 'Done'),
+        (PHASE_FAILED, 'Failed'),
+    ]
+    
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        help_text="The user who started this upload"
+    )
+    dataset = models.ForeignKey(
+        Dataset,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs',
+        help_text="The dataset being processed"
+    )
+    phase = models.CharField(
+        max_length=20,
+        choices=PHASE_CHOICES,
+        default=PHASE_QUEUED,
+        help_text="Current processing phase"
+    )
+    rows_processed = models.IntegerField(
+        default=0,
+        help_text="Number of equipment rows processed so far"
+    )
+    progress = models.FloatField(
+        default=0.0,
+        help_text="Fraction of work completed (0.0 - 1.0)"
+    )
+    error = models.TextField(
+        blank=True,
+        default='',
+        help_text="Error message if processing failed"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="When the job was queued"
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When a worker started processing"
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When processing finished (successfully or not)"
+    )
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Upload Job'
+        verbose_name_plural = 'Upload Jobs'
+    
+    def __str__(self):
+        """String representation of the job"""
+        return f"Job {self.id} - {self.phase}"
+    
+    @property
+    def is_finished(self):
+        """True once the job has either completed or failed"""
+        return self.phase in (self.PHASE_DONE, self.PHASE_FAILED)
+    
+    def eta_seconds(self):
+        """
+        Estimate remaining seconds from elapsed time and progress.
+        
+        Returns None if the job has not started or no progress was made yet.
+        """
+        if self.is_finished:
+            return 0.0
+        if not self.started_at or self.progress <= 0:
+            return None
+        elapsed = (timezone.now() - self.started_at).total_seconds()
+        return round(elapsed * (1 - self.progress) / self.progress, 1)
+
+
+class UploadSession(models.Model):
+    """
+    A resumable, chunked CSV upload in progress.
+    
+    Fields:
+    - user: Who is uploading
+    - file_name: Original name of the CSV file
+    - total_size: Size of the whole file in bytes
+    - received_bytes: Bytes written so far (the next chunk's offset)
+    - status: active, finalizing while the dataset is being created, or
+      finalized once it has been created
+    - dataset: The dataset created on finalize
+    - created_at / updated_at: Timing information (for expiring stale uploads)
+    """
+    STATUS_ACTIVE = 'active'
+    STATUS_FINALIZING = 'finalizing'
+    STATUS_FINALIZED = 'finalized'
+    STATUS_CHOICES = [
+        (STATUS_ACTIVE, 'Active'),
+        (STATUS_FINALIZING, 'Finalizing'),
+        (STATUS_FINALIZED, 'Finalized'),
+    ]
+    
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        help_text="The user uploading the file"
+    )
+    file_name = models.CharField(
+        max_length=255,
+        help_text="Original name of the uploaded file"
+    )
+    total_size = models.BigIntegerField(
+        help_text="Size of the complete file in bytes"
+    )
+    received_bytes = models.BigIntegerField(
+        default=0,
+        help_text="Bytes received so far (offset of the next chunk)"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_ACTIVE,
+        help_text="Upload state"
+    )
+    dataset = models.ForeignKey(
+        Dataset,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload_sessions',
+        help_text="Dataset created when the upload was finalized"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="When the upload was started"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="When the last chunk was received"
+    )
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Upload Session'
+        verbose_name_plural = 'Upload Sessions'
+    
+    def __str__(self):
+        """String representation of the upload session"""
+        return f"Upload {self.id} - {self.file_name} ({self.received_bytes}/{self.total_size})"
+    
+    @property
+    def part_path(self):
+        """Path of the partially uploaded file"""
+        return os.path.join(settings.MEDIA_ROOT, 'uploads', f'session_{self.id}.part')
+    
+    @property
+    def is_complete(self):
+        """True once every byte of the file has been received"""
+        return self.received_bytes >= self.total_size
+    
+    def delete_file(self):
+        """Remove the partial upload from disk"""
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
+
+
+class RetentionPolicy(models.Model):
+    """
+    How many finished datasets a user keeps.
+    
+    Users without a policy keep settings.DATASET_RETENTION_COUNT datasets.
+    
+    Fields:
+    - user: The user the policy applies to
+    - keep_datasets: Newest finished datasets kept (0 = keep every dataset)
+    - updated_at: When the policy was last changed
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='retention_policy',
+        help_text="The user this policy applies to"
+    )
+    keep_datasets = models.PositiveIntegerField(
+        help_text="Number of newest finished datasets to keep (0 = keep all)"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="When the policy was last changed"
+    )
+    
+    class Meta:
+        verbose_name = 'Retention Policy'
+        verbose_name_plural = 'Retention Policies'
+    
+    def __str__(self):
+        """String representation of the retention policy"""
+        return f"{self.user.username}: keep {self.keep_datasets or 'all'}"
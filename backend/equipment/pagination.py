@@ -0,0 +1,107 @@
+"""
+Keyset (Cursor) Pagination.
+
+WHAT: Helpers to page through large record sets without OFFSET.
+WHY: OFFSET pagination re-scans every skipped row, so page 1000 of a
+     200k-row dataset is as slow as reading the whole thing.
+HOW: Order by (column, id) and remember the last row's values in an opaque
+     cursor. The next page asks for rows strictly after that position,
+     which the database answers with an index seek.
+"""
+
+import base64
+import json
+import math
+from typing import List, Optional, Tuple
+
+from django.db.models import Q, QuerySet
+
+
+# Largest id a cursor may carry (signed 64-bit, what databases store)
+MAX_CURSOR_ID = 2 ** 63 - 1
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue"""
+
+
+def encode_cursor(value, row_id: int) -> str:
+    """
+    Encode the last row's ordering value and id into a URL-safe cursor.
+    
+    Example:
+        encode_cursor(150.5, 42)  # -> 'eyJ2IjogMTUwLjUsICJpZCI6IDQyfQ=='
+    """
+    payload = json.dumps({'v': value, 'id': row_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str, numeric: bool = False) -> Tuple[object, int]:
+    """
+    Decode a cursor back into (value, id); raise InvalidCursor if malformed.
+    
+    With numeric=True the value must be a finite number and is returned as
+    a float, so a crafted cursor cannot reach the query as a string or null.
+    The id must fit a signed 64-bit column, so it cannot overflow the
+    query parameter either.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        value, row_id = payload['v'], int(payload['id'])
+        if not 0 <= row_id <= MAX_CURSOR_ID:
+            raise ValueError('Cursor id is out of range')
+        if numeric:
+            value = float(value)
+            if not math.isfinite(value):
+                raise ValueError('Cursor value is not finite')
+        return value, row_id
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+
+
+def paginate_keyset(queryset: QuerySet, ordering: str, cursor: Optional[str],
+                    limit: int) -> Tuple[List, Optional[str]]:
+    """
+    Return one page of a queryset using keyset pagination.
+    
+    Args:
+        queryset: Filtered queryset to page through
+        ordering: Field name to order by, optionally prefixed with '-'.
+            Fields other than id must be numeric. The primary key is
+            always used as a tie-breaker.
+        cursor: Cursor from the previous page (None for the first page)
+        limit: Maximum number of rows to return
+    
+    Returns:
+        Tuple of (rows, next_cursor)
+        - next_cursor is None when there are no more rows
+    
+    Example:
+        rows, next_cursor = paginate_keyset(records, '-pressure', None, 100)
+    """
+    descending = ordering.startswith('-')
+    field = ordering.lstrip('-')
+    
+    if cursor:
+        value, row_id = decode_cursor(cursor, numeric=field != 'id')
+        if field == 'id':
+            after = Q(id__lt=row_id) if descending else Q(id__gt=row_id)
+        elif descending:
+            after = Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': row_id})
+        else:
+            after = Q(**{f'{field}__gt': value}) | Q(**{field: value, 'id__gt': row_id})
+        queryset = queryset.filter(after)
+    
+    if field == 'id':
+        order_by = ['-id'] if descending else ['id']
+    else:
+        order_by = [f'-{field}', '-id'] if descending else [field, 'id']
+    
+    # Fetch one extra row to find out whether another page exists
+    rows = list(queryset.order_by(*order_by)[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, field), last.id)
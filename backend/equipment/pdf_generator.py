@@ -4,40 +4,84 @@ PDF Report Generation.
 WHAT: Functions to generate PDF reports with charts and statistics.
 WHY: Users need downloadable reports of their equipment data.
 HOW: Use ReportLab to create PDFs with tables, text, and charts.
+     Each report is rendered once and cached on disk next to the CSV.
+     With caching disabled, reports are rendered into a spooled temporary
+     file and streamed from there, so no full in-memory copies are made.
 """
 
-import io
 import json
+import os
+import tempfile
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Table, LongTable, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.graphics.shapes import Drawing
 from reportlab.graphics.charts.barcharts import VerticalBarChart
 from reportlab.graphics.charts.piecharts import Pie
-from django.http import HttpResponse
+from django.conf import settings
+from django.http import FileResponse
+from .columnar import open_columns
 from .models import Dataset
 
 
-def generate_pdf_report(dataset: Dataset) -> HttpResponse:
+def iter_detail_rows(dataset: Dataset, limit: Optional[int] = None,
+                     chunk_size: int = 2000) -> Iterator[Tuple]:
+    """
+    Yield (name, type, flowrate, pressure, temperature) ordered by name.
+    
+    Same order as the records' default (equipment_name) ordering, with
+    upload order breaking ties. At most `limit` rows (None for all).
+    
+    A limited sample is read from EquipmentData, where the
+    (dataset, equipment_name) index answers it without sorting. The full
+    listing reads the dataset's column files when it has them.
+    """
+    columns = open_columns(dataset) if limit is None else None
+    if columns is None:
+        records = dataset.equipment_records.order_by('equipment_name', 'id').values_list(
+            'equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature'
+        )
+        if limit is not None:
+            records = records[:limit]
+        yield from records.iterator(chunk_size=chunk_size)
+        return
+    
+    # Stable sort, so equal names keep upload (id) order
+    names = np.array(columns.names())
+    order = np.argsort(names, kind='stable')
+    
+    for start in range(0, len(order), chunk_size):
+        rows = order[start:start + chunk_size]
+        yield from zip(
+            names[rows].tolist(),
+            [columns.type_names[code] for code in columns.type_codes[rows].tolist()],
+            columns.flowrate[rows].tolist(),
+            columns.pressure[rows].tolist(),
+            columns.temperature[rows].tolist()
+        )
+
+
+def build_pdf_report(dataset: Dataset, output, detail_rows=None) -> None:
     """
-    Generate a PDF report for a dataset.
+    Render the PDF report for a dataset.
     
     Args:
         dataset: Dataset instance to generate report for
-    
-    Returns:
-        HttpResponse with PDF file
+        output: File path or binary file-like object to write the PDF to
+        detail_rows: Number of records in the details table
+            (defaults to settings.PDF_DETAIL_ROWS, 0 means every record)
     
     Example:
-        return generate_pdf_report(dataset)
+        with open('report.pdf', 'wb') as f:
+            build_pdf_report(dataset, f)
     """
-    # Create a file-like buffer to receive PDF data
-    buffer = io.BytesIO()
-    
-    # Create the PDF object, using the buffer as its "file"
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    # Create the PDF object, writing straight to the output "file"
+    doc = SimpleDocTemplate(output, pagesize=letter)
     
     # Container for the 'Flowable' objects
     elements = []
@@ -162,24 +206,36 @@ def generate_pdf_report(dataset: Dataset) -> HttpResponse:
     except:
         pass
     
-    # Equipment Details Table (first 10 records)
-    details_heading = Paragraph("Equipment Details (Sample)", heading_style)
+    # Equipment Details Table (first PDF_DETAIL_ROWS records, or all of them)
+    if detail_rows is None:
+        detail_rows = settings.PDF_DETAIL_ROWS
+    full_detail = detail_rows <= 0
+    details_heading = Paragraph(
+        "Equipment Details" if full_detail else "Equipment Details (Sample)",
+        heading_style
+    )
     elements.append(details_heading)
     elements.append(Spacer(1, 6))
     
-    equipment_records = dataset.equipment_records.all()[:10]
-    
     details_data = [['Name', 'Type', 'Flowrate', 'Pressure', 'Temp']]
-    for record in equipment_records:
+    for name, eq_type, flowrate, pressure, temperature in iter_detail_rows(
+        dataset, None if full_detail else detail_rows
+    ):
         details_data.append([
-            record.equipment_name[:20],  # Truncate long names
-            record.equipment_type[:15],
-            f'{record.flowrate:.1f}',
-            f'{record.pressure:.1f}',
-            f'{record.temperature:.1f}'
+            name[:20],  # Truncate long names
+            eq_type[:15],
+            f'{flowrate:.1f}',
+            f'{pressure:.1f}',
+            f'{temperature:.1f}'
         ])
     
-    details_table = Table(details_data, colWidths=[1.8*inch, 1.3*inch, 1*inch, 1*inch, 1*inch])
+    # LongTable repeats the header row and splits efficiently across pages
+    table_class = LongTable if full_detail else Table
+    details_table = table_class(
+        details_data,
+        colWidths=[1.8*inch, 1.3*inch, 1*inch, 1*inch, 1*inch],
+        repeatRows=1
+    )
     details_table.setStyle(TableStyle([
         ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#6366f1')),
         ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
@@ -202,14 +258,94 @@ def generate_pdf_report(dataset: Dataset) -> HttpResponse:
     
     # Build PDF
     doc.build(elements)
+
+
+def get_or_create_pdf_report(dataset: Dataset) -> str:
+    """
+    Return the path of a dataset's PDF report, rendering it if needed.
+    
+    WHAT: Reports are rendered once and then reused from disk.
+    WHY: Datasets never change after upload, so the report never changes
+         either - rebuilding it on every download is wasted work.
+    HOW: Render to a temporary file in the same folder, then rename it into
+         place. The rename is atomic, so concurrent requests never see a
+         half-written report.
+    
+    Args:
+        dataset: Dataset instance (must be finished processing)
+    
+    Returns:
+        Absolute path of the cached PDF file
+    """
+    path = dataset.report_path
+    if os.path.exists(path):
+        return path
+    
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(suffix='.pdf.tmp', dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            build_pdf_report(dataset, tmp_file)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    
+    return path
+
+
+def spool_pdf_report(dataset: Dataset):
+    """
+    Render a dataset's PDF report into a spooled temporary file.
+    
+    WHAT: Uncached alternative to get_or_create_pdf_report.
+    WHY: Building into a BytesIO, copying it out with getvalue() and writing
+         that into an HttpResponse keeps three copies of the document in
+         memory per request.
+    HOW: ReportLab writes straight into a SpooledTemporaryFile. Small reports
+         stay in memory, larger ones roll over to disk once they pass
+         PDF_SPOOL_MAX_BYTES. The file is rewound and handed to
+         FileResponse, which streams it in blocks and closes (and so
+         deletes) it when the response is finished.
+    
+    Args:
+        dataset: Dataset instance (must be finished processing)
+    
+    Returns:
+        Binary file object positioned at the start of the PDF
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.PDF_SPOOL_MAX_BYTES, suffix='.pdf')
+    try:
+        build_pdf_report(dataset, spool)
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return spool
+
+
+def generate_pdf_report(dataset: Dataset) -> FileResponse:
+    """
+    Generate a PDF report download for a dataset.
     
-    # Get the value of the BytesIO buffer and write it to the response
-    pdf = buffer.getvalue()
-    buffer.close()
+    Args:
+        dataset: Dataset instance to generate report for
     
-    # Create the HttpResponse object with PDF headers
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="equipment_report_{dataset.id}.pdf"'
-    response.write(pdf)
+    Returns:
+        FileResponse streaming the cached PDF file
+        (or a spooled temporary file when PDF_CACHE_ENABLED is False)
     
-    return response
+    Example:
+        return generate_pdf_report(dataset)
+    """
+    if settings.PDF_CACHE_ENABLED:
+        pdf_file = open(get_or_create_pdf_report(dataset), 'rb')
+    else:
+        pdf_file = spool_pdf_report(dataset)
+    return FileResponse(
+        pdf_file,
+        as_attachment=True,
+        filename=f'equipment_report_{dataset.id}.pdf',
+        content_type='application/pdf'
+    )
@@ -0,0 +1,254 @@
+"""
+Dataset Retention.
+
+WHAT: Keeps each user's newest finished datasets and deletes the older
+      ones, either after an upload or in bulk (purge_datasets command).
+WHY: Trimming used to delete old datasets one at a time, inside the upload
+     job: an os.remove per file and a Model.delete() per dataset, each
+     running Django's deletion collector across every related table.
+HOW: The datasets to remove are selected with one query. Their rows go in
+     one transaction, one DELETE ... WHERE dataset_id IN (...) per table:
+     upload jobs and sessions keep their rows with dataset set to NULL,
+     and records, column stats and datasets are deleted with raw SQL.
+     The files are only unlinked once the transaction has committed, on
+     the upload worker pool, so a rolled-back delete never loses files and
+     the caller never waits on the filesystem. A content-addressed CSV is
+     only unlinked if no dataset still has its content_hash, checked at
+     that point (see dedupe.release_content_file).
+"""
+
+import logging
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q, QuerySet
+
+from .cache import invalidate_dataset_summary
+from .charts import invalidate_dataset_charts
+from .dedupe import release_content_file
+from .models import (
+    Dataset, DatasetColumnStats, EquipmentData, RetentionPolicy, UploadJob, UploadSession
+)
+
+logger = logging.getLogger(__name__)
+
+# Dataset ids per DELETE statement (keeps well under SQLite's variable limit)
+DELETE_BATCH_SIZE = 500
+
+
+def get_retention_count(user_id: int) -> int:
+    """
+    Number of finished datasets a user keeps (0 = all).
+    
+    Example:
+        get_retention_count(request.user.id)
+        # Returns: 5 (settings.DATASET_RETENTION_COUNT unless the user has a policy)
+    """
+    keep = RetentionPolicy.objects.filter(user_id=user_id).values_list('keep_datasets', flat=True).first()
+    return settings.DATASET_RETENTION_COUNT if keep is None else keep
+
+
+def datasets_to_trim(user_id: int, keep: int) -> List[int]:
+    """
+    Ids of a user's finished datasets beyond the newest `keep`.
+    
+    Datasets that are still being processed are never selected.
+    """
+    if keep <= 0:
+        return []
+    return list(
+        Dataset.objects.filter(user_id=user_id, status=Dataset.STATUS_READY)
+        .order_by('-uploaded_at')
+        .values_list('id', flat=True)[keep:]
+    )
+
+
+def kept_datasets(user_id: int) -> QuerySet:
+    """
+    A user's datasets that retention keeps, newest first.
+    
+    These are the newest `keep` finished datasets - the ones
+    datasets_to_trim leaves alone - plus any still being processed.
+    """
+    datasets = Dataset.objects.filter(user_id=user_id).order_by('-uploaded_at')
+    keep = get_retention_count(user_id)
+    if keep <= 0:
+        return datasets
+    newest_ready = datasets.filter(status=Dataset.STATUS_READY).values('id')[:keep]
+    return datasets.filter(Q(id__in=newest_ready) | ~Q(status=Dataset.STATUS_READY))
+
+
+def remove_paths(paths: Iterable[str]) -> None:
+    """Delete dataset files and folders, skipping ones that are already gone"""
+    for path in paths:
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logger.warning('Could not remove %s', path, exc_info=True)
+
+
+def remove_files(paths: Iterable[str], content_hashes: Iterable[str] = ()) -> None:
+    """Delete dataset files, then content-addressed CSVs no dataset uses any more"""
+    remove_paths(paths)
+    for content_hash in content_hashes:
+        try:
+            release_content_file(content_hash)
+        except OSError:
+            logger.warning('Could not remove the file of content %s', content_hash, exc_info=True)
+
+
+def _remove_in_worker(paths: List[str], content_hashes: List[str]) -> None:
+    """Thread pool entry point - release_content_file queries the database"""
+    close_old_connections()
+    try:
+        remove_files(paths, content_hashes)
+    except Exception:
+        logger.exception('Removing dataset files failed')
+    finally:
+        connection.close()
+
+
+def schedule_file_removal(paths: List[str], background: bool = True,
+                          content_hashes: Iterable[str] = ()) -> None:
+    """
+    Remove files once the current transaction commits.
+    
+    With background=True (and UPLOAD_WORKERS > 0) the removal runs on the
+    upload worker pool instead of the calling thread. Content-addressed
+    CSVs are passed by hash and only removed if they are unused by then.
+    """
+    content_hashes = sorted(set(content_hashes))
+    if not paths and not content_hashes:
+        return
+    
+    def remove():
+        if background and settings.UPLOAD_WORKERS > 0:
+            # jobs imports this module, so the pool is looked up lazily
+            from .jobs import get_executor
+            get_executor().submit(_remove_in_worker, paths, content_hashes)
+        else:
+            remove_files(paths, content_hashes)
+    
+    transaction.on_commit(remove)
+
+
+def _delete_rows(table: str, column: str, ids: List[int]) -> int:
+    """DELETE FROM table WHERE column IN (ids); returns the deleted row count"""
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(table)} WHERE {quote(column)} IN ({placeholders})', ids
+        )
+        return cursor.rowcount
+
+
+def delete_dataset_objects(datasets: List[Dataset], background: bool = True) -> Dict[str, int]:
+    """
+    Delete already-loaded datasets, their records and their files, set-based.
+    
+    Runs the same fixed number of queries per DELETE_BATCH_SIZE datasets,
+    however many records they hold: no rows are loaded and no delete
+    signals are sent.
+    
+    Args:
+        datasets: Datasets to delete (id, file, content_hash and uploaded_at
+            are used)
+        background: Unlink files on the worker pool (see schedule_file_removal)
+    
+    Returns:
+        {'datasets': 3, 'records': 150000} rows deleted
+    """
+    deleted = {'datasets': 0, 'records': 0}
+    if not datasets:
+        return deleted
+    
+    with transaction.atomic():
+        for start in range(0, len(datasets), DELETE_BATCH_SIZE):
+            ids = [dataset.id for dataset in datasets[start:start + DELETE_BATCH_SIZE]]
+            UploadJob.objects.filter(dataset_id__in=ids).update(dataset=None)
+            UploadSession.objects.filter(dataset_id__in=ids).update(dataset=None)
+            deleted['records'] += _delete_rows(EquipmentData._meta.db_table, 'dataset_id', ids)
+            _delete_rows(DatasetColumnStats._meta.db_table, 'dataset_id', ids)
+            deleted['datasets'] += _delete_rows(Dataset._meta.db_table, 'id', ids)
+        
+        # Content-addressed CSVs may be shared: they are released by hash
+        paths = [
+            path
+            for dataset in datasets
+            for path in dataset.stored_paths(include_file=not dataset.content_hash)
+        ]
+        hashes = [dataset.content_hash for dataset in datasets if dataset.content_hash]
+        schedule_file_removal(paths, background, content_hashes=hashes)
+    
+    for dataset in datasets:
+        invalidate_dataset_summary(dataset)
+        invalidate_dataset_charts(dataset)
+    return deleted
+
+
+def delete_datasets(dataset_ids: Iterable[int], background: bool = True) -> Dict[str, int]:
+    """
+    Delete datasets by id (see delete_dataset_objects).
+    
+    Example:
+        delete_datasets(datasets_to_trim(user.id, keep=5))
+        # Returns: {'datasets': 2, 'records': 20000}
+    """
+    datasets = list(
+        Dataset.objects.filter(id__in=list(dataset_ids)).only('id', 'file', 'content_hash', 'uploaded_at')
+    )
+    return delete_dataset_objects(datasets, background)
+
+
+def trim_user_datasets(user_id: int, keep: Optional[int] = None) -> Dict[str, int]:
+    """
+    Keep only the user's newest finished datasets.
+    
+    Args:
+        user_id: User whose datasets are trimmed
+        keep: Datasets to keep (default: the user's retention count)
+    
+    Returns:
+        Deleted row counts (see delete_datasets)
+    """
+    if keep is None:
+        keep = get_retention_count(user_id)
+    return delete_datasets(datasets_to_trim(user_id, keep))
+
+
+def datasets_to_purge(user_ids: Optional[List[int]] = None, keep: Optional[int] = None,
+                      uploaded_before: Optional[datetime] = None) -> List[int]:
+    """
+    Ids of finished datasets to remove in a bulk purge.
+    
+    Args:
+        user_ids: Only these users (default: every user with datasets)
+        keep: Datasets kept per user (default: each user's retention count)
+        uploaded_before: Also select every dataset uploaded before this time
+    
+    Returns:
+        Sorted dataset ids
+    """
+    ready = Dataset.objects.filter(status=Dataset.STATUS_READY)
+    if user_ids is not None:
+        ready = ready.filter(user_id__in=user_ids)
+    
+    selected = set()
+    if uploaded_before is not None:
+        selected.update(ready.filter(uploaded_at__lt=uploaded_before).values_list('id', flat=True))
+    
+    policies = dict(RetentionPolicy.objects.values_list('user_id', 'keep_datasets'))
+    for user_id in ready.order_by().values_list('user_id', flat=True).distinct():
+        user_keep = keep if keep is not None else policies.get(user_id, settings.DATASET_RETENTION_COUNT)
+        selected.update(datasets_to_trim(user_id, user_keep))
+    return sorted(selected)
@@ -8,7 +8,7 @@ HOW: Define which fields to include and how to validate them.
 
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Dataset, EquipmentData
+from .models import Dataset, EquipmentData, UploadJob, UploadSession
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -49,6 +49,7 @@ class DatasetSerializer(serializers.ModelSerializer):
             'avg_pressure',
             'avg_temperature',
             'equipment_types',
+            'status',
             'equipment_records'
         ]
         read_only_fields = [
@@ -57,7 +58,19 @@ class DatasetSerializer(serializers.ModelSerializer):
             'avg_flowrate',
             'avg_pressure',
             'avg_temperature',
-            'equipment_types'
+            'equipment_types',
+            'status'
+        ]
+
+
+class DatasetSummarySerializer(DatasetSerializer):
+    """Dataset details without the nested equipment records"""
+    equipment_records = None
+    
+    class Meta(DatasetSerializer.Meta):
+        fields = [
+            field for field in DatasetSerializer.Meta.fields
+            if field != 'equipment_records'
         ]
 
 
@@ -75,5 +88,48 @@ class DatasetListSerializer(serializers.ModelSerializer):
             'avg_flowrate',
             'avg_pressure',
             'avg_temperature',
-            'equipment_types'
+            'equipment_types',
+            'status'
+        ]
+
+
+class UploadJobSerializer(serializers.ModelSerializer):
+    """Serializer for background upload jobs (used by the job status endpoint)"""
+    dataset = DatasetListSerializer(read_only=True)
+    eta_seconds = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = UploadJob
+        fields = [
+            'id',
+            'dataset',
+            'phase',
+            'rows_processed',
+            'progress',
+            'eta_seconds',
+            'error',
+            'created_at',
+            'started_at',
+            'finished_at'
+        ]
+    
+    def get_eta_seconds(self, obj):
+        """Estimated seconds until the job finishes (None if unknown)"""
+        return obj.eta_seconds()
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Serializer for resumable upload sessions"""
+    
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id',
+            'file_name',
+            'total_size',
+            'received_bytes',
+            'status',
+            'dataset',
+            'created_at',
+            'updated_at'
         ]
@@ -0,0 +1,283 @@
+"""
+Mergeable Column Statistics.
+
+WHAT: Count, min, max, mean, variance and p5/p50/p95 for every numeric
+      column, overall and per equipment type.
+WHY: Datasets only stored averages, so dashboards pulled every record to
+     work out spreads and percentiles on the client.
+HOW: Each CSV chunk is summarized with NumPy (one sort by type, then
+     vectorized reductions per slice) and merged into running totals:
+     - RunningStats merges count/mean/M2 with Chan et al.'s parallel
+       variance formula, so chunks can arrive in any order.
+     - QuantileSketch is a DDSketch-style log-bucketed histogram. Every
+       quantile it returns is within `relative_accuracy` of the true
+       value, and two sketches merge by adding bucket counts.
+"""
+
+import json
+import math
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# CSV column -> EquipmentData field
+STAT_COLUMNS = {
+    'Flowrate': 'flowrate',
+    'Pressure': 'pressure',
+    'Temperature': 'temperature',
+}
+QUANTILES = {'p5': 0.05, 'p50': 0.50, 'p95': 0.95}
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+
+class RunningStats:
+    """
+    Count, mean, M2 (sum of squared deviations), min and max of a column.
+    
+    Example:
+        stats = RunningStats.from_array(np.array([1.0, 2.0, 3.0]))
+        stats.merge(RunningStats.from_array(np.array([4.0])))
+        stats.mean  # 2.5
+    """
+    
+    def __init__(self, count=0, mean=0.0, m2=0.0, minimum=math.inf, maximum=-math.inf):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = minimum
+        self.max = maximum
+    
+    @classmethod
+    def from_array(cls, values: np.ndarray) -> 'RunningStats':
+        """Summarize an array of floats in one vectorized pass (NaN and +/-inf are skipped)"""
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return cls()
+        mean = float(values.mean())
+        return cls(
+            count=int(len(values)),
+            mean=mean,
+            m2=float(np.square(values - mean).sum()),
+            minimum=float(values.min()),
+            maximum=float(values.max())
+        )
+    
+    def merge(self, other: 'RunningStats') -> 'RunningStats':
+        """Combine another summary into this one (Chan et al.)"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+    
+    @property
+    def variance(self) -> float:
+        """Sample variance (n - 1 denominator, like pandas .var())"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+
+class QuantileSketch:
+    """
+    DDSketch-style quantile sketch with relative-error guarantees.
+    
+    A positive value x goes into bucket ceil(log_gamma(x)), where
+    gamma = (1 + a) / (1 - a). Negative values use a mirrored store, and
+    values too close to zero are counted separately. Memory grows with
+    the log of the value range, not with the number of values.
+    """
+    
+    # Smallest magnitude tracked in log buckets; anything smaller counts as 0
+    MIN_INDEXABLE = 1e-9
+    
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+    
+    def _add_to_store(self, store: Dict[int, int], magnitudes: np.ndarray) -> None:
+        if len(magnitudes) == 0:
+            return
+        keys = np.ceil(np.log(magnitudes) / self.log_gamma).astype(np.int64)
+        buckets, counts = np.unique(keys, return_counts=True)
+        for bucket, count in zip(buckets.tolist(), counts.tolist()):
+            store[bucket] = store.get(bucket, 0) + count
+    
+    def add_array(self, values: np.ndarray) -> 'QuantileSketch':
+        """Add every finite value of a float array"""
+        values = values[np.isfinite(values)]
+        magnitudes = np.abs(values)
+        tiny = magnitudes < self.MIN_INDEXABLE
+        self.zero_count += int(tiny.sum())
+        self._add_to_store(self.positive, values[(values > 0) & ~tiny])
+        self._add_to_store(self.negative, -values[(values < 0) & ~tiny])
+        self.count += len(values)
+        return self
+    
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """Add another sketch's counts (both must use the same accuracy)"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError('Cannot merge sketches with different relative accuracy')
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for bucket, count in other_store.items():
+                store[bucket] = store.get(bucket, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+    
+    def _bucket_value(self, bucket: int) -> float:
+        """Representative value of a bucket (within relative_accuracy of any member)"""
+        return 2 * self.gamma ** bucket / (self.gamma + 1)
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate the q-th quantile (0 <= q <= 1).
+        
+        Returns None for an empty sketch.
+        """
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        
+        # Most negative values first: largest magnitude buckets
+        for bucket in sorted(self.negative, reverse=True):
+            seen += self.negative[bucket]
+            if seen > rank:
+                return -self._bucket_value(bucket)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for bucket in sorted(self.positive):
+            seen += self.positive[bucket]
+            if seen > rank:
+                return self._bucket_value(bucket)
+        return self._bucket_value(max(self.positive)) if self.positive else 0.0
+    
+    def to_dict(self) -> Dict:
+        """JSON-serializable form (bucket keys become strings)"""
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'zero_count': self.zero_count,
+            'positive': {str(k): self.positive[k] for k in sorted(self.positive)},
+            'negative': {str(k): self.negative[k] for k in sorted(self.negative)},
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'QuantileSketch':
+        """Rebuild a sketch saved with to_dict()"""
+        sketch = cls(data['relative_accuracy'])
+        sketch.zero_count = data['zero_count']
+        sketch.positive = {int(k): v for k, v in data['positive'].items()}
+        sketch.negative = {int(k): v for k, v in data['negative'].items()}
+        sketch.count = sketch.zero_count + sum(sketch.positive.values()) + sum(sketch.negative.values())
+        return sketch
+
+
+class ColumnProfile:
+    """RunningStats plus a QuantileSketch for one column"""
+    
+    def __init__(self):
+        self.stats = RunningStats()
+        self.sketch = QuantileSketch()
+    
+    def add_array(self, values: np.ndarray) -> None:
+        self.stats.merge(RunningStats.from_array(values))
+        self.sketch.add_array(values)
+    
+    def merge(self, other: 'ColumnProfile') -> 'ColumnProfile':
+        self.stats.merge(other.stats)
+        self.sketch.merge(other.sketch)
+        return self
+    
+    def summary(self) -> Dict:
+        """Plain numbers for storage and the API"""
+        data = {
+            'count': self.stats.count,
+            'min': self.stats.min if self.stats.count else None,
+            'max': self.stats.max if self.stats.count else None,
+            'mean': self.stats.mean if self.stats.count else None,
+            'variance': self.stats.variance,
+        }
+        for name, q in QUANTILES.items():
+            value = self.sketch.quantile(q)
+            # Keep bucket estimates inside the observed range
+            if value is not None:
+                value = min(max(value, self.stats.min), self.stats.max)
+            data[name] = value
+        return data
+
+
+class DatasetProfiler:
+    """
+    Builds column profiles for a dataset, overall and per equipment type.
+    
+    Example:
+        profiler = DatasetProfiler()
+        for chunk in chunks:
+            profiler.update(chunk)
+        profiles = profiler.result()
+    """
+    
+    def __init__(self):
+        self.overall = {field: ColumnProfile() for field in STAT_COLUMNS.values()}
+        self.by_type: Dict[str, Dict[str, ColumnProfile]] = {}
+    
+    def update(self, df: pd.DataFrame) -> None:
+        """Add a cleaned chunk (standardized column names)"""
+        if len(df) == 0:
+            return
+        
+        # Sort once by type so each type is a contiguous slice
+        codes, type_names = pd.factorize(df['Type'].astype(str), sort=False)
+        order = np.argsort(codes, kind='stable')
+        boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(order)]))
+        
+        for column, field in STAT_COLUMNS.items():
+            values = df[column].to_numpy(dtype='float64')
+            self.overall[field].add_array(values)
+            
+            sorted_values = values[order]
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                eq_type = type_names[codes[order[start]]]
+                profiles = self.by_type.setdefault(
+                    eq_type, {f: ColumnProfile() for f in STAT_COLUMNS.values()}
+                )
+                profiles[field].add_array(sorted_values[start:end])
+    
+    def result(self) -> Dict:
+        """
+        Return the profiles as plain data.
+        
+        Returns:
+            {'overall': {field: profile}, 'by_type': {type: {field: profile}}}
+            where profile = summary() plus the serialized 'sketch'
+        """
+        def dump(profile: ColumnProfile) -> Dict:
+            data = profile.summary()
+            data['sketch'] = json.dumps(profile.sketch.to_dict())
+            return data
+        
+        return {
+            'overall': {field: dump(p) for field, p in self.overall.items()},
+            'by_type': {
+                eq_type: {field: dump(p) for field, p in profiles.items()}
+                for eq_type, profiles in self.by_type.items()
+            }
+        }
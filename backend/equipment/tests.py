@@ -8,15 +8,19 @@ HOW: Uses Django TestCase with temporary database and files
 
 import os
 import json
-from django.test import TestCase, Client
+import unittest
+from django.db import connection
+from django.test import TestCase, Client, override_settings
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework.authtoken.models import Token
-from .models import Dataset, EquipmentData
+from .export import parquet_available
+from .models import Dataset, EquipmentData, UploadJob, UploadSession
 
 
+@override_settings(UPLOAD_ASYNC=False)
 class UploadCSVTestCase(TestCase):
-    """Test CSV upload functionality"""
+    """Test CSV upload functionality (synchronous processing)"""
     
     def setUp(self):
         """Set up test user and client"""
@@ -58,6 +62,77 @@ Heat Exchanger C,Heat Exchanger,175.3,3.5,40.2"""
         self.assertEqual(Dataset.objects.count(), 1)
         self.assertEqual(EquipmentData.objects.count(), 3)
         
+    def test_upload_reports_write_metrics(self):
+        """Test that records are bulk written and write metrics are returned"""
+        rows = '\n'.join(f"Pump {i},Pump,{100 + i},2.0,80.0" for i in range(25))
+        csv_content = f"Equipment Name,Type,Flowrate,Pressure,Temperature\n{rows}".encode()
+        
+        csv_file = SimpleUploadedFile(
+            "test_bulk.csv",
+            csv_content,
+            content_type="text/csv"
+        )
+        
+        with self.settings(EQUIPMENT_BULK_BATCH_SIZE=10):
+            response = self.client.post(
+                '/api/upload-csv/',
+                {'file': csv_file},
+                HTTP_AUTHORIZATION=f'Token {self.token.key}'
+            )
+        
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['rows_written'], 25)
+        self.assertIn('write_time_ms', response.json())
+        self.assertEqual(EquipmentData.objects.count(), 25)
+        
+    def test_upload_streaming_mode(self):
+        """Test that large-file streaming mode gives the same analytics"""
+        csv_content = b"""Equipment Name,Type,Flowrate,Pressure,Temperature
+Reactor A,Reactor,150.5,2.3,120.0
+Pump B,Pump,200.0,1.8,85.5
+Pump C,Pump,bad,1.8,85.5
+Heat Exchanger C,Heat Exchanger,175.3,3.5,40.2
+Pump D,Pump,120.0,2.0,60.0"""
+        
+        csv_file = SimpleUploadedFile(
+            "test_streaming.csv",
+            csv_content,
+            content_type="text/csv"
+        )
+        
+        with self.settings(CSV_STREAMING_THRESHOLD_MB=0, CSV_CHUNK_SIZE=2):
+            response = self.client.post(
+                '/api/upload-csv/',
+                {'file': csv_file},
+                HTTP_AUTHORIZATION=f'Token {self.token.key}'
+            )
+        
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(data['total_equipment'], 4)
+        self.assertEqual(data['rows_written'], 4)
+        self.assertEqual(data['avg_flowrate'], round((150.5 + 200.0 + 175.3 + 120.0) / 4, 2))
+        self.assertEqual(json.loads(data['equipment_types']), {'Pump': 2, 'Reactor': 1, 'Heat Exchanger': 1})
+        self.assertEqual(EquipmentData.objects.count(), 4)
+        
+    def test_upload_size_limit_setting(self):
+        """Test that the upload size cap comes from settings"""
+        csv_file = SimpleUploadedFile(
+            "test_large.csv",
+            b"Equipment Name,Type,Flowrate,Pressure,Temperature\n" + b"x" * 2048,
+            content_type="text/csv"
+        )
+        
+        with self.settings(MAX_UPLOAD_SIZE_MB=0):
+            response = self.client.post(
+                '/api/upload-csv/',
+                {'file': csv_file},
+                HTTP_AUTHORIZATION=f'Token {self.token.key}'
+            )
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('limit', response.json()['error'])
+        
     def test_upload_csv_case_insensitive_columns(self):
         """Test that column names are case-insensitive"""
         # CSV with lowercase column names
@@ -185,6 +260,649 @@ Reactor {i},Reactor,150.5,2.3,120.0""".encode()
         self.assertEqual(Dataset.objects.filter(user=self.user).count(), 5)
 
 
+@override_settings(UPLOAD_ASYNC=True, UPLOAD_WORKERS=0)
+class AsyncUploadTestCase(TestCase):
+    """Test background upload processing and the job status endpoint"""
+    
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        
+    def upload(self, csv_content):
+        """Upload CSV content and return the response"""
+        csv_file = SimpleUploadedFile(
+            "test_async.csv",
+            csv_content,
+            content_type="text/csv"
+        )
+        return self.client.post(
+            '/api/upload-csv/',
+            {'file': csv_file},
+            HTTP_AUTHORIZATION=f'Token {self.token.key}'
+        )
+        
+    def test_upload_returns_job(self):
+        """Test that upload returns 202 with a job that can be polled"""
+        response = self.upload(b"""Equipment Name,Type,Flowrate,Pressure,Temperature
+Reactor A,Reactor,150.5,2.3,120.0
+Pump B,Pump,200.0,1.8,85.5""")
+        
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['id']
+        self.assertEqual(response.json()['status_url'], f'/api/jobs/{job_id}/')
+        
+        response = self.client.get(
+            f'/api/jobs/{job_id}/',
+            HTTP_AUTHORIZATION=f'Token {self.token.key}'
+        )
+        self.assertEqual(response.status_code, 200)
+        job = response.json()
+        self.assertEqual(job['phase'], 'done')
+        self.assertEqual(job['rows_processed'], 2)
+        self.assertEqual(job['eta_seconds'], 0.0)
+        self.assertEqual(job['dataset']['status'], 'ready')
+        self.assertEqual(job['dataset']['total_equipment'], 2)
+        
+    def test_failed_job_reports_error(self):
+        """Test that a failed job keeps its error and removes the dataset"""
+        response = self.upload(b"""Equipment Name,Type,Flowrate
+Reactor A,Reactor,150.5""")
+        
+        self.assertEqual(response.status_code, 202)
+        job = UploadJob.objects.get(id=response.json()['id'])
+        self.assertEqual(job.phase, 'failed')
+        self.assertIn('Missing required columns', job.error)
+        self.assertIsNone(job.dataset)
+        self.assertEqual(Dataset.objects.count(), 0)
+        
+    def test_job_belongs_to_user(self):
+        """Test that users cannot see other users' jobs"""
+        other = User.objects.create_user(username='other', password='otherpass123')
+        job = UploadJob.objects.create(user=other)
+        
+        response = self.client.get(
+            f'/api/jobs/{job.id}/',
+            HTTP_AUTHORIZATION=f'Token {self.token.key}'
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(UPLOAD_WORKERS=0, UPLOAD_JOB_STALE_MINUTES=60)
+class StaleJobRecoveryTestCase(TestCase):
+    """Test recovery of upload jobs lost in a server restart"""
+    
+    CSV = "Equipment Name,Type,Flowrate,Pressure,Temperature\nPump A,Pump,1.0,2.0,3.0\nValve B,Valve,4.0,5.0,6.0\n"
+    
+    def setUp(self):
+        import tempfile
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        os.makedirs(os.path.join(self.media_root, 'datasets'))
+        
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+    
+    def tearDown(self):
+        import shutil
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+    
+    def make_job(self, minutes_ago, phase=UploadJob.PHASE_WRITING, with_job=True):
+        """A half-processed dataset (one record written) and its job, created minutes_ago"""
+        from datetime import timedelta
+        from django.utils import timezone
+        
+        dataset = Dataset.objects.create(user=self.user, status=Dataset.STATUS_PROCESSING)
+        dataset.file.name = f'datasets/dataset_{dataset.id}.csv'
+        dataset.save(update_fields=['file'])
+        with open(dataset.file.path, 'w') as f:
+            f.write(self.CSV)
+        EquipmentData.objects.create(dataset=dataset, equipment_name='Pump A', equipment_type='Pump',
+                                     flowrate=1.0, pressure=2.0, temperature=3.0)
+        
+        created = timezone.now() - timedelta(minutes=minutes_ago)
+        Dataset.objects.filter(pk=dataset.pk).update(uploaded_at=created)
+        if not with_job:
+            return dataset, None
+        job = UploadJob.objects.create(user=self.user, dataset=dataset, phase=phase)
+        UploadJob.objects.filter(pk=job.pk).update(created_at=created)
+        return dataset, job
+    
+    def recover(self, *args):
+        from io import StringIO
+        from django.core.management import call_command
+        
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('recover_upload_jobs', *args, stdout=out)
+        return out.getvalue()
+    
+    def test_stale_jobs_are_failed(self):
+        """Test that lost jobs fail and their half-built datasets are removed"""
+        stale, stale_job = self.make_job(minutes_ago=90)
+        orphan, _ = self.make_job(minutes_ago=90, with_job=False)
+        running, running_job = self.make_job(minutes_ago=5, phase=UploadJob.PHASE_PARSING)
+        
+        output = self.recover()
+        
+        self.assertIn('Failed 1 job(s), re-ran 0 job(s), deleted 2 dataset(s)', output)
+        stale_job.refresh_from_db()
+        self.assertEqual(stale_job.phase, UploadJob.PHASE_FAILED)
+        self.assertIn('interrupted', stale_job.error)
+        self.assertIsNone(stale_job.dataset_id)
+        self.assertFalse(os.path.exists(stale.file.path))
+        self.assertFalse(Dataset.objects.filter(pk=orphan.pk).exists())
+        
+        # A job newer than the cutoff may still be running elsewhere
+        running_job.refresh_from_db()
+        self.assertEqual(running_job.phase, UploadJob.PHASE_PARSING)
+        self.assertEqual(list(Dataset.objects.values_list('id', flat=True)), [running.id])
+    
+    def test_requeue_reprocesses_jobs(self):
+        """Test that --requeue drops partial rows and runs the job again"""
+        dataset, job = self.make_job(minutes_ago=90)
+        
+        output = self.recover('--requeue')
+        
+        self.assertIn('re-ran 1 job(s)', output)
+        job.refresh_from_db()
+        dataset.refresh_from_db()
+        self.assertEqual(job.phase, UploadJob.PHASE_DONE)
+        self.assertEqual(dataset.status, Dataset.STATUS_READY)
+        self.assertEqual(
+            list(dataset.equipment_records.order_by('equipment_name').values_list('equipment_name', flat=True)),
+            ['Pump A', 'Valve B']
+        )
+
+
+@override_settings(UPLOAD_ASYNC=True, UPLOAD_WORKERS=0, UPLOAD_CHUNK_MAX_MB=1)
+class ChunkedUploadTestCase(TestCase):
+    """Test the resumable chunked upload API"""
+    
+    CSV = (b"Equipment Name,Type,Flowrate,Pressure,Temperature\n"
+           + b"".join(b"Pump %d,Pump,100.0,2.0,80.0\n" % i for i in range(200)))
+    
+    def setUp(self):
+        import tempfile
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+        
+    def tearDown(self):
+        import shutil
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        
+    def start(self, total_size=None):
+        """Create an upload session and return its id"""
+        response = self.client.post('/api/uploads/', {
+            'file_name': 'plant.csv',
+            'total_size': len(self.CSV) if total_size is None else total_size
+        }, content_type='application/json', **self.auth)
+        self.assertEqual(response.status_code, 201)
+        return response.json()['id']
+        
+    def put_chunk(self, session_id, offset, chunk, checksum=None):
+        """PUT a raw chunk at offset"""
+        import hashlib
+        return self.client.put(
+            f'/api/uploads/{session_id}/chunk/?offset={offset}',
+            chunk,
+            content_type='application/octet-stream',
+            HTTP_X_CHUNK_SHA256=checksum or hashlib.sha256(chunk).hexdigest(),
+            **self.auth
+        )
+        
+    def test_chunked_upload_creates_dataset(self):
+        """Test that chunks are assembled and processed on finalize"""
+        import hashlib
+        session_id = self.start()
+        for offset in range(0, len(self.CSV), 1000):
+            response = self.put_chunk(session_id, offset, self.CSV[offset:offset + 1000])
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['received_bytes'], len(self.CSV))
+        
+        response = self.client.post(
+            f'/api/uploads/{session_id}/finalize/',
+            {'sha256': hashlib.sha256(self.CSV).hexdigest()},
+            content_type='application/json', **self.auth
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['phase'], 'done')
+        
+        dataset = Dataset.objects.get(id=response.json()['dataset']['id'])
+        self.assertEqual(dataset.total_equipment, 200)
+        self.assertEqual(dataset.content_hash, hashlib.sha256(self.CSV).hexdigest())
+        with open(dataset.file.path, 'rb') as f:
+            self.assertEqual(f.read(), self.CSV)
+        self.assertFalse(os.path.exists(UploadSession.objects.get(id=session_id).part_path))
+        
+    def test_bad_checksum_discards_chunk(self):
+        """Test that a corrupted chunk is rejected and can be re-sent"""
+        session_id = self.start()
+        response = self.put_chunk(session_id, 0, self.CSV[:1000], checksum='0' * 64)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json()['received_bytes'], 0)
+        self.assertEqual(os.path.getsize(UploadSession.objects.get(id=session_id).part_path), 0)
+        
+        response = self.put_chunk(session_id, 0, self.CSV[:1000])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['received_bytes'], 1000)
+        
+    def test_resume_reports_expected_offset(self):
+        """Test that a chunk at the wrong offset gets 409 with the offset to resume from"""
+        session_id = self.start()
+        self.put_chunk(session_id, 0, self.CSV[:1000])
+        
+        response = self.put_chunk(session_id, 2000, self.CSV[2000:3000])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['received_bytes'], 1000)
+        
+        response = self.client.get(f'/api/uploads/{session_id}/', **self.auth)
+        self.assertEqual(response.json()['received_bytes'], 1000)
+        
+    def test_finalize_requires_all_bytes(self):
+        """Test that incomplete uploads cannot be finalized"""
+        session_id = self.start()
+        self.put_chunk(session_id, 0, self.CSV[:1000])
+        response = self.client.post(f'/api/uploads/{session_id}/finalize/', **self.auth)
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Dataset.objects.exists())
+        
+    def test_concurrent_finalize_creates_one_dataset(self):
+        """Test that a second finalize of the same session gets 409, not a missing file"""
+        from .uploads import UploadError, finalize_upload_session
+        session_id = self.start()
+        self.put_chunk(session_id, 0, self.CSV)
+        
+        # Both requests loaded the session before either finalized it
+        first = UploadSession.objects.get(id=session_id)
+        second = UploadSession.objects.get(id=session_id)
+        dataset = finalize_upload_session(first)
+        with self.assertRaises(UploadError) as raised:
+            finalize_upload_session(second)
+        
+        self.assertEqual(raised.exception.status_code, 409)
+        self.assertEqual(list(Dataset.objects.values_list('id', flat=True)), [dataset.id])
+        session = UploadSession.objects.get(id=session_id)
+        self.assertEqual(session.status, UploadSession.STATUS_FINALIZED)
+        self.assertEqual(session.dataset_id, dataset.id)
+        
+    def test_failed_finalize_can_be_retried(self):
+        """Test that a checksum mismatch releases the session"""
+        import hashlib
+        session_id = self.start()
+        self.put_chunk(session_id, 0, self.CSV)
+        url = f'/api/uploads/{session_id}/finalize/'
+        
+        response = self.client.post(url, {'sha256': '0' * 64},
+                                    content_type='application/json', **self.auth)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(UploadSession.objects.get(id=session_id).status, UploadSession.STATUS_ACTIVE)
+        
+        response = self.client.post(url, {'sha256': hashlib.sha256(self.CSV).hexdigest()},
+                                    content_type='application/json', **self.auth)
+        self.assertEqual(response.status_code, 202)
+        
+    def test_oversized_upload_rejected(self):
+        """Test that size limits apply before any data is sent"""
+        response = self.client.post('/api/uploads/', {
+            'file_name': 'plant.csv', 'total_size': 11 * 1024 * 1024
+        }, content_type='application/json', **self.auth)
+        self.assertEqual(response.status_code, 400)
+        
+    def test_other_users_session_not_found(self):
+        """Test that upload sessions are private to their user"""
+        session_id = self.start()
+        other = User.objects.create_user(username='other', password='pass12345')
+        other_token = Token.objects.create(user=other)
+        response = self.client.get(
+            f'/api/uploads/{session_id}/',
+            HTTP_AUTHORIZATION=f'Token {other_token.key}'
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class DatasetRecordsTestCase(TestCase):
+    """Test the paginated records endpoint and summary options"""
+    
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.dataset = Dataset.objects.create(user=self.user, total_equipment=30)
+        EquipmentData.objects.bulk_create([
+            EquipmentData(
+                dataset=self.dataset,
+                equipment_name=f'Unit {i}',
+                equipment_type='Pump' if i % 2 else 'Valve',
+                flowrate=float(i % 10),
+                pressure=float(i),
+                temperature=100.0 - i
+            )
+            for i in range(30)
+        ])
+        
+    def get(self, url, **params):
+        return self.client.get(url, params, HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        
+    def test_cursor_pagination_visits_every_row_once(self):
+        """Test that following next_cursor returns each record exactly once, in order"""
+        url = f'/api/datasets/{self.dataset.id}/records/'
+        seen = []
+        params = {'ordering': '-flowrate', 'limit': 7}
+        while True:
+            data = self.get(url, **params).json()
+            seen.extend(data['results'])
+            if not data['next_cursor']:
+                break
+            params['cursor'] = data['next_cursor']
+        
+        self.assertEqual(len(seen), 30)
+        self.assertEqual(len({r['id'] for r in seen}), 30)
+        keys = [(-r['flowrate'], -r['id']) for r in seen]
+        self.assertEqual(keys, sorted(keys))
+        
+    def test_filters(self):
+        """Test type and numeric range filters"""
+        response = self.get(
+            f'/api/datasets/{self.dataset.id}/records/',
+            equipment_type='Pump', pressure_min='10', pressure_max='20'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([r['pressure'] for r in results], [11.0, 13.0, 15.0, 17.0, 19.0])
+        self.assertTrue(all(r['equipment_type'] == 'Pump' for r in results))
+        
+    def test_invalid_parameters(self):
+        """Test that bad ordering, numbers and cursors are rejected"""
+        url = f'/api/datasets/{self.dataset.id}/records/'
+        self.assertEqual(self.get(url, ordering='equipment_name').status_code, 400)
+        self.assertEqual(self.get(url, flowrate_min='abc').status_code, 400)
+        self.assertEqual(self.get(url, cursor='not-a-cursor').status_code, 400)
+        
+    def test_crafted_cursor_values(self):
+        """Test that well-formed cursors with a non-numeric value or out-of-range id are rejected"""
+        import base64
+        from .pagination import encode_cursor
+        
+        url = f'/api/datasets/{self.dataset.id}/records/'
+        for value in ('abc', None, [1], {'a': 1}, 'NaN'):
+            response = self.get(url, ordering='-flowrate', cursor=encode_cursor(value, 1))
+            self.assertEqual(response.status_code, 400, value)
+        not_an_object = base64.urlsafe_b64encode(b'[1, 2]').decode()
+        self.assertEqual(self.get(url, ordering='flowrate', cursor=not_an_object).status_code, 400)
+        # Ids that would overflow a 64-bit query parameter
+        for row_id in (2 ** 63, 10 ** 30, -1):
+            for ordering in ('id', 'flowrate'):
+                response = self.get(url, ordering=ordering, cursor=encode_cursor(1.0, row_id))
+                self.assertEqual(response.status_code, 400, (ordering, row_id))
+        
+        # Numbers are still accepted, whichever JSON type they came as
+        self.assertEqual(self.get(url, ordering='flowrate', cursor=encode_cursor(100, 1)).status_code, 200)
+    
+    def test_summary_without_records(self):
+        """Test that include_records=false leaves out equipment_records"""
+        url = f'/api/datasets/{self.dataset.id}/summary/'
+        
+        self.assertEqual(len(self.get(url).json()['equipment_records']), 30)
+        data = self.get(url, include_records='false').json()
+        self.assertNotIn('equipment_records', data)
+        self.assertEqual(data['total_equipment'], 30)
+        self.assertIn('chart_data', data)
+
+
+class SummaryCacheTestCase(TestCase):
+    """Test the dataset summary cache"""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.dataset = Dataset.objects.create(user=self.user, equipment_types='{"Pump": 1}')
+        EquipmentData.objects.create(
+            dataset=self.dataset, equipment_name='Pump A', equipment_type='Pump',
+            flowrate=1.0, pressure=2.0, temperature=3.0
+        )
+        
+    def get_summary(self):
+        return self.client.get(
+            f'/api/datasets/{self.dataset.id}/summary/',
+            HTTP_AUTHORIZATION=f'Token {self.token.key}'
+        )
+        
+    def test_second_request_is_cache_hit(self):
+        """Test that repeated summaries are served from the cache"""
+        from .cache import get_summary_cache_stats
+        
+        first = self.get_summary()
+        second = self.get_summary()
+        
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(get_summary_cache_stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+        
+    def test_in_progress_dataset_is_not_cached(self):
+        """Test that datasets still being processed are always rebuilt"""
+        Dataset.objects.filter(id=self.dataset.id).update(status=Dataset.STATUS_PROCESSING)
+        
+        self.get_summary()
+        self.assertEqual(self.get_summary()['X-Cache'], 'MISS')
+        
+    def test_delete_invalidates_cache(self):
+        """Test that deleting a dataset removes its cached summary"""
+        from django.core.cache import cache
+        from .cache import summary_cache_key
+        
+        self.get_summary()
+        key = summary_cache_key(self.dataset, 'full')
+        self.assertIsNotNone(cache.get(key))
+        
+        response = self.client.delete(
+            f'/api/datasets/{self.dataset.id}/delete/',
+            HTTP_AUTHORIZATION=f'Token {self.token.key}'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(cache.get(key))
+        
+    def test_cache_stats_requires_staff(self):
+        """Test that cache counters are only visible to staff"""
+        response = self.client.get('/api/cache-stats/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, 403)
+        
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get('/api/cache-stats/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('hit_rate', response.json())
+
+
+class ConditionalGetTestCase(TestCase):
+    """Test ETag / Last-Modified support on read endpoints"""
+    
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+        self.dataset = Dataset.objects.create(user=self.user, equipment_types='{"Pump": 1}')
+        
+    def test_summary_not_modified(self):
+        """Test that a matching If-None-Match returns 304 with no body"""
+        url = f'/api/datasets/{self.dataset.id}/summary/'
+        response = self.client.get(url, **self.auth)
+        etag = response['ETag']
+        
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn('Last-Modified', response)
+        
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **self.auth)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        
+        # The variant without records has its own ETag
+        response = self.client.get(url, {'include_records': 'false'}, HTTP_IF_NONE_MATCH=etag, **self.auth)
+        self.assertEqual(response.status_code, 200)
+        
+    def test_summary_if_modified_since(self):
+        """Test that If-Modified-Since alone also returns 304"""
+        url = f'/api/datasets/{self.dataset.id}/summary/'
+        last_modified = self.client.get(url, **self.auth)['Last-Modified']
+        
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified, **self.auth)
+        self.assertEqual(response.status_code, 304)
+        
+    def test_pdf_not_modified(self):
+        """Test conditional GET on the PDF download"""
+        url = f'/api/datasets/{self.dataset.id}/download-pdf/'
+        response = self.client.get(url, **self.auth)
+        self.assertEqual(response.status_code, 200)
+        
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], **self.auth)
+        self.assertEqual(response.status_code, 304)
+        
+    def test_history_etag_changes_on_delete(self):
+        """Test that deleting a dataset changes the history ETag"""
+        other = Dataset.objects.create(user=self.user)
+        etag = self.client.get('/api/upload-history/', **self.auth)['ETag']
+        
+        response = self.client.get('/api/upload-history/', HTTP_IF_NONE_MATCH=etag, **self.auth)
+        self.assertEqual(response.status_code, 304)
+        
+        other.delete()
+        response = self.client.get('/api/upload-history/', HTTP_IF_NONE_MATCH=etag, **self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        
+    def test_processing_dataset_has_no_etag(self):
+        """Test that datasets still being processed are not given validators"""
+        Dataset.objects.filter(id=self.dataset.id).update(status=Dataset.STATUS_PROCESSING)
+        response = self.client.get(f'/api/datasets/{self.dataset.id}/summary/', **self.auth)
+        self.assertNotIn('ETag', response)
+
+
+class PDFReportCacheTestCase(TestCase):
+    """Test that PDF reports are rendered once and cached on disk"""
+    
+    def setUp(self):
+        import tempfile
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+        self.dataset = Dataset.objects.create(
+            user=self.user,
+            file=SimpleUploadedFile('plant.csv', b'Equipment Name,Type,Flowrate,Pressure,Temperature\n'),
+            equipment_types='{"Pump": 1}'
+        )
+        
+    def tearDown(self):
+        import shutil
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        
+    def test_report_rendered_once(self):
+        """Test that the second download is served from the cached file"""
+        from unittest import mock
+        from . import pdf_generator
+        
+        url = f'/api/datasets/{self.dataset.id}/download-pdf/'
+        with mock.patch.object(pdf_generator, 'build_pdf_report', wraps=pdf_generator.build_pdf_report) as build:
+            first = self.client.get(url, **self.auth)
+            first_body = b''.join(first.streaming_content)
+            second = self.client.get(url, **self.auth)
+            second_body = b''.join(second.streaming_content)
+        
+        self.assertEqual(build.call_count, 1)
+        self.assertTrue(first_body.startswith(b'%PDF'))
+        self.assertEqual(first_body, second_body)
+        self.assertIn('equipment_report_', first['Content-Disposition'])
+        self.assertEqual(os.path.dirname(self.dataset.report_path), os.path.dirname(self.dataset.file.path))
+        
+    def test_delete_removes_cached_report(self):
+        """Test that deleting a dataset removes its cached report"""
+        response = self.client.get(f'/api/datasets/{self.dataset.id}/download-pdf/', **self.auth)
+        b''.join(response.streaming_content)
+        response.close()
+        report_path = self.dataset.report_path
+        self.assertTrue(os.path.exists(report_path))
+        
+        with self.settings(UPLOAD_WORKERS=0), self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/datasets/{self.dataset.id}/delete/', **self.auth)
+        self.assertFalse(os.path.exists(report_path))
+    
+    def test_uncached_report_is_spooled(self):
+        """Test that PDF_CACHE_ENABLED=False streams a temp file and caches nothing"""
+        with override_settings(PDF_CACHE_ENABLED=False, PDF_SPOOL_MAX_BYTES=1024):
+            response = self.client.get(f'/api/datasets/{self.dataset.id}/download-pdf/', **self.auth)
+            body = b''.join(response.streaming_content)
+            response.close()
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(body.startswith(b'%PDF'))
+        self.assertEqual(int(response['Content-Length']), len(body))
+        self.assertFalse(os.path.exists(self.dataset.report_path))
+    
+    def test_full_detail_report(self):
+        """Test that PDF_DETAIL_ROWS=0 lists every record"""
+        import io
+        from .pdf_generator import build_pdf_report
+        
+        EquipmentData.objects.bulk_create([
+            EquipmentData(dataset=self.dataset, equipment_name=f'Pump-{i}', equipment_type='Pump',
+                          flowrate=100.0, pressure=5.0, temperature=80.0)
+            for i in range(120)
+        ])
+        sample, full = io.BytesIO(), io.BytesIO()
+        build_pdf_report(self.dataset, sample, detail_rows=10)
+        build_pdf_report(self.dataset, full, detail_rows=0)
+        
+        self.assertGreater(len(full.getvalue()), len(sample.getvalue()))
+    
+    def test_processing_dataset_has_no_report(self):
+        """Test that reports are not built while a dataset is still processing"""
+        Dataset.objects.filter(id=self.dataset.id).update(status=Dataset.STATUS_PROCESSING)
+        response = self.client.get(f'/api/datasets/{self.dataset.id}/download-pdf/', **self.auth)
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(os.path.exists(self.dataset.report_path))
+
+
 class AuthenticationTestCase(TestCase):
     """Test authentication endpoints"""
     
@@ -268,3 +986,1143 @@ class DatasetModelTestCase(TestCase):
         # Newest should be first (ds3), oldest last (ds1)
         self.assertEqual(datasets[0].id, ds3.id)
         self.assertEqual(datasets[2].id, ds1.id)
+
+
+class CSVProcessingTestCase(TestCase):
+    """Test CSV processing utilities"""
+    
+    def test_extract_equipment_records(self):
+        """Test that records are built column-wise with the right types"""
+        import pandas as pd
+        from .utils import extract_equipment_records
+        
+        df = pd.DataFrame({
+            'Equipment Name': ['Reactor A', 101],
+            'Type': ['Reactor', 'Pump'],
+            'Flowrate': [150.5, 200],
+            'Pressure': [2.3, 1.8],
+            'Temperature': [120.0, 85.5],
+        })
+        
+        records = extract_equipment_records(df)
+        
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0], {
+            'equipment_name': 'Reactor A',
+            'equipment_type': 'Reactor',
+            'flowrate': 150.5,
+            'pressure': 2.3,
+            'temperature': 120.0
+        })
+        self.assertEqual(records[1]['equipment_name'], '101')
+        self.assertIsInstance(records[1]['flowrate'], float)
+
+    def test_streaming_matches_in_memory(self):
+        """Test that chunked processing matches whole-file processing"""
+        import tempfile
+        from .utils import process_csv_file, process_csv_file_streaming
+        
+        rows = '\n'.join(f"Unit {i},{'Pump' if i % 3 else 'Valve'},{i * 1.5},{i % 7},{20 + i}" for i in range(50))
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write(f"equipment name,TYPE,Flowrate,Pressure,Temperature\n{rows}")
+            path = f.name
+        
+        try:
+            chunks = []
+            success, streamed, _ = process_csv_file_streaming(path, chunks.append, chunk_size=7)
+            _, full, _ = process_csv_file(path)
+        finally:
+            os.remove(path)
+        
+        self.assertTrue(success)
+        self.assertEqual(len(chunks), 8)
+        self.assertEqual([r for chunk in chunks for r in chunk], full.pop('equipment_records'))
+        
+        # Merged chunk statistics only differ from one pass by rounding
+        streamed_stats, full_stats = streamed.pop('column_stats'), full.pop('column_stats')
+        self.assertEqual(streamed, full)
+        self.assertEqual(streamed_stats['by_type'].keys(), full_stats['by_type'].keys())
+        scopes = [(streamed_stats['overall'], full_stats['overall'])] + [
+            (streamed_stats['by_type'][t], full_stats['by_type'][t]) for t in full_stats['by_type']
+        ]
+        for streamed_columns, full_columns in scopes:
+            for column, profile in full_columns.items():
+                for key, value in profile.items():
+                    if isinstance(value, float):
+                        self.assertAlmostEqual(streamed_columns[column][key], value, places=6)
+                    else:
+                        self.assertEqual(streamed_columns[column][key], value)
+
+
+@override_settings(UPLOAD_ASYNC=False)
+class ColumnStatsTestCase(TestCase):
+    """Test the per-column statistics profile and /stats/ endpoint"""
+    
+    def setUp(self):
+        import tempfile
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+    
+    def tearDown(self):
+        import shutil
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+    
+    def test_running_stats_merge(self):
+        """Test that merged chunk statistics match one pass over all values"""
+        import numpy as np
+        from .stats import RunningStats
+        
+        values = np.random.default_rng(1).normal(50, 12, 10000)
+        merged = RunningStats()
+        for chunk in np.array_split(values, 7):
+            merged.merge(RunningStats.from_array(chunk))
+        
+        self.assertEqual(merged.count, 10000)
+        self.assertAlmostEqual(merged.mean, values.mean(), places=9)
+        self.assertAlmostEqual(merged.variance, values.var(ddof=1), places=6)
+        self.assertEqual(merged.min, values.min())
+        self.assertEqual(merged.max, values.max())
+    
+    def test_quantile_sketch_accuracy(self):
+        """Test that sketch quantiles are within the relative accuracy"""
+        import numpy as np
+        from .stats import QuantileSketch
+        
+        values = np.concatenate([
+            np.random.default_rng(2).lognormal(3, 1, 20000),
+            -np.random.default_rng(3).uniform(1, 100, 2000),
+            np.zeros(10)
+        ])
+        halves = np.array_split(values, 2)
+        sketch = QuantileSketch().add_array(halves[0]).merge(QuantileSketch().add_array(halves[1]))
+        restored = QuantileSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+        
+        for q in (0.01, 0.05, 0.5, 0.95, 0.99):
+            exact = np.quantile(values, q, method='lower')
+            for estimate in (sketch.quantile(q), restored.quantile(q)):
+                self.assertLessEqual(abs(estimate - exact), 0.01 * abs(exact) + 1e-9)
+    
+    def test_non_finite_values_skipped(self):
+        """Test that NaN and +/-inf do not reach the variance or the sketch"""
+        import numpy as np
+        from .stats import QuantileSketch, RunningStats
+        
+        values = np.array([1.0, np.inf, 2.0, np.nan, -np.inf, 3.0])
+        stats = RunningStats.from_array(values)
+        sketch = QuantileSketch().add_array(values)
+        
+        self.assertEqual((stats.count, stats.min, stats.max), (3, 1.0, 3.0))
+        self.assertAlmostEqual(stats.variance, 1.0)
+        self.assertEqual(sketch.count, 3)
+        self.assertAlmostEqual(sketch.quantile(1.0), 3.0, delta=0.03)
+    
+    def test_backfill_skips_infinite_records(self):
+        """Test that infinite values stored by older versions are left out of the profile"""
+        dataset = Dataset.objects.create(user=self.user, file='old.csv', total_equipment=3)
+        EquipmentData.objects.bulk_create([
+            EquipmentData(dataset=dataset, equipment_name='A', equipment_type='Pump',
+                          flowrate=1.0, pressure=2.0, temperature=3.0),
+            EquipmentData(dataset=dataset, equipment_name='B', equipment_type='Pump',
+                          flowrate=3.0, pressure=4.0, temperature=5.0),
+            EquipmentData(dataset=dataset, equipment_name='C', equipment_type='Valve',
+                          flowrate=float('inf'), pressure=1.0, temperature=1.0),
+        ])
+        
+        response = self.client.get(f'/api/datasets/{dataset.id}/stats/', **self.auth)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(b'Infinity', response.content)
+        self.assertNotIn(b'NaN', response.content)
+        flowrate = response.json()['overall']['flowrate']
+        self.assertEqual((flowrate['count'], flowrate['max']), (2, 3.0))
+        self.assertEqual(response.json()['by_type']['Valve']['flowrate']['count'], 0)
+        for stat in dataset.column_stats.all():
+            json.loads(stat.sketch, parse_constant=self.fail)
+    
+    def upload(self, csv_content):
+        csv_file = SimpleUploadedFile('test.csv', csv_content.encode('utf-8'), content_type='text/csv')
+        response = self.client.post('/api/upload-csv/', {'file': csv_file}, **self.auth)
+        self.assertEqual(response.status_code, 201)
+        return Dataset.objects.get(id=response.json()['id'])
+    
+    def test_stats_endpoint(self):
+        """Test that the profile is stored at ingest and served per type"""
+        rows = '\n'.join(f"Unit {i},{'Pump' if i % 2 else 'Valve'},{i},{i % 5},{100 + i}" for i in range(1, 101))
+        dataset = self.upload(f"Equipment Name,Type,Flowrate,Pressure,Temperature\n{rows}")
+        
+        # Overall plus two types, three columns each
+        self.assertEqual(dataset.column_stats.count(), 9)
+        
+        response = self.client.get(f'/api/datasets/{dataset.id}/stats/', **self.auth)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        
+        flowrate = data['overall']['flowrate']
+        self.assertEqual(flowrate['count'], 100)
+        self.assertEqual(flowrate['min'], 1.0)
+        self.assertEqual(flowrate['max'], 100.0)
+        self.assertAlmostEqual(flowrate['mean'], 50.5)
+        self.assertAlmostEqual(flowrate['stddev'], 29.011491975882016)
+        self.assertAlmostEqual(flowrate['p50'], 50, delta=0.5)
+        self.assertAlmostEqual(flowrate['p95'], 95, delta=1)
+        self.assertNotIn('sketch', flowrate)
+        
+        self.assertEqual(set(data['by_type']), {'Pump', 'Valve'})
+        self.assertEqual(data['by_type']['Pump']['flowrate']['count'], 50)
+        self.assertEqual(data['by_type']['Pump']['flowrate']['min'], 1.0)
+        self.assertEqual(data['by_type']['Valve']['temperature']['max'], 200.0)
+        
+        # Conditional GET
+        cached = self.client.get(
+            f'/api/datasets/{dataset.id}/stats/', HTTP_IF_NONE_MATCH=response['ETag'], **self.auth
+        )
+        self.assertEqual(cached.status_code, 304)
+    
+    def test_stats_backfilled_for_older_datasets(self):
+        """Test that datasets ingested without stats get them on first request"""
+        dataset = self.upload("Equipment Name,Type,Flowrate,Pressure,Temperature\nA,Pump,1,2,3\nB,Pump,3,4,5")
+        dataset.column_stats.all().delete()
+        
+        response = self.client.get(f'/api/datasets/{dataset.id}/stats/', **self.auth)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['overall']['pressure']['mean'], 3.0)
+        self.assertEqual(dataset.column_stats.count(), 6)
+    
+    def test_stats_not_found(self):
+        """Test that other users' datasets are not exposed"""
+        response = self.client.get('/api/datasets/999/stats/', **self.auth)
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(UPLOAD_ASYNC=False, CHART_SCATTER_MAX_POINTS=50)
+class ChartDataTestCase(TestCase):
+    """Test the histogram and downsampled scatter endpoints"""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+        
+        self.dataset = Dataset.objects.create(user=self.user, file='test.csv', total_equipment=500)
+        EquipmentData.objects.bulk_create([
+            EquipmentData(
+                dataset=self.dataset,
+                equipment_name=f'Unit {i}',
+                equipment_type='Pump',
+                flowrate=float(i),
+                pressure=i / 100,
+                temperature=(i * 37) % 101
+            )
+            for i in range(500)
+        ])
+    
+    def test_histograms(self):
+        """Test that every column is binned and counts cover every record"""
+        response = self.client.get(f'/api/datasets/{self.dataset.id}/histogram/?bins=10', **self.auth)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        data = response.json()
+        self.assertEqual(data['total_points'], 500)
+        flowrate = data['histograms']['flowrate']
+        self.assertEqual(len(flowrate['edges']), 11)
+        self.assertEqual(flowrate['counts'], [50] * 10)
+        self.assertEqual(set(data['histograms']), {'flowrate', 'pressure', 'temperature'})
+        
+        cached = self.client.get(f'/api/datasets/{self.dataset.id}/histogram/?bins=10', **self.auth)
+        self.assertEqual(cached['X-Cache'], 'HIT')
+        
+        response = self.client.get(f'/api/datasets/{self.dataset.id}/histogram/?bins=0', **self.auth)
+        self.assertEqual(response.status_code, 400)
+    
+    def test_scatter_is_capped(self):
+        """Test that scatter data is downsampled deterministically"""
+        url = f'/api/datasets/{self.dataset.id}/scatter/?x=flowrate&y=temperature'
+        data = self.client.get(url, **self.auth).json()
+        
+        self.assertEqual(data['total_points'], 500)
+        self.assertEqual(len(data['points']), 50)
+        # First and last points are always kept
+        self.assertEqual(data['points'][0], [0.0, 0.0])
+        self.assertEqual(data['points'][-1], [499.0, (499 * 37) % 101])
+        xs = [point[0] for point in data['points']]
+        self.assertEqual(xs, sorted(xs))
+        
+        from .charts import build_scatter
+        self.assertEqual(build_scatter(self.dataset, 'flowrate', 'temperature', 50)['points'], data['points'])
+        
+        response = self.client.get(f'{url}&max_points=51', **self.auth)
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(f'/api/datasets/{self.dataset.id}/scatter/?x=name', **self.auth)
+        self.assertEqual(response.status_code, 400)
+    
+    def test_lttb_keeps_extremes(self):
+        """Test that LTTB keeps spikes that uniform sampling would miss"""
+        import numpy as np
+        from .charts import lttb
+        
+        x = np.arange(1000, dtype=float)
+        y = np.zeros(1000)
+        y[333] = 100.0
+        y[777] = -100.0
+        
+        keep = lttb(x, y, 20)
+        
+        self.assertEqual(len(keep), 20)
+        self.assertIn(333, keep)
+        self.assertIn(777, keep)
+        self.assertEqual(list(lttb(x[:10], y[:10], 20)), list(range(10)))
+
+
+class CompareDatasetsTestCase(TestCase):
+    """Test the cross-dataset comparison endpoint"""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+        
+        self.base = self.make_dataset([
+            ('Pump A', 'Pump', 100.0, 2.0, 80.0),
+            ('Pump B', 'Pump', 120.0, 2.5, 85.0),
+            ('Valve C', 'Valve', 50.0, 1.0, 60.0),
+        ])
+        self.target = self.make_dataset([
+            ('Pump A', 'Pump', 110.0, 2.0, 80.0),
+            ('Pump B', 'Pump', 120.0, 3.5, 85.0),
+            ('Reactor D', 'Reactor', 300.0, 5.0, 200.0),
+        ])
+    
+    def make_dataset(self, rows):
+        types = {}
+        for row in rows:
+            types[row[1]] = types.get(row[1], 0) + 1
+        dataset = Dataset.objects.create(
+            user=self.user, file='test.csv', total_equipment=len(rows), equipment_types=json.dumps(types)
+        )
+        EquipmentData.objects.bulk_create([
+            EquipmentData(dataset=dataset, equipment_name=name, equipment_type=eq_type,
+                          flowrate=flowrate, pressure=pressure, temperature=temperature)
+            for name, eq_type, flowrate, pressure, temperature in rows
+        ])
+        return dataset
+    
+    def compare(self, query):
+        return self.client.get(f'/api/datasets/compare/?{query}', **self.auth)
+    
+    def test_compare(self):
+        """Test deltas, added/removed equipment and type changes"""
+        response = self.compare(f'ids={self.base.id},{self.target.id}')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        data = response.json()
+        self.assertEqual(data['summary']['matched'], 2)
+        self.assertEqual(data['summary']['changed'], 2)
+        self.assertEqual(data['summary']['added'], 1)
+        self.assertEqual(data['summary']['removed'], 1)
+        self.assertEqual(data['summary']['mean_delta']['flowrate'], 5.0)
+        self.assertEqual(data['added'], ['Reactor D'])
+        self.assertEqual(data['removed'], ['Valve C'])
+        
+        # Largest flowrate change first
+        self.assertEqual(data['equipment'][0]['equipment_name'], 'Pump A')
+        self.assertEqual(data['equipment'][0]['flowrate_delta'], 10.0)
+        self.assertEqual(data['equipment'][1]['pressure_delta'], 1.0)
+        
+        types = {row['equipment_type']: row for row in data['type_distribution']}
+        self.assertEqual(types['Valve']['delta'], -1)
+        self.assertEqual(types['Reactor']['delta'], 1)
+        self.assertEqual(types['Pump']['delta'], 0)
+        
+        cached = self.compare(f'ids={self.base.id},{self.target.id}')
+        self.assertEqual(cached['X-Cache'], 'HIT')
+        not_modified = self.client.get(
+            f'/api/datasets/compare/?ids={self.base.id},{self.target.id}',
+            HTTP_IF_NONE_MATCH=cached['ETag'], **self.auth
+        )
+        self.assertEqual(not_modified.status_code, 304)
+    
+    def test_compare_sort_and_limit(self):
+        """Test ordering by another column's delta"""
+        data = self.compare(f'ids={self.base.id},{self.target.id}&sort=pressure&limit=1').json()
+        
+        self.assertEqual(len(data['equipment']), 1)
+        self.assertEqual(data['equipment'][0]['equipment_name'], 'Pump B')
+    
+    def test_compare_validation(self):
+        """Test bad ids, bad sort and other users' datasets"""
+        self.assertEqual(self.compare(f'ids={self.base.id}').status_code, 400)
+        self.assertEqual(self.compare('ids=a,b').status_code, 400)
+        self.assertEqual(self.compare(f'ids={self.base.id},{self.target.id}&sort=name').status_code, 400)
+        
+        other = User.objects.create_user(username='other', password='testpass123')
+        foreign = Dataset.objects.create(user=other, file='other.csv')
+        self.assertEqual(self.compare(f'ids={self.base.id},{foreign.id}').status_code, 404)
+
+
+@override_settings(UPLOAD_WORKERS=0, DATASET_RETENTION_COUNT=3)
+class RetentionTestCase(TestCase):
+    """Test set-based retention trimming and bulk purges"""
+    
+    def setUp(self):
+        import tempfile
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        os.makedirs(os.path.join(self.media_root, 'datasets'))
+        
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+    
+    def tearDown(self):
+        import shutil
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+    
+    def make_datasets(self, count, user=None):
+        """Create `count` ready datasets (oldest first), each with records and a file"""
+        from .models import DatasetColumnStats
+        
+        datasets = []
+        for i in range(count):
+            dataset = Dataset.objects.create(user=user or self.user, total_equipment=2)
+            dataset.file.name = f'datasets/dataset_{dataset.id}.csv'
+            dataset.save(update_fields=['file'])
+            with open(dataset.file.path, 'w') as f:
+                f.write('Equipment Name,Type,Flowrate,Pressure,Temperature\n')
+            EquipmentData.objects.bulk_create([
+                EquipmentData(dataset=dataset, equipment_name=f'Pump {j}', equipment_type='Pump',
+                              flowrate=1.0, pressure=1.0, temperature=1.0)
+                for j in range(2)
+            ])
+            DatasetColumnStats.objects.create(dataset=dataset, column='flowrate', count=2)
+            datasets.append(dataset)
+        return datasets
+    
+    def test_trim_keeps_newest_datasets(self):
+        """Test trimming deletes the oldest datasets, their rows and files"""
+        from .retention import trim_user_datasets
+        
+        datasets = self.make_datasets(5)
+        job = UploadJob.objects.create(user=self.user, dataset=datasets[0])
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            deleted = trim_user_datasets(self.user.id)
+        
+        self.assertEqual(deleted, {'datasets': 2, 'records': 4})
+        self.assertEqual(
+            list(Dataset.objects.filter(user=self.user).order_by('id').values_list('id', flat=True)),
+            [dataset.id for dataset in datasets[2:]]
+        )
+        self.assertEqual(EquipmentData.objects.count(), 6)
+        self.assertFalse(os.path.exists(datasets[0].file.path))
+        self.assertTrue(os.path.exists(datasets[4].file.path))
+        job.refresh_from_db()
+        self.assertIsNone(job.dataset_id)
+    
+    def test_delete_query_count_is_constant(self):
+        """Test deleting many datasets takes the same queries as deleting two"""
+        from django.test.utils import CaptureQueriesContext
+        from .retention import delete_datasets
+        
+        datasets = self.make_datasets(8)
+        with CaptureQueriesContext(connection) as two:
+            delete_datasets([dataset.id for dataset in datasets[:2]])
+        with CaptureQueriesContext(connection) as six:
+            delete_datasets([dataset.id for dataset in datasets[2:]])
+        
+        self.assertEqual(len(two), len(six))
+        self.assertFalse(Dataset.objects.exists())
+    
+    def test_delete_view_query_count_is_constant(self):
+        """Test deleting a dataset takes the same queries for 1 or 5000 records"""
+        from .models import DatasetColumnStats
+        
+        for records in (1, 5000):
+            dataset = self.make_datasets(1)[0]
+            EquipmentData.objects.bulk_create([
+                EquipmentData(dataset=dataset, equipment_name=f'Valve {i}', equipment_type='Valve',
+                              flowrate=1.0, pressure=1.0, temperature=1.0)
+                for i in range(records)
+            ], batch_size=1000)
+            
+            # Token lookup, dataset lookup, savepoint, 2 job/session updates,
+            # 3 DELETEs (records, column stats, dataset), savepoint release
+            with self.captureOnCommitCallbacks(execute=True), self.assertNumQueries(9):
+                response = self.client.delete(f'/api/datasets/{dataset.id}/delete/', **self.auth)
+            
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(EquipmentData.objects.filter(dataset_id=dataset.id).exists())
+            self.assertFalse(DatasetColumnStats.objects.filter(dataset_id=dataset.id).exists())
+            self.assertFalse(os.path.exists(dataset.file.path))
+    
+    def test_user_policy_overrides_default(self):
+        """Test a per-user retention count for trimming and history"""
+        from .models import RetentionPolicy
+        from .retention import trim_user_datasets
+        
+        self.make_datasets(4)
+        RetentionPolicy.objects.create(user=self.user, keep_datasets=2)
+        
+        trim_user_datasets(self.user.id)
+        
+        response = self.client.get('/api/upload-history/', **self.auth)
+        self.assertEqual(len(response.json()), 2)
+        
+        # 0 keeps every dataset, and the history lists them all
+        RetentionPolicy.objects.filter(user=self.user).update(keep_datasets=0)
+        self.make_datasets(4)
+        trim_user_datasets(self.user.id)
+        response = self.client.get('/api/upload-history/', **self.auth)
+        self.assertEqual(len(response.json()), 6)
+    
+    def test_history_matches_retention(self):
+        """Test that an upload in progress does not hide a kept dataset from the history"""
+        from .retention import datasets_to_trim
+        
+        kept = self.make_datasets(3)
+        pending = Dataset.objects.create(user=self.user, file='pending.csv', status=Dataset.STATUS_PENDING)
+        self.assertEqual(datasets_to_trim(self.user.id, 3), [])
+        
+        response = self.client.get('/api/upload-history/', **self.auth)
+        
+        ids = [item['id'] for item in response.json()]
+        self.assertEqual(sorted(ids), sorted([pending.id] + [d.id for d in kept]))
+        
+        # Finishing the upload changes what is kept, and the history's ETag
+        etag = response['ETag']
+        Dataset.objects.filter(pk=pending.pk).update(status=Dataset.STATUS_READY)
+        response = self.client.get('/api/upload-history/', HTTP_IF_NONE_MATCH=etag, **self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 3)
+    
+    def test_purge_command(self):
+        """Test the purge_datasets management command"""
+        from io import StringIO
+        from django.core.management import call_command
+        
+        other = User.objects.create_user(username='other', password='testpass123')
+        self.make_datasets(4)
+        self.make_datasets(4, user=other)
+        
+        out = StringIO()
+        call_command('purge_datasets', '--dry-run', stdout=out)
+        self.assertIn('Would delete 2 dataset(s)', out.getvalue())
+        self.assertEqual(Dataset.objects.count(), 8)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('purge_datasets', '--user', 'other', '--keep', '1', stdout=out)
+        self.assertEqual(Dataset.objects.filter(user=other).count(), 1)
+        self.assertEqual(Dataset.objects.filter(user=self.user).count(), 4)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('purge_datasets', '--older-than', '0', stdout=out)
+        self.assertFalse(Dataset.objects.exists())
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'datasets')), [])
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class DatasetExportTestCase(TestCase):
+    """Test the streaming record export endpoint"""
+    
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+        
+        self.dataset = Dataset.objects.create(
+            user=self.user, file='test.csv', total_equipment=3,
+            equipment_types=json.dumps({'Pump': 2, 'Reactor': 1})
+        )
+        EquipmentData.objects.bulk_create([
+            EquipmentData(dataset=self.dataset, equipment_name='Pump, "A"', equipment_type='Pump',
+                          flowrate=150.5, pressure=2.3, temperature=120.0),
+            EquipmentData(dataset=self.dataset, equipment_name='Réacteur B', equipment_type='Reactor',
+                          flowrate=200.0, pressure=5.1, temperature=300.5),
+            EquipmentData(dataset=self.dataset, equipment_name='Pump C', equipment_type='Pump',
+                          flowrate=99.0, pressure=1.0, temperature=80.0),
+        ])
+    
+    def export(self, query='', **headers):
+        return self.client.get(f'/api/datasets/{self.dataset.id}/export/{query}', **self.auth, **headers)
+    
+    def test_csv_export_can_be_uploaded_again(self):
+        """Test CSV export streams every record with the upload headers"""
+        from .utils import process_csv_file
+        
+        response = self.export()
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn(f'equipment_data_{self.dataset.id}.csv', response['Content-Disposition'])
+        body = b''.join(response.streaming_content).decode('utf-8')
+        self.assertEqual(body.splitlines()[0], 'Equipment Name,Type,Flowrate,Pressure,Temperature')
+        
+        from io import StringIO
+        success, result, _ = process_csv_file(StringIO(body))
+        self.assertTrue(success)
+        self.assertEqual(result['total_equipment'], 3)
+        self.assertEqual(
+            [record['equipment_name'] for record in result['equipment_records']],
+            ['Pump, "A"', 'Réacteur B', 'Pump C']
+        )
+    
+    def test_jsonl_export(self):
+        """Test JSON Lines export has one object per record"""
+        response = self.export('?format=jsonl')
+        
+        self.assertEqual(response.status_code, 200)
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[1], {
+            'equipment_name': 'Réacteur B', 'equipment_type': 'Reactor',
+            'flowrate': 200.0, 'pressure': 5.1, 'temperature': 300.5
+        })
+    
+    def test_gzip_export(self):
+        """Test the export is gzip-compressed when the client accepts it"""
+        import gzip
+        
+        plain = b''.join(self.export().streaming_content)
+        response = self.export(HTTP_ACCEPT_ENCODING='gzip, deflate')
+        
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+    
+    def test_invalid_and_unavailable_formats(self):
+        """Test unknown formats are rejected and Parquet needs pyarrow"""
+        from unittest import mock
+        
+        response = self.export('?format=xml')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('format', response.json()['error'])
+        
+        with mock.patch('equipment.views.parquet_available', return_value=False), \
+                mock.patch('equipment.etags.parquet_available', return_value=False):
+            response = self.export('?format=parquet')
+        self.assertEqual(response.status_code, 501)
+        self.assertIn('pyarrow', response.json()['error'])
+    
+    @unittest.skipUnless(parquet_available(), 'pyarrow is not installed')
+    def test_parquet_export(self):
+        """Test Parquet export round-trips through pyarrow"""
+        import io
+        import pyarrow.parquet as pq
+        
+        response = self.export('?format=parquet')
+        
+        self.assertEqual(response.status_code, 200)
+        table = pq.read_table(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(table.column('equipment_name').to_pylist()[1], 'Réacteur B')
+    
+    def test_export_conditional_get(self):
+        """Test unchanged exports answer 304"""
+        etag = self.export()['ETag']
+        
+        response = self.export(HTTP_IF_NONE_MATCH=etag)
+        
+        self.assertEqual(response.status_code, 304)
+        self.assertNotEqual(self.export(HTTP_ACCEPT_ENCODING='gzip')['ETag'], etag)
+
+
+@override_settings(UPLOAD_ASYNC=False, COLUMNAR_SIDECAR=True)
+class ColumnarStorageTestCase(TestCase):
+    """Test the memory-mapped column files written at ingest"""
+    
+    CSV = (
+        "Equipment Name,Type,Flowrate,Pressure,Temperature\n"
+        "Pump A,Pump,150.5,2.3,120.0\n"
+        "Réacteur B,Reactor,200.0,5.1,300.5\n"
+        "Pump C,Pump,99.0,1.0,80.0\n"
+        "Valve D,Valve,10.0,0.5,25.0\n"
+    )
+    
+    def setUp(self):
+        import tempfile
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+    
+    def tearDown(self):
+        import shutil
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+    
+    def upload(self, csv_content):
+        csv_file = SimpleUploadedFile('test.csv', csv_content.encode('utf-8'), content_type='text/csv')
+        response = self.client.post('/api/upload-csv/', {'file': csv_file}, **self.auth)
+        self.assertEqual(response.status_code, 201)
+        return Dataset.objects.get(id=response.json()['id'])
+    
+    def test_columns_match_records(self):
+        """Test that the column files hold the same data as EquipmentData"""
+        from .columnar import open_columns
+        
+        dataset = self.upload(self.CSV)
+        columns = open_columns(dataset)
+        
+        self.assertIsNotNone(columns)
+        self.assertFalse(os.path.exists(dataset.columns_path + '.tmp'))
+        records = list(dataset.equipment_records.order_by('id').values_list(
+            'equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature'
+        ))
+        self.assertEqual(len(columns), 4)
+        self.assertEqual(columns.names(), [r[0] for r in records])
+        self.assertEqual(columns.names(1, 3), [r[0] for r in records[1:3]])
+        self.assertEqual(list(columns.types().astype(str)), [r[1] for r in records])
+        self.assertEqual(columns.flowrate.tolist(), [r[2] for r in records])
+        self.assertEqual(columns.temperature.tolist(), [r[4] for r in records])
+    
+    @override_settings(CSV_STREAMING_THRESHOLD_MB=0, CSV_CHUNK_SIZE=3)
+    def test_streaming_ingest_writes_columns(self):
+        """Test that chunks are appended in order when streaming"""
+        from .columnar import open_columns
+        from .pdf_generator import iter_detail_rows
+        
+        rows = '\n'.join(f"Unit {i},{'Pump' if i % 2 else 'Valve'},{i},{i},{i}" for i in range(10))
+        dataset = self.upload(f"Equipment Name,Type,Flowrate,Pressure,Temperature\n{rows}")
+        columns = open_columns(dataset)
+        
+        self.assertEqual(columns.names(), [f'Unit {i}' for i in range(10)])
+        self.assertEqual(columns.pressure.tolist(), [float(i) for i in range(10)])
+        self.assertEqual(columns.type_names, ['Valve', 'Pump'])
+        
+        # The PDF details read the same rows from either source
+        from_columns = list(iter_detail_rows(dataset, limit=4))
+        with self.settings(MEDIA_ROOT=self.media_root + '-missing'):
+            from_records = list(iter_detail_rows(Dataset.objects.get(id=dataset.id), limit=4))
+        self.assertEqual(from_columns, from_records)
+    
+    def test_detail_rows_ordered_by_name(self):
+        """Test that the PDF sample rows follow the records' name ordering from either source"""
+        from .pdf_generator import iter_detail_rows
+        
+        dataset = self.upload(self.CSV + "Pump A,Pump,1.0,1.0,1.0\n")
+        expected = [
+            ('Pump A', 'Pump', 150.5), ('Pump A', 'Pump', 1.0),
+            ('Pump C', 'Pump', 99.0), ('Réacteur B', 'Reactor', 200.0),
+            ('Valve D', 'Valve', 10.0),
+        ]
+        
+        from_columns = list(iter_detail_rows(dataset))
+        with self.settings(MEDIA_ROOT=self.media_root + '-missing'):
+            from_records = list(iter_detail_rows(Dataset.objects.get(id=dataset.id)))
+        
+        self.assertEqual([row[:3] for row in from_columns], expected)
+        self.assertEqual(from_records, from_columns)
+        with self.assertNumQueries(1):
+            sample = list(iter_detail_rows(dataset, limit=2))
+        self.assertEqual(sample, from_columns[:2])
+    
+    def test_charts_read_columns_without_queries(self):
+        """Test that chart data comes from the column files"""
+        from .charts import build_histograms
+        
+        dataset = self.upload(self.CSV)
+        with self.assertNumQueries(0):
+            data = build_histograms(dataset, bins=2)
+        self.assertEqual(data['total_points'], 4)
+        self.assertEqual(sum(data['histograms']['flowrate']['counts']), 4)
+    
+    def test_infinite_values_dropped_at_ingest(self):
+        """Test that 'inf' and overflowing numbers are treated as invalid"""
+        dataset = self.upload(self.CSV + "Pump E,Pump,inf,1.0,1.0\nPump F,Pump,1.0,1e400,-inf\n")
+        self.assertEqual(dataset.total_equipment, 4)
+        self.assertEqual(dataset.equipment_records.count(), 4)
+        
+        response = self.client.get(f'/api/datasets/{dataset.id}/histogram/?bins=2', **self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sum(response.json()['histograms']['flowrate']['counts']), 4)
+    
+    def test_columns_removed_with_dataset(self):
+        """Test that deleting a dataset removes its column files"""
+        dataset = self.upload(self.CSV)
+        path = dataset.columns_path
+        self.assertTrue(os.path.isdir(path))
+        
+        with self.settings(UPLOAD_WORKERS=0), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f'/api/datasets/{dataset.id}/delete/', **self.auth)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(os.path.exists(path))
+    
+    @override_settings(COLUMNAR_SIDECAR=False)
+    def test_sidecar_disabled(self):
+        """Test that no column files are written when turned off"""
+        from .columnar import open_columns
+        
+        dataset = self.upload(self.CSV)
+        
+        self.assertFalse(os.path.exists(dataset.columns_path))
+        self.assertIsNone(open_columns(dataset))
+    
+    def test_failed_ingest_leaves_no_columns(self):
+        """Test that a failed upload does not leave partial column files"""
+        csv_file = SimpleUploadedFile(
+            'bad.csv', b"Equipment Name,Type,Flowrate,Pressure,Temperature\nA,Pump,x,y,z\n",
+            content_type='text/csv'
+        )
+        response = self.client.post('/api/upload-csv/', {'file': csv_file}, **self.auth)
+        
+        self.assertEqual(response.status_code, 400)
+        leftovers = [name for name in os.listdir(os.path.join(self.media_root, 'datasets'))
+                     if '.columns' in name]
+        self.assertEqual(leftovers, [])
+
+
+@override_settings(UPLOAD_ASYNC=False, UPLOAD_WORKERS=0, COLUMNAR_SIDECAR=True)
+class UploadDeduplicationTestCase(TestCase):
+    """Test content-addressed storage and re-upload deduplication"""
+    
+    CSV = (
+        "Equipment Name,Type,Flowrate,Pressure,Temperature\n"
+        "Pump A,Pump,150.5,2.3,120.0\n"
+        "Reactor B,Reactor,200.0,5.1,300.5\n"
+        "Valve C,Valve,10.0,0.5,25.0\n"
+    )
+    
+    def setUp(self):
+        import tempfile
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+    
+    def tearDown(self):
+        import shutil
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+    
+    def upload(self, name='daily.csv', auth=None):
+        csv_file = SimpleUploadedFile(name, self.CSV.encode('utf-8'), content_type='text/csv')
+        response = self.client.post('/api/upload-csv/', {'file': csv_file}, **(auth or self.auth))
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+    
+    def stored_csvs(self):
+        """Relative paths of every CSV under MEDIA_ROOT/datasets"""
+        root = os.path.join(self.media_root, 'datasets')
+        return sorted(
+            os.path.relpath(os.path.join(folder, name), root)
+            for folder, _, names in os.walk(root) for name in names if name.endswith('.csv')
+        )
+    
+    def test_reupload_copies_dataset(self):
+        """Test that re-uploading a file copies the first dataset instead of parsing it"""
+        import hashlib
+        from .columnar import open_columns
+        
+        first = self.upload()
+        second = self.upload(name='daily (1).csv')
+        
+        self.assertIsNone(first['duplicate_of'])
+        self.assertEqual(second['duplicate_of'], first['id'])
+        self.assertEqual(second['rows_written'], 3)
+        
+        original = Dataset.objects.get(id=first['id'])
+        copy = Dataset.objects.get(id=second['id'])
+        content_hash = hashlib.sha256(self.CSV.encode('utf-8')).hexdigest()
+        self.assertEqual(copy.content_hash, content_hash)
+        self.assertEqual(copy.file.name, original.file.name)
+        self.assertEqual(self.stored_csvs(), [f'{content_hash[:2]}/{content_hash}.csv'])
+        
+        fields = ['equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+        self.assertEqual(
+            list(copy.equipment_records.order_by('id').values_list(*fields)),
+            list(original.equipment_records.order_by('id').values_list(*fields))
+        )
+        self.assertEqual(copy.column_stats.count(), original.column_stats.count())
+        self.assertEqual(
+            (copy.total_equipment, copy.avg_flowrate, copy.equipment_types),
+            (original.total_equipment, original.avg_flowrate, original.equipment_types)
+        )
+        self.assertEqual(open_columns(copy).names(), open_columns(original).names())
+        self.assertNotEqual(copy.report_path, original.report_path)
+    
+    def test_other_user_upload_is_processed(self):
+        """Test that identical files from another user share storage but are parsed"""
+        other = User.objects.create_user(username='other', password='testpass123')
+        other_auth = {'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=other).key}'}
+        
+        first = self.upload()
+        second = self.upload(auth=other_auth)
+        
+        self.assertIsNone(second['duplicate_of'])
+        self.assertEqual(len(self.stored_csvs()), 1)
+        self.assertEqual(Dataset.objects.get(id=second['id']).equipment_records.count(), 3)
+        self.assertEqual(
+            Dataset.objects.get(id=first['id']).file.name,
+            Dataset.objects.get(id=second['id']).file.name
+        )
+    
+    def test_shared_file_kept_until_last_dataset_deleted(self):
+        """Test that a stored CSV is only removed with the last dataset using it"""
+        first = self.upload()
+        second = self.upload()
+        path = Dataset.objects.get(id=first['id']).file.path
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f"/api/datasets/{first['id']}/delete/", **self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(os.path.exists(path))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f"/api/datasets/{second['id']}/delete/", **self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(os.path.exists(path))
+    
+    def test_upload_during_delete_keeps_file(self):
+        """Test that an upload registered before the unlink runs keeps the shared file"""
+        from .dedupe import create_stored_dataset
+        from .retention import delete_dataset_objects
+        
+        first = Dataset.objects.get(id=self.upload()['id'])
+        path = first.file.path
+        
+        # Delete the only dataset; the unlink waits for the commit
+        with self.captureOnCommitCallbacks() as callbacks:
+            delete_dataset_objects([first])
+        
+        # Meanwhile the same bytes are uploaded: the file is still there, so
+        # the upload's own copy is dropped and the stored one reused
+        tmp_path = os.path.join(self.media_root, 'datasets', 'upload.csv.tmp')
+        with open(tmp_path, 'w') as f:
+            f.write(self.CSV)
+        second = create_stored_dataset(self.user, tmp_path, first.content_hash)
+        self.assertFalse(os.path.exists(tmp_path))
+        
+        for callback in callbacks:
+            callback()
+        self.assertEqual(second.file.path, path)
+        self.assertTrue(os.path.exists(path))
+    
+    def test_upload_registered_while_releasing_restores_file(self):
+        """Test that a file moved aside is put back if an upload registers before the final check"""
+        from unittest import mock
+        from . import dedupe
+        
+        first = Dataset.objects.get(id=self.upload()['id'])
+        path = first.file.path
+        Dataset.objects.filter(id=first.id).delete()
+        real_replace = os.replace
+        
+        def move_aside(source, destination):
+            if destination.endswith('.deleting'):
+                # An upload registers just as the file is moved aside
+                Dataset.objects.create(user=self.user, file=first.file.name, content_hash=first.content_hash)
+            real_replace(source, destination)
+        
+        with mock.patch.object(dedupe.os, 'replace', side_effect=move_aside):
+            self.assertFalse(dedupe.release_content_file(first.content_hash))
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(len(self.stored_csvs()), 1)
+    
+    def test_release_then_upload_stores_file_again(self):
+        """Test that an upload after a released file writes its own copy"""
+        from .dedupe import create_stored_dataset, release_content_file
+        
+        first = Dataset.objects.get(id=self.upload()['id'])
+        path = first.file.path
+        Dataset.objects.filter(id=first.id).delete()
+        self.assertTrue(release_content_file(first.content_hash))
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(self.stored_csvs(), [])
+        
+        tmp_path = os.path.join(self.media_root, 'datasets', 'upload.csv.tmp')
+        with open(tmp_path, 'w') as f:
+            f.write(self.CSV)
+        create_stored_dataset(self.user, tmp_path, first.content_hash)
+        with open(path) as f:
+            self.assertEqual(f.read(), self.CSV)
+        self.assertFalse(release_content_file(first.content_hash))
+    
+    @override_settings(UPLOAD_DEDUPLICATION=False)
+    def test_deduplication_disabled(self):
+        """Test that re-uploads are parsed again when deduplication is off"""
+        self.upload()
+        second = self.upload()
+        
+        self.assertIsNone(second['duplicate_of'])
+        self.assertEqual(Dataset.objects.get(id=second['id']).equipment_records.count(), 3)
+        self.assertEqual(len(self.stored_csvs()), 1)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'PRAGMAs are SQLite-specific')
+class SQLiteTuningTestCase(TestCase):
+    """Test the SQLite performance profile applied to new connections"""
+    
+    def setUp(self):
+        import tempfile
+        self.work_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+    
+    def read_pragmas(self, names):
+        """Open a new connection to a file database and read PRAGMA values"""
+        from django.db.backends.sqlite3.base import DatabaseWrapper
+        
+        wrapper = DatabaseWrapper(
+            {**connection.settings_dict, 'NAME': os.path.join(self.work_dir, 'tuning.sqlite3')},
+            alias='tuning-test'
+        )
+        try:
+            with wrapper.cursor() as cursor:
+                values = {}
+                for name in names:
+                    cursor.execute(f'PRAGMA {name}')
+                    values[name] = cursor.fetchone()[0]
+                return values
+        finally:
+            wrapper.close()
+    
+    @override_settings(SQLITE_CACHE_SIZE_MB=8, SQLITE_MMAP_SIZE_MB=16, SQLITE_BUSY_TIMEOUT_MS=1500)
+    def test_new_connections_are_tuned(self):
+        """Test WAL, synchronous, cache, mmap and busy timeout are set"""
+        values = self.read_pragmas(['journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'busy_timeout'])
+        
+        self.assertEqual(values, {
+            'journal_mode': 'wal',
+            'synchronous': 1,  # NORMAL
+            'cache_size': -8 * 1024,
+            'mmap_size': 16 * 1024 * 1024,
+            'busy_timeout': 1500,
+        })
+    
+    @override_settings(SQLITE_TUNING=False)
+    def test_tuning_can_be_turned_off(self):
+        """Test SQLITE_TUNING=False leaves SQLite's defaults"""
+        values = self.read_pragmas(['journal_mode', 'synchronous'])
+        
+        self.assertEqual(values, {'journal_mode': 'delete', 'synchronous': 2})
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'COPY ingest is PostgreSQL-specific')
+class PostgresCopyIngestTestCase(TestCase):
+    """Test that records are written with COPY FROM STDIN on PostgreSQL"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.dataset = Dataset.objects.create(user=self.user, file='test.csv')
+    
+    def test_records_written_with_copy(self):
+        """Test write_equipment_records streams rows through COPY"""
+        from unittest import mock
+        from . import ingest
+        
+        records = [
+            {'equipment_name': f'Pump {i}', 'equipment_type': 'Pump',
+             'flowrate': i + 0.5, 'pressure': 2.0, 'temperature': 80.0}
+            for i in range(100)
+        ] + [{'equipment_name': 'Tab\tand "quote"', 'equipment_type': 'Valve',
+              'flowrate': 1.0, 'pressure': 1.0, 'temperature': 1.0}]
+        
+        with mock.patch.object(ingest, 'copy_equipment_records', wraps=ingest.copy_equipment_records) as copy:
+            rows, _ = ingest.write_equipment_records(self.dataset, iter(records))
+        
+        self.assertEqual(copy.call_count, 1)
+        self.assertEqual(rows, 101)
+        stored = list(self.dataset.equipment_records.order_by('id').values(
+            'equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature'
+        ))
+        self.assertEqual(stored, records)
+    
+    @override_settings(POSTGRES_COPY_INGEST=False)
+    def test_copy_can_be_turned_off(self):
+        """Test POSTGRES_COPY_INGEST=False falls back to bulk_create"""
+        from .ingest import use_copy_ingest
+        
+        self.assertFalse(use_copy_ingest())
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Query plans are SQLite-specific')
+class QueryPlanTestCase(TestCase):
+    """Test that hot queries use the composite indexes"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.dataset = Dataset.objects.create(user=self.user)
+        
+    def explain(self, queryset):
+        """Return SQLite's EXPLAIN QUERY PLAN output for a queryset as one string"""
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return ' | '.join(row[-1] for row in cursor.fetchall())
+        
+    def test_user_history_uses_index(self):
+        """Test that user history ordered by newest uses (user, -uploaded_at)"""
+        plan = self.explain(Dataset.objects.filter(user=self.user).order_by('-uploaded_at'))
+        self.assertIn('dataset_user_uploaded_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+        
+    def test_dataset_records_use_name_index(self):
+        """Test that a dataset's records in name order use (dataset, equipment_name)"""
+        plan = self.explain(EquipmentData.objects.filter(dataset=self.dataset))
+        self.assertIn('equipment_ds_name_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+        
+    def test_type_filter_uses_type_index(self):
+        """Test that filtering a dataset's records by type uses (dataset, equipment_type)"""
+        plan = self.explain(
+            EquipmentData.objects.filter(dataset=self.dataset, equipment_type='Pump').order_by()
+        )
+        self.assertIn('equipment_ds_type_idx', plan)
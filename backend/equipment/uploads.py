@@ -0,0 +1,221 @@
+"""
+Resumable Chunked Uploads.
+
+WHAT: Helpers behind the /api/uploads/ endpoints: start an upload, write
+      chunks at an offset, and turn a finished upload into a Dataset.
+WHY: Large plant exports are sent over unreliable site links. A single
+     multipart request has to start again from zero when the link drops,
+     and Django's upload handlers buffer the whole request before the view
+     runs.
+HOW: Each chunk is a raw request body streamed from request.stream into a
+     partial file at its offset, hashed on the way in and checked against
+     the checksum the client sent. A bad chunk is truncated away. The
+     client can always ask for the current offset and resume from there.
+     On finalize the partial file is renamed to its content-addressed name
+     in the datasets folder (see dedupe.py) and the usual UploadJob
+     processing starts.
+"""
+
+import hashlib
+import os
+from datetime import timedelta
+from typing import BinaryIO
+
+from django.conf import settings
+from django.utils import timezone
+
+from .dedupe import create_stored_dataset
+from .models import Dataset, UploadSession
+from .utils import validate_csv_size
+
+# Bytes copied from the request stream per read
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(ValueError):
+    """Raised when a chunk or finalize request cannot be accepted"""
+    
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def max_chunk_bytes() -> int:
+    """Largest chunk accepted in one request"""
+    return settings.UPLOAD_CHUNK_MAX_MB * 1024 * 1024
+
+
+def expire_stale_sessions(user) -> int:
+    """
+    Delete a user's unfinished uploads that have not received data in
+    UPLOAD_SESSION_TTL_HOURS, along with their partial files.
+    
+    Returns:
+        Number of sessions removed
+    """
+    cutoff = timezone.now() - timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+    stale = list(UploadSession.objects.filter(
+        user=user,
+        status__in=[UploadSession.STATUS_ACTIVE, UploadSession.STATUS_FINALIZING],
+        updated_at__lt=cutoff
+    ))
+    for session in stale:
+        session.delete_file()
+        session.delete()
+    return len(stale)
+
+
+def start_upload_session(user, file_name: str, total_size: int) -> UploadSession:
+    """
+    Validate an upload request and create its session and empty part file.
+    
+    Args:
+        user: Uploading user
+        file_name: Original CSV file name
+        total_size: Size of the whole file in bytes
+    
+    Returns:
+        The new UploadSession
+    
+    Example:
+        session = start_upload_session(request.user, 'plant.csv', 524288000)
+    """
+    if not file_name or not file_name.endswith('.csv'):
+        raise UploadError('File must be a CSV')
+    if total_size <= 0:
+        raise UploadError('total_size must be a positive number of bytes')
+    
+    is_valid, error_msg = validate_csv_size(total_size, max_size_mb=settings.MAX_UPLOAD_SIZE_MB)
+    if not is_valid:
+        raise UploadError(error_msg)
+    
+    expire_stale_sessions(user)
+    session = UploadSession.objects.create(
+        user=user,
+        file_name=os.path.basename(file_name),
+        total_size=total_size
+    )
+    os.makedirs(os.path.dirname(session.part_path), exist_ok=True)
+    open(session.part_path, 'wb').close()
+    return session
+
+
+def write_chunk(session: UploadSession, offset: int, stream: BinaryIO,
+                length: int, sha256: str) -> UploadSession:
+    """
+    Write one chunk into a session's part file.
+    
+    The chunk is copied from the stream in small blocks, so memory use
+    does not depend on the chunk size. If its SHA-256 does not match,
+    the part file is truncated back to `offset` and nothing is recorded.
+    
+    Args:
+        session: Active upload session
+        offset: Byte position of the chunk - must equal received_bytes
+        stream: Readable request body
+        length: Chunk size in bytes (the request's Content-Length)
+        sha256: Hex SHA-256 of the chunk sent by the client
+    
+    Returns:
+        The updated session
+    """
+    if session.status != UploadSession.STATUS_ACTIVE:
+        raise UploadError('Upload is already finalized', status_code=409)
+    if offset != session.received_bytes:
+        # Client is out of sync (e.g. a retried chunk) - it should resume
+        # from the offset we report
+        raise UploadError(f'Expected offset {session.received_bytes}', status_code=409)
+    if length <= 0:
+        raise UploadError('Chunk is empty')
+    if length > max_chunk_bytes():
+        raise UploadError(f'Chunk exceeds {settings.UPLOAD_CHUNK_MAX_MB}MB', status_code=413)
+    if offset + length > session.total_size:
+        raise UploadError('Chunk runs past the declared file size')
+    if not sha256:
+        raise UploadError('Missing X-Chunk-SHA256 header')
+    
+    digest = hashlib.sha256()
+    written = 0
+    with open(session.part_path, 'r+b') as part:
+        part.seek(offset)
+        try:
+            while written < length:
+                block = stream.read(min(STREAM_BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                part.write(block)
+                digest.update(block)
+                written += len(block)
+        except Exception:
+            # Connection dropped mid-chunk - discard what arrived
+            part.truncate(offset)
+            raise
+        
+        if written != length or digest.hexdigest() != sha256.lower():
+            part.truncate(offset)
+            if written != length:
+                raise UploadError('Chunk body is shorter than Content-Length')
+            raise UploadError('Chunk checksum mismatch', status_code=422)
+        part.truncate(offset + length)
+    
+    # Only advance if no other request moved the offset meanwhile
+    updated = UploadSession.objects.filter(
+        pk=session.pk, received_bytes=offset, status=UploadSession.STATUS_ACTIVE
+    ).update(received_bytes=offset + length, updated_at=timezone.now())
+    if not updated:
+        raise UploadError('Upload was modified by another request', status_code=409)
+    
+    session.refresh_from_db()
+    return session
+
+
+def file_sha256(path: str) -> str:
+    """Hex SHA-256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def finalize_upload_session(session: UploadSession, sha256: str = '') -> Dataset:
+    """
+    Turn a complete upload into a pending Dataset.
+    
+    The part file is renamed to its content-addressed name in
+    MEDIA_ROOT/datasets/ (no copy), so the dataset's CSV is the exact file
+    that was uploaded - or an identical one that was already stored.
+    
+    Args:
+        session: Upload session with every byte received
+        sha256: Optional hex SHA-256 of the whole file to verify
+    
+    Returns:
+        The new Dataset (status pending - start an UploadJob for it)
+    """
+    if not session.is_complete:
+        raise UploadError(
+            f'Upload is incomplete ({session.received_bytes} of {session.total_size} bytes)',
+            status_code=409
+        )
+    # Claim the session, so a concurrent finalize of it gets 409 instead of
+    # racing for the part file
+    claimed = UploadSession.objects.filter(
+        pk=session.pk, status=UploadSession.STATUS_ACTIVE
+    ).update(status=UploadSession.STATUS_FINALIZING, updated_at=timezone.now())
+    if not claimed:
+        raise UploadError('Upload is already finalized', status_code=409)
+    
+    try:
+        content_hash = file_sha256(session.part_path)
+        if sha256 and content_hash != sha256.lower():
+            raise UploadError('File checksum mismatch', status_code=422)
+        dataset = create_stored_dataset(session.user, session.part_path, content_hash)
+    except BaseException:
+        UploadSession.objects.filter(pk=session.pk).update(status=UploadSession.STATUS_ACTIVE)
+        raise
+    
+    session.status = UploadSession.STATUS_FINALIZED
+    session.dataset = dataset
+    session.save(update_fields=['status', 'dataset', 'updated_at'])
+    return dataset
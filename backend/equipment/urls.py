@@ -9,10 +9,22 @@ URL Structure:
     /api/login/ -> login_view
     /api/register/ -> register_view
     /api/upload-csv/ -> upload_csv_view
+    /api/jobs/<id>/ -> job_status_view
+    /api/uploads/ -> upload_session_create_view
+    /api/uploads/<id>/ -> upload_session_view
+    /api/uploads/<id>/chunk/ -> upload_chunk_view
+    /api/uploads/<id>/finalize/ -> upload_finalize_view
     /api/upload-history/ -> upload_history_view
+    /api/datasets/compare/?ids=<a>,<b> -> compare_datasets_view
     /api/datasets/<id>/summary/ -> dataset_summary_view
+    /api/datasets/<id>/records/ -> dataset_records_view
+    /api/datasets/<id>/stats/ -> dataset_stats_view
+    /api/datasets/<id>/histogram/ -> dataset_histogram_view
+    /api/datasets/<id>/scatter/ -> dataset_scatter_view
+    /api/datasets/<id>/export/?format=csv|jsonl|parquet -> dataset_export_view
     /api/datasets/<id>/delete/ -> delete_dataset_view
     /api/datasets/<id>/download-pdf/ -> download_pdf_view
+    /api/cache-stats/ -> cache_stats_view
 """
 
 from django.urls import path
@@ -25,10 +37,26 @@ urlpatterns = [
     
     # CSV upload
     path('upload-csv/', views.upload_csv_view, name='upload-csv'),
+    path('jobs/<int:job_id>/', views.job_status_view, name='job-status'),
+    
+    # Resumable chunked upload
+    path('uploads/', views.upload_session_create_view, name='upload-session-create'),
+    path('uploads/<int:session_id>/', views.upload_session_view, name='upload-session'),
+    path('uploads/<int:session_id>/chunk/', views.upload_chunk_view, name='upload-chunk'),
+    path('uploads/<int:session_id>/finalize/', views.upload_finalize_view, name='upload-finalize'),
     
     # Dataset management
     path('upload-history/', views.upload_history_view, name='upload-history'),
+    path('datasets/compare/', views.compare_datasets_view, name='dataset-compare'),
     path('datasets/<int:dataset_id>/summary/', views.dataset_summary_view, name='dataset-summary'),
+    path('datasets/<int:dataset_id>/records/', views.dataset_records_view, name='dataset-records'),
+    path('datasets/<int:dataset_id>/stats/', views.dataset_stats_view, name='dataset-stats'),
+    path('datasets/<int:dataset_id>/histogram/', views.dataset_histogram_view, name='dataset-histogram'),
+    path('datasets/<int:dataset_id>/scatter/', views.dataset_scatter_view, name='dataset-scatter'),
+    path('datasets/<int:dataset_id>/export/', views.dataset_export_view, name='dataset-export'),
     path('datasets/<int:dataset_id>/delete/', views.delete_dataset_view, name='dataset-delete'),
     path('datasets/<int:dataset_id>/download-pdf/', views.download_pdf_view, name='download-pdf'),
+    
+    # Monitoring
+    path('cache-stats/', views.cache_stats_view, name='cache-stats'),
 ]
@@ -3,20 +3,154 @@ CSV Processing Utilities.
 
 WHAT: Functions to read, validate, and analyze CSV files.
 WHY: We need to extract data and calculate statistics from uploaded CSVs.
-HOW: Use Pandas to read CSV and calculate averages.
+HOW: Use Pandas to read CSV and calculate averages. Large files are read
+     in chunks so memory use stays bounded.
 """
 
+import os
+import numpy as np
 import pandas as pd
 import json
-from typing import Dict, Tuple, List
+from typing import Callable, Dict, Optional, Tuple, List
 
+from .stats import DatasetProfiler
 
-def process_csv_file(file_path: str) -> Tuple[bool, Dict, str]:
+
+# Standardized column names used throughout the app
+REQUIRED_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+NUMERIC_COLUMNS = ['Flowrate', 'Pressure', 'Temperature']
+
+# on_progress(phase, rows_processed, fraction_done) - used for job status
+ProgressCallback = Callable[[str, int, float], None]
+
+
+def _ignore_progress(phase: str, rows: int, fraction: float) -> None:
+    """Default progress callback that does nothing"""
+
+
+def standardize_columns(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Rename CSV columns to the standard names (case-insensitive match).
+    
+    Args:
+        df: DataFrame straight from pd.read_csv
+    
+    Returns:
+        Tuple of (renamed_df, missing_columns)
+        - missing_columns is empty when all required columns are present
+    """
+    # Strip whitespace so ' Flowrate ' still matches
+    df.columns = df.columns.str.strip()
+    
+    # Create mapping of lowercase column names to actual column names
+    column_mapping = {col.lower(): col for col in df.columns}
+    
+    # Check for required columns (case-insensitive)
+    missing_columns = [
+        col for col in REQUIRED_COLUMNS
+        if col.lower() not in column_mapping
+    ]
+    
+    # Build rename mapping from actual columns to standard names
+    rename_mapping = {
+        column_mapping[col.lower()]: col
+        for col in REQUIRED_COLUMNS
+        if col.lower() in column_mapping
+    }
+    
+    return df.rename(columns=rename_mapping), missing_columns
+
+
+def clean_equipment_frame(df: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+    """
+    Drop incomplete rows and convert numeric columns to floats.
+    
+    Args:
+        df: DataFrame with standardized column names
+    
+    Returns:
+        Tuple of (clean_df, rows_with_values)
+        - rows_with_values: rows that had every required column filled in,
+          before invalid numbers were removed
+    """
+    # Remove rows with any missing values
+    df_clean = df.dropna(subset=REQUIRED_COLUMNS)
+    rows_with_values = len(df_clean)
+    
+    # Convert numeric columns to float, replacing any invalid values with NaN.
+    # 'inf' and overflowing numbers like 1e400 parse as infinity - treat
+    # them as invalid too, the statistics and charts need finite values
+    for col in NUMERIC_COLUMNS:
+        df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce').replace([np.inf, -np.inf], np.nan)
+    
+    # Remove rows where numeric conversion failed
+    df_clean = df_clean.dropna(subset=NUMERIC_COLUMNS)
+    
+    return df_clean, rows_with_values
+
+
+class CSVAggregator:
+    """
+    Incrementally computes dataset analytics over one or more DataFrames.
+    
+    WHAT: Keeps running count, sums, type counts and the per-column
+          statistics profile (see stats.py).
+    WHY: Lets the streaming parser compute averages without holding the
+         whole file in memory.
+    HOW: Call update() with each cleaned chunk, then result() at the end.
+    
+    Example:
+        aggregator = CSVAggregator()
+        for chunk in iter_csv_chunks(path):
+            aggregator.update(chunk)
+        analytics = aggregator.result()
+    """
+    
+    def __init__(self):
+        self.total_equipment = 0
+        self.sums = {col: 0.0 for col in NUMERIC_COLUMNS}
+        self.type_counts = {}
+        self.profiler = DatasetProfiler()
+    
+    def update(self, df: pd.DataFrame) -> None:
+        """Add a cleaned chunk to the running totals"""
+        self.total_equipment += len(df)
+        for col in NUMERIC_COLUMNS:
+            self.sums[col] += float(df[col].sum())
+        for eq_type, count in df['Type'].astype(str).value_counts(sort=False).items():
+            self.type_counts[eq_type] = self.type_counts.get(eq_type, 0) + int(count)
+        self.profiler.update(df)
+    
+    def mean(self, column: str) -> float:
+        """Return the running mean of a numeric column"""
+        if self.total_equipment == 0:
+            return 0.0
+        return self.sums[column] / self.total_equipment
+    
+    def result(self) -> Dict:
+        """Return analytics in the same shape as process_csv_file"""
+        # Most common types first, matching pandas value_counts()
+        type_counts = dict(sorted(self.type_counts.items(), key=lambda item: -item[1]))
+        return {
+            'total_equipment': self.total_equipment,
+            'avg_flowrate': round(self.mean('Flowrate'), 2),
+            'avg_pressure': round(self.mean('Pressure'), 2),
+            'avg_temperature': round(self.mean('Temperature'), 2),
+            'equipment_types': json.dumps(type_counts),
+            'column_stats': self.profiler.result()
+        }
+
+
+def process_csv_file(file_path: str,
+                     on_progress: Optional[ProgressCallback] = None,
+                     on_frame: Optional[Callable[[pd.DataFrame], None]] = None) -> Tuple[bool, Dict, str]:
     """
     Process a CSV file and extract equipment data with analytics.
     
     Args:
         file_path: Path to the CSV file
+        on_progress: Optional callback, called as on_progress(phase, rows, fraction)
+        on_frame: Optional callback, called with the cleaned DataFrame
     
     Returns:
         Tuple of (success, data_dict, error_message)
@@ -29,96 +163,37 @@ def process_csv_file(file_path: str) -> Tuple[bool, Dict, str]:
         if success:
             print(f"Total equipment: {data['total_equipment']}")
     """
+    report = on_progress or _ignore_progress
+    
     try:
         # Read CSV file using Pandas
+        report('parsing', 0, 0.0)
         df = pd.read_csv(file_path)
         
         # Normalize column names to be case-insensitive
-        # Strip whitespace and convert to lowercase for matching
-        df.columns = df.columns.str.strip()
-        
-        # Create mapping of lowercase column names to actual column names
-        column_mapping = {col.lower(): col for col in df.columns}
-        
-        # Define required columns (lowercase for comparison)
-        required_columns_lower = ['equipment name', 'type', 'flowrate', 'pressure', 'temperature']
-        
-        # Check for required columns (case-insensitive)
-        missing_columns = []
-        for req_col in required_columns_lower:
-            if req_col not in column_mapping:
-                missing_columns.append(req_col.replace('equipment name', 'Equipment Name').title())
+        df, missing_columns = standardize_columns(df)
         
         if missing_columns:
             return False, {}, f"Missing required columns: {', '.join(missing_columns)}"
         
-        # Rename columns to standardized format
-        standard_names = {
-            'equipment name': 'Equipment Name',
-            'type': 'Type',
-            'flowrate': 'Flowrate',
-            'pressure': 'Pressure',
-            'temperature': 'Temperature'
-        }
-        
-        # Build rename mapping from actual columns to standard names
-        rename_mapping = {}
-        for lower_col, actual_col in column_mapping.items():
-            if lower_col in standard_names:
-                rename_mapping[actual_col] = standard_names[lower_col]
-        
-        df = df.rename(columns=rename_mapping)
+        df_clean, rows_with_values = clean_equipment_frame(df)
         
-        # Now work with standardized column names
-        required_columns = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
-        
-        # Remove rows with any missing values
-        df_clean = df.dropna(subset=required_columns)
-        
-        if len(df_clean) == 0:
+        if rows_with_values == 0:
             return False, {}, "No valid data rows found in CSV file"
         
-        # Convert numeric columns to float, replacing any invalid values with NaN
-        numeric_columns = ['Flowrate', 'Pressure', 'Temperature']
-        for col in numeric_columns:
-            df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce')
-        
-        # Remove rows where numeric conversion failed
-        df_clean = df_clean.dropna(subset=numeric_columns)
-        
         if len(df_clean) == 0:
             return False, {}, "No valid numeric data found in CSV file"
         
-        # Calculate analytics
-        total_equipment = len(df_clean)
-        avg_flowrate = float(df_clean['Flowrate'].mean())
-        avg_pressure = float(df_clean['Pressure'].mean())
-        avg_temperature = float(df_clean['Temperature'].mean())
-        
-        # Calculate equipment type distribution
-        type_counts = df_clean['Type'].value_counts().to_dict()
-        equipment_types = json.dumps(type_counts)
+        # Calculate analytics (totals, averages, type distribution)
+        report('aggregating', len(df_clean), 0.5)
+        aggregator = CSVAggregator()
+        aggregator.update(df_clean)
+        result = aggregator.result()
+        if on_frame:
+            on_frame(df_clean)
         
         # Prepare equipment records as list of dictionaries
-        equipment_records = []
-        for _, row in df_clean.iterrows():
-            equipment_records.append({
-                'equipment_name': str(row['Equipment Name']),
-                'equipment_type': str(row['Type']),
-                'flowrate': float(row['Flowrate']),
-                'pressure': float(row['Pressure']),
-                'temperature': float(row['Temperature'])
-            })
-        
-        # Prepare result dictionary
-        result = {
-            'total_equipment': total_equipment,
-            'avg_flowrate': round(avg_flowrate, 2),
-            'avg_pressure': round(avg_pressure, 2),
-            'avg_temperature': round(avg_temperature, 2),
-            'equipment_types': equipment_types,
-            'equipment_records': equipment_records
-        }
+        result['equipment_records'] = extract_equipment_records(df_clean)
         
         return True, result, ""
     
@@ -135,6 +210,128 @@ def process_csv_file(file_path: str) -> Tuple[bool, Dict, str]:
         return False, {}, f"Error processing CSV: {str(e)}"
 
 
+def process_csv_file_streaming(file_path: str,
+                               on_chunk: Callable[[List[Dict]], None],
+                               chunk_size: int = 50000,
+                               on_progress: Optional[ProgressCallback] = None,
+                               on_frame: Optional[Callable[[pd.DataFrame], None]] = None) -> Tuple[bool, Dict, str]:
+    """
+    Process a CSV file in chunks, handing records to a callback as it goes.
+    
+    WHAT: Streaming version of process_csv_file for files larger than memory.
+    WHY: pd.read_csv on a multi-GB file would load everything at once.
+    HOW: Read `chunk_size` rows at a time, clean each chunk, update a
+         CSVAggregator and pass the chunk's records to `on_chunk`.
+         Only one chunk is ever held in memory.
+    
+    Args:
+        file_path: Path to the CSV file
+        on_chunk: Called with each chunk's list of record dictionaries
+        chunk_size: Number of CSV rows to read per chunk
+        on_progress: Optional callback, called as on_progress(phase, rows, fraction)
+            where fraction is the share of the file's bytes read so far
+        on_frame: Optional callback, called with each cleaned DataFrame chunk
+    
+    Returns:
+        Tuple of (success, data_dict, error_message)
+        - data_dict has the same analytics as process_csv_file,
+          without 'equipment_records'
+    
+    Example:
+        success, data, error = process_csv_file_streaming(
+            path, lambda records: write_equipment_records(dataset, records)
+        )
+    """
+    report = on_progress or _ignore_progress
+    
+    try:
+        aggregator = CSVAggregator()
+        rows_with_values = 0
+        file_size = max(os.path.getsize(file_path), 1)
+        
+        report('parsing', 0, 0.0)
+        with open(file_path, 'rb') as handle, pd.read_csv(handle, chunksize=chunk_size) as reader:
+            for chunk in reader:
+                chunk, missing_columns = standardize_columns(chunk)
+                if missing_columns:
+                    return False, {}, f"Missing required columns: {', '.join(missing_columns)}"
+                
+                chunk_clean, chunk_rows = clean_equipment_frame(chunk)
+                rows_with_values += chunk_rows
+                if len(chunk_clean) == 0:
+                    continue
+                
+                fraction = min(handle.tell() / file_size, 1.0)
+                report('aggregating', aggregator.total_equipment, fraction)
+                aggregator.update(chunk_clean)
+                if on_frame:
+                    on_frame(chunk_clean)
+                
+                report('writing', aggregator.total_equipment, fraction)
+                on_chunk(extract_equipment_records(chunk_clean))
+                report('parsing', aggregator.total_equipment, fraction)
+        
+        if rows_with_values == 0:
+            return False, {}, "No valid data rows found in CSV file"
+        
+        if aggregator.total_equipment == 0:
+            return False, {}, "No valid numeric data found in CSV file"
+        
+        return True, aggregator.result(), ""
+    
+    except FileNotFoundError:
+        return False, {}, "File not found"
+    
+    except pd.errors.EmptyDataError:
+        return False, {}, "CSV file is empty"
+    
+    except pd.errors.ParserError:
+        return False, {}, "Invalid CSV format"
+    
+    except Exception as e:
+        return False, {}, f"Error processing CSV: {str(e)}"
+
+
+def extract_equipment_records(df: pd.DataFrame) -> List[Dict]:
+    """
+    Build equipment record dictionaries from a cleaned DataFrame.
+    
+    WHAT: Column-wise replacement for looping over df.iterrows().
+    WHY: iterrows() builds a pandas Series for every row, which dominated
+         upload time on large plant exports.
+    HOW: Convert each column to a plain Python list once (straight from the
+         underlying NumPy array) and zip the columns together.
+    
+    Args:
+        df: DataFrame with standardized, already-cleaned columns
+            (Equipment Name, Type, Flowrate, Pressure, Temperature)
+    
+    Returns:
+        List of dictionaries ready to be saved as EquipmentData
+    
+    Example:
+        records = extract_equipment_records(df_clean)
+        # Returns: [{'equipment_name': 'Pump A', 'equipment_type': 'Pump', ...}]
+    """
+    names = df['Equipment Name'].astype(str).tolist()
+    types = df['Type'].astype(str).tolist()
+    flowrates = df['Flowrate'].to_numpy(dtype='float64').tolist()
+    pressures = df['Pressure'].to_numpy(dtype='float64').tolist()
+    temperatures = df['Temperature'].to_numpy(dtype='float64').tolist()
+    
+    return [
+        {
+            'equipment_name': name,
+            'equipment_type': eq_type,
+            'flowrate': flowrate,
+            'pressure': pressure,
+            'temperature': temperature
+        }
+        for name, eq_type, flowrate, pressure, temperature
+        in zip(names, types, flowrates, pressures, temperatures)
+    ]
+
+
 def validate_csv_size(file_size: int, max_size_mb: int = 10) -> Tuple[bool, str]:
     """
     Validate if CSV file size is within acceptable limits.
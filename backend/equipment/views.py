@@ -6,19 +6,56 @@ WHY: When someone calls our API, these functions run and return responses.
 HOW: We use Django REST Framework's APIView and viewsets.
 """
 
-import os
+import math
+
 from rest_framework import status, viewsets
 from rest_framework.decorators import api_view, permission_classes, action
+from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
 from django.conf import settings
-from .models import Dataset, EquipmentData
-from .serializers import DatasetSerializer, DatasetListSerializer, EquipmentDataSerializer
-from .utils import process_csv_file, validate_csv_size, get_equipment_type_chart_data
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import method_decorator
+from django.utils.text import compress_sequence
+from django.views.decorators.http import condition
+from .models import Dataset, DatasetColumnStats, EquipmentData, UploadJob, UploadSession
+from .serializers import (
+    DatasetSerializer, DatasetListSerializer, EquipmentDataSerializer,
+    UploadJobSerializer, UploadSessionSerializer
+)
+from .utils import validate_csv_size
 from .pdf_generator import generate_pdf_report
+from .jobs import enqueue_upload_job, run_upload_job
+from .pagination import InvalidCursor, paginate_keyset
+from .cache import get_dataset_summary, get_summary_cache_stats
+from .compare import COMPARE_COLUMNS, MAX_COMPARE_ROWS, get_comparison
+from .charts import CHART_COLUMNS, MAX_HISTOGRAM_BINS, get_histograms, get_scatter
+from .etags import (
+    compare_etag, dataset_last_modified, export_etag, histogram_etag, history_etag, pdf_etag,
+    scatter_etag, stats_etag, summary_etag
+)
+from .export import (
+    EXPORT_FORMATS, EXPORT_WRITERS, ExportContentNegotiation, accepts_gzip, export_filename,
+    parquet_available
+)
+from .dedupe import create_stored_dataset, receive_upload
+from .ingest import backfill_column_stats
+from .retention import delete_dataset_objects, kept_datasets
+from .uploads import (
+    UploadError, finalize_upload_session, max_chunk_bytes, start_upload_session, write_chunk
+)
+
+# Numeric EquipmentData columns that can be filtered and ordered on
+RECORD_NUMERIC_FIELDS = ('flowrate', 'pressure', 'temperature')
+
+
+def is_false(value):
+    """True if a query parameter explicitly turns an option off"""
+    return value is not None and value.lower() in ('0', 'false', 'no')
 
 
 @api_view(['POST'])
@@ -137,21 +174,34 @@ def upload_csv_view(request):
     WHY: This is the core feature - uploading and analyzing equipment data.
     HOW: 
         1. Validate file exists and size is OK
-        2. Save file temporarily
-        3. Process with Pandas
-        4. Save to database
+        2. Create a pending Dataset + UploadJob and store the file content-addressed
+        3. Process with Pandas (in chunks for large files), or copy the
+           records of the user's identical earlier upload
+        4. Bulk insert records
         5. Keep only last 5 datasets
+        With UPLOAD_ASYNC, steps 3-5 run in a background worker.
     
     Request:
         POST with multipart/form-data
         Field: 'file' (CSV file)
     
-    Response:
+    Response (UPLOAD_ASYNC, 202 Accepted):
+        {
+            "id": 7,
+            "phase": "queued",
+            "status_url": "/api/jobs/7/",
+            ...
+        }
+    
+    Response (synchronous, 201 Created):
         {
             "id": 1,
             "total_equipment": 10,
             "avg_flowrate": 195.23,
             ...
+            "rows_written": 10,
+            "write_time_ms": 4.21,
+            "duplicate_of": null
         }
     """
     # Check if file is provided
@@ -171,66 +221,247 @@ def upload_csv_view(request):
         )
     
     # Validate file size
-    is_valid, error_msg = validate_csv_size(file.size, max_size_mb=10)
+    is_valid, error_msg = validate_csv_size(file.size, max_size_mb=settings.MAX_UPLOAD_SIZE_MB)
     if not is_valid:
         return Response(
             {'error': error_msg},
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Create dataset instance
-    dataset = Dataset.objects.create(
-        user=request.user,
-        file=file
-    )
+    # Create the dataset (filled in by the upload job) and store the file
+    # under its SHA-256
+    tmp_path, content_hash = receive_upload(file)
+    dataset = create_stored_dataset(request.user, tmp_path, content_hash)
+    return start_processing(request, dataset)
+
+
+def start_processing(request, dataset):
+    """
+    Create the UploadJob for a pending dataset and run or enqueue it.
     
-    # Get file path
-    file_path = dataset.file.path
+    Returns the upload response: 202 with the job (UPLOAD_ASYNC), or 201
+    with the processed dataset, or 400 if processing failed.
+    """
+    job = UploadJob.objects.create(user=request.user, dataset=dataset)
     
-    # Process CSV file
-    success, data, error_msg = process_csv_file(file_path)
+    if settings.UPLOAD_ASYNC:
+        # Process in the background - client polls /api/jobs/<id>/
+        enqueue_upload_job(job)
+        job.refresh_from_db()
+        response_data = UploadJobSerializer(job).data
+        response_data['status_url'] = f'/api/jobs/{job.id}/'
+        return Response(response_data, status=status.HTTP_202_ACCEPTED)
     
-    if not success:
-        dataset.delete()  # Clean up
+    # Synchronous mode: process now and return the finished dataset
+    metrics = run_upload_job(job.id)
+    
+    if metrics is None:
+        job.refresh_from_db()
         return Response(
-            {'error': error_msg},
+            {'error': job.error},
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Update dataset with analytics
-    dataset.total_equipment = data['total_equipment']
-    dataset.avg_flowrate = data['avg_flowrate']
-    dataset.avg_pressure = data['avg_pressure']
-    dataset.avg_temperature = data['avg_temperature']
-    dataset.equipment_types = data['equipment_types']
-    dataset.save()
-    
-    # Save equipment records
-    for record in data['equipment_records']:
-        EquipmentData.objects.create(
-            dataset=dataset,
-            **record
+    # Return serialized data along with write-phase metrics
+    dataset.refresh_from_db()
+    serializer = DatasetSerializer(dataset)
+    response_data = serializer.data
+    response_data['rows_written'] = metrics['rows_written']
+    response_data['write_time_ms'] = round(metrics['write_seconds'] * 1000, 2)
+    response_data['duplicate_of'] = metrics.get('duplicate_of')
+    return Response(response_data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def job_status_view(request, job_id):
+    """
+    Get progress of a background upload job.
+    
+    WHAT: Returns the phase, rows processed and estimated time remaining.
+    WHY: Uploads are processed in the background; clients poll this.
+    HOW: Read the UploadJob row the worker keeps up to date.
+    
+    URL: /api/jobs/<id>/
+    
+    Response:
+        {
+            "id": 7,
+            "dataset": {"id": 12, "status": "processing", ...},
+            "phase": "writing",
+            "rows_processed": 150000,
+            "progress": 0.62,
+            "eta_seconds": 4.1,
+            "error": ""
+        }
+    """
+    try:
+        job = UploadJob.objects.select_related('dataset').get(id=job_id, user=request.user)
+    except UploadJob.DoesNotExist:
+        return Response(
+            {'error': 'Job not found'},
+            status=status.HTTP_404_NOT_FOUND
         )
     
-    # Keep only last 5 datasets per user
-    user_datasets = Dataset.objects.filter(user=request.user).order_by('-uploaded_at')
-    if user_datasets.count() > 5:
-        # Delete oldest datasets
-        datasets_to_delete = user_datasets[5:]
-        for old_dataset in datasets_to_delete:
-            # Delete associated file
-            if old_dataset.file:
-                if os.path.exists(old_dataset.file.path):
-                    os.remove(old_dataset.file.path)
-            old_dataset.delete()
-    
-    # Return serialized data
-    serializer = DatasetSerializer(dataset)
-    return Response(serializer.data, status=status.HTTP_201_CREATED)
+    return Response(UploadJobSerializer(job).data)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def upload_session_create_view(request):
+    """
+    Start a resumable chunked upload.
+    
+    WHAT: Registers a file that will be sent in chunks.
+    WHY: Large files over unreliable links need to resume where they
+         stopped instead of starting again.
+    HOW: Validate name and size, create an UploadSession and an empty
+         partial file.
+    
+    URL: /api/uploads/
+    
+    Request Body:
+        {
+            "file_name": "plant_export.csv",
+            "total_size": 524288000
+        }
+    
+    Response (201 Created):
+        {
+            "id": 3,
+            "received_bytes": 0,
+            "max_chunk_size": 8388608,
+            ...
+        }
+    """
+    try:
+        total_size = int(request.data.get('total_size', 0))
+    except (TypeError, ValueError):
+        return Response(
+            {'error': 'total_size must be an integer'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        session = start_upload_session(request.user, request.data.get('file_name', ''), total_size)
+    except UploadError as e:
+        return Response({'error': str(e)}, status=e.status_code)
+    
+    response_data = UploadSessionSerializer(session).data
+    response_data['max_chunk_size'] = max_chunk_bytes()
+    return Response(response_data, status=status.HTTP_201_CREATED)
+
+
+def get_upload_session(request, session_id):
+    """The user's upload session, or None"""
+    return UploadSession.objects.filter(id=session_id, user=request.user).first()
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def upload_session_view(request, session_id):
+    """
+    Get the state of a resumable upload.
+    
+    URL: /api/uploads/<id>/
+    
+    Clients call this after a dropped connection and resume by sending
+    the next chunk at received_bytes.
+    """
+    session = get_upload_session(request, session_id)
+    if session is None:
+        return Response(
+            {'error': 'Upload not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    return Response(UploadSessionSerializer(session).data)
+
+
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+def upload_chunk_view(request, session_id):
+    """
+    Upload one chunk of a resumable upload.
+    
+    WHAT: Writes the raw request body into the upload at ?offset=.
+    WHY: Each chunk is small enough to retry cheaply.
+    HOW: The body is streamed to disk (never parsed or buffered) and its
+         SHA-256 is compared with the X-Chunk-SHA256 header.
+    
+    URL: /api/uploads/<id>/chunk/?offset=<bytes>
+    
+    Request:
+        PUT with Content-Type: application/octet-stream
+        Header X-Chunk-SHA256: hex digest of the chunk
+    
+    Response:
+        200 with the session (received_bytes = next offset)
+        409 if offset is not the next expected byte ({"received_bytes": ...})
+        422 if the checksum does not match (chunk discarded)
+    """
+    session = get_upload_session(request, session_id)
+    if session is None:
+        return Response(
+            {'error': 'Upload not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    try:
+        offset = int(request.query_params.get('offset', ''))
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        return Response(
+            {'error': 'offset must be an integer'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        session = write_chunk(
+            session, offset, request.stream, length,
+            request.headers.get('X-Chunk-SHA256', '')
+        )
+    except UploadError as e:
+        session.refresh_from_db()
+        return Response(
+            {'error': str(e), 'received_bytes': session.received_bytes},
+            status=e.status_code
+        )
+    
+    return Response(UploadSessionSerializer(session).data)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def upload_finalize_view(request, session_id):
+    """
+    Finish a resumable upload and start processing it.
+    
+    URL: /api/uploads/<id>/finalize/
+    
+    Request Body (optional):
+        {"sha256": "<hex digest of the whole file>"}
+    
+    Response:
+        Same as /api/upload-csv/ (202 with the job, or 201 with the dataset)
+    """
+    session = get_upload_session(request, session_id)
+    if session is None:
+        return Response(
+            {'error': 'Upload not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    try:
+        dataset = finalize_upload_session(session, request.data.get('sha256', ''))
+    except UploadError as e:
+        return Response({'error': str(e)}, status=e.status_code)
+    
+    return start_processing(request, dataset)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@condition(etag_func=summary_etag, last_modified_func=dataset_last_modified)
 def dataset_summary_view(request, dataset_id):
     """
     Get detailed summary of a specific dataset.
@@ -241,6 +472,12 @@ def dataset_summary_view(request, dataset_id):
     
     URL: /api/datasets/<id>/summary/
     
+    Supports conditional GET (ETag / Last-Modified -> 304 Not Modified).
+    
+    Query Parameters:
+        include_records: 'false' to leave out equipment_records
+            (page through them with /api/datasets/<id>/records/ instead)
+    
     Response:
         {
             "id": 1,
@@ -257,27 +494,344 @@ def dataset_summary_view(request, dataset_id):
             status=status.HTTP_404_NOT_FOUND
         )
     
-    serializer = DatasetSerializer(dataset)
+    # Serialized summary + chart data, served from the cache when possible
+    include_records = not is_false(request.query_params.get('include_records'))
+    response_data, cache_hit = get_dataset_summary(dataset, include_records)
     
-    # Add chart data
-    response_data = serializer.data
-    response_data['chart_data'] = get_equipment_type_chart_data(dataset.equipment_types)
+    response = Response(response_data)
+    response['X-Cache'] = 'HIT' if cache_hit else 'MISS'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def dataset_records_view(request, dataset_id):
+    """
+    Page through a dataset's equipment records.
+    
+    WHAT: Returns one page of records, with optional filters and ordering.
+    WHY: Large datasets are too big to send in one summary response.
+    HOW: Keyset pagination - each page returns a cursor for the next one.
+    
+    URL: /api/datasets/<id>/records/
+    
+    Query Parameters:
+        equipment_type: Only records of this type
+        flowrate_min, flowrate_max, pressure_min, pressure_max,
+        temperature_min, temperature_max: Inclusive numeric ranges
+        ordering: id, flowrate, pressure or temperature ('-' for descending)
+        limit: Page size (default 100, max 1000)
+        cursor: next_cursor from the previous page
+    
+    Response:
+        {
+            "results": [{"id": 1, "equipment_name": "Pump A", ...}, ...],
+            "next_cursor": "eyJ2IjogMTUwLjUsICJpZCI6IDQyfQ=="
+        }
+    """
+    try:
+        dataset = Dataset.objects.get(id=dataset_id, user=request.user)
+    except Dataset.DoesNotExist:
+        return Response(
+            {'error': 'Dataset not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    params = request.query_params
+    records = EquipmentData.objects.filter(dataset=dataset)
+    
+    equipment_type = params.get('equipment_type')
+    if equipment_type:
+        records = records.filter(equipment_type=equipment_type)
+    
+    # Numeric range filters
+    try:
+        for column in RECORD_NUMERIC_FIELDS:
+            if params.get(f'{column}_min') not in (None, ''):
+                records = records.filter(**{f'{column}__gte': float(params[f'{column}_min'])})
+            if params.get(f'{column}_max') not in (None, ''):
+                records = records.filter(**{f'{column}__lte': float(params[f'{column}_max'])})
+        limit = min(max(int(params.get('limit', 100)), 1), 1000)
+    except ValueError:
+        return Response(
+            {'error': 'Range filters and limit must be numbers'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    ordering = params.get('ordering', 'id')
+    if ordering.lstrip('-') not in ('id',) + RECORD_NUMERIC_FIELDS:
+        return Response(
+            {'error': f'ordering must be one of: id, {", ".join(RECORD_NUMERIC_FIELDS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        rows, next_cursor = paginate_keyset(records, ordering, params.get('cursor'), limit)
+    except InvalidCursor:
+        return Response(
+            {'error': 'Invalid cursor'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    return Response({
+        'results': EquipmentDataSerializer(rows, many=True).data,
+        'next_cursor': next_cursor
+    })
+
+
+def get_ready_dataset(request, dataset_id):
+    """
+    Look up one of the user's finished datasets for a read endpoint.
+    
+    Returns:
+        Tuple of (dataset, None), or (None, error_response)
+    """
+    try:
+        dataset = Dataset.objects.get(id=dataset_id, user=request.user)
+    except Dataset.DoesNotExist:
+        return None, Response(
+            {'error': 'Dataset not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    if dataset.status != Dataset.STATUS_READY:
+        return None, Response(
+            {'error': 'Dataset is still being processed'},
+            status=status.HTTP_409_CONFLICT
+        )
+    return dataset, None
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@condition(etag_func=stats_etag, last_modified_func=dataset_last_modified)
+def dataset_stats_view(request, dataset_id):
+    """
+    Get the statistics profile of a dataset's numeric columns.
+    
+    WHAT: Count, min, max, mean, variance, stddev and p5/p50/p95 per column,
+          for the whole dataset and for each equipment type.
+    WHY: Dashboards need spreads and percentiles without downloading
+         every record.
+    HOW: Reads the DatasetColumnStats rows computed at ingest (computed once
+         from the stored records for datasets uploaded before they existed).
+    
+    URL: /api/datasets/<id>/stats/
+    
+    Supports conditional GET (ETag / Last-Modified -> 304 Not Modified).
+    
+    Response:
+        {
+            "dataset_id": 1,
+            "overall": {"flowrate": {"count": 10, "min": 95.0, "p50": 150.2, ...}, ...},
+            "by_type": {"Pump": {"flowrate": {...}, ...}, ...}
+        }
+    """
+    dataset, error_response = get_ready_dataset(request, dataset_id)
+    if error_response:
+        return error_response
+    
+    fields = ('equipment_type', 'column', 'count', 'min', 'max', 'mean',
+              'variance', 'p5', 'p50', 'p95')
+    rows = list(DatasetColumnStats.objects.filter(dataset=dataset).values(*fields))
+    if not rows and dataset.total_equipment:
+        backfill_column_stats(dataset)
+        rows = list(DatasetColumnStats.objects.filter(dataset=dataset).values(*fields))
+    
+    overall, by_type = {}, {}
+    for row in rows:
+        equipment_type = row.pop('equipment_type')
+        column = row.pop('column')
+        row['stddev'] = math.sqrt(row['variance'])
+        target = by_type.setdefault(equipment_type, {}) if equipment_type else overall
+        target[column] = row
+    
+    return Response({
+        'dataset_id': dataset.id,
+        'overall': overall,
+        'by_type': by_type
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@condition(etag_func=histogram_etag, last_modified_func=dataset_last_modified)
+def dataset_histogram_view(request, dataset_id):
+    """
+    Get histograms of a dataset's flowrate, pressure and temperature.
+    
+    WHAT: Bin edges and counts for every numeric column.
+    WHY: Lets dashboards chart value distributions without the records.
+    HOW: np.histogram over the columns, cached per dataset and bin count.
+    
+    URL: /api/datasets/<id>/histogram/
+    
+    Query Parameters:
+        bins: Number of bins per column (default CHART_HISTOGRAM_BINS, max 200)
+    
+    Response:
+        {
+            "bins": 30,
+            "total_points": 100000,
+            "histograms": {"flowrate": {"edges": [...31 values], "counts": [...30 values]}, ...}
+        }
+    """
+    dataset, error_response = get_ready_dataset(request, dataset_id)
+    if error_response:
+        return error_response
+    
+    try:
+        bins = int(request.query_params.get('bins', settings.CHART_HISTOGRAM_BINS))
+    except ValueError:
+        bins = 0
+    if not 1 <= bins <= MAX_HISTOGRAM_BINS:
+        return Response(
+            {'error': f'bins must be a number between 1 and {MAX_HISTOGRAM_BINS}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    data, cache_hit = get_histograms(dataset, bins)
+    response = Response(data)
+    response['X-Cache'] = 'HIT' if cache_hit else 'MISS'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@condition(etag_func=scatter_etag, last_modified_func=dataset_last_modified)
+def dataset_scatter_view(request, dataset_id):
+    """
+    Get downsampled scatter points for two numeric columns.
     
-    return Response(response_data)
+    WHAT: At most max_points [x, y] pairs, e.g. pressure vs temperature.
+    WHY: A scatter plot of every record would grow with the dataset.
+    HOW: Largest-Triangle-Three-Buckets reduction (see charts.py), cached
+         per dataset and parameters.
+    
+    URL: /api/datasets/<id>/scatter/
+    
+    Query Parameters:
+        x: flowrate, pressure or temperature (default pressure)
+        y: flowrate, pressure or temperature (default temperature)
+        max_points: Points to return (default and maximum CHART_SCATTER_MAX_POINTS)
+    
+    Response:
+        {
+            "x": "pressure",
+            "y": "temperature",
+            "total_points": 100000,
+            "points": [[1.2, 80.5], ...]
+        }
+    """
+    dataset, error_response = get_ready_dataset(request, dataset_id)
+    if error_response:
+        return error_response
+    
+    params = request.query_params
+    x_field = params.get('x', 'pressure')
+    y_field = params.get('y', 'temperature')
+    if x_field not in CHART_COLUMNS or y_field not in CHART_COLUMNS:
+        return Response(
+            {'error': f'x and y must be one of: {", ".join(CHART_COLUMNS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        max_points = int(params.get('max_points', settings.CHART_SCATTER_MAX_POINTS))
+    except ValueError:
+        max_points = 0
+    if not 3 <= max_points <= settings.CHART_SCATTER_MAX_POINTS:
+        return Response(
+            {'error': f'max_points must be a number between 3 and {settings.CHART_SCATTER_MAX_POINTS}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    data, cache_hit = get_scatter(dataset, x_field, y_field, max_points)
+    response = Response(data)
+    response['X-Cache'] = 'HIT' if cache_hit else 'MISS'
+    return response
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@condition(etag_func=compare_etag)
+def compare_datasets_view(request):
+    """
+    Compare two of the user's datasets.
+    
+    WHAT: Per-equipment flowrate/pressure/temperature deltas (records joined
+          by equipment_name), added and removed equipment, and the change in
+          type distribution.
+    WHY: Saves clients from downloading two summaries and diffing them.
+    HOW: One vectorized pandas merge (see compare.py), cached by id pair.
+    
+    URL: /api/datasets/compare/?ids=<base_id>,<target_id>
+    
+    Query Parameters:
+        ids: Base and target dataset ids, comma separated
+        sort: Column whose absolute delta orders 'equipment' (default flowrate)
+        limit: Equipment rows returned (default 100, max 1000)
+    
+    Response:
+        {
+            "base": {"id": 1, ...},
+            "target": {"id": 2, ...},
+            "summary": {"matched": 98, "changed": 40, "added": 2, "removed": 1, "mean_delta": {...}},
+            "type_distribution": [{"equipment_type": "Pump", "base": 4, "target": 6, "delta": 2}, ...],
+            "equipment": [{"equipment_name": "Pump A", "flowrate_base": 120.0, "flowrate_delta": 5.5, ...}, ...],
+            "added": ["Pump Z", ...],
+            "removed": ["Valve Q", ...]
+        }
+    """
+    params = request.query_params
+    try:
+        ids = [int(value) for value in params.get('ids', '').split(',')]
+        limit = min(max(int(params.get('limit', 100)), 1), MAX_COMPARE_ROWS)
+    except ValueError:
+        ids, limit = [], 0
+    if len(ids) != 2 or not limit:
+        return Response(
+            {'error': 'ids must be two dataset ids (e.g. ?ids=3,7) and limit a number'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    sort = params.get('sort', 'flowrate')
+    if sort not in COMPARE_COLUMNS:
+        return Response(
+            {'error': f'sort must be one of: {", ".join(COMPARE_COLUMNS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    datasets = []
+    for dataset_id in ids:
+        dataset, error_response = get_ready_dataset(request, dataset_id)
+        if error_response:
+            return error_response
+        datasets.append(dataset)
+    
+    data, cache_hit = get_comparison(datasets[0], datasets[1], sort, limit)
+    response = Response(data)
+    response['X-Cache'] = 'HIT' if cache_hit else 'MISS'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@condition(etag_func=history_etag)
 def upload_history_view(request):
     """
     Get list of all uploaded datasets for the current user.
     
-    WHAT: Returns last 5 datasets uploaded by the user.
+    WHAT: Returns the datasets the user keeps (newest first; 5 finished
+          ones by default, see RetentionPolicy), plus uploads still being
+          processed.
     WHY: To see history of uploads.
     HOW: Query datasets filtered by user.
     
     URL: /api/upload-history/
     
+    Supports conditional GET (If-None-Match -> 304 Not Modified).
+    
     Response:
         [
             {
@@ -289,7 +843,7 @@ def upload_history_view(request):
             ...
         ]
     """
-    datasets = Dataset.objects.filter(user=request.user)[:5]
+    datasets = kept_datasets(request.user.id)
     serializer = DatasetListSerializer(datasets, many=True)
     return Response(serializer.data)
 
@@ -300,6 +854,9 @@ def delete_dataset_view(request, dataset_id):
     """
     Delete a specific dataset.
     
+    Records are removed with a single DELETE (no rows are loaded into
+    Python), so the query count does not grow with the dataset size.
+    
     URL: /api/datasets/<id>/delete/
     """
     try:
@@ -310,12 +867,8 @@ def delete_dataset_view(request, dataset_id):
             status=status.HTTP_404_NOT_FOUND
         )
     
-    # Delete file
-    if dataset.file:
-        if os.path.exists(dataset.file.path):
-            os.remove(dataset.file.path)
-    
-    dataset.delete()
+    # Records go in one DELETE; files are removed after the commit
+    delete_dataset_objects([dataset])
     
     return Response(
         {'message': 'Dataset deleted successfully'},
@@ -325,16 +878,19 @@ def delete_dataset_view(request, dataset_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@condition(etag_func=pdf_etag, last_modified_func=dataset_last_modified)
 def download_pdf_view(request, dataset_id):
     """
     Download PDF report for a specific dataset.
     
-    WHAT: Generates and returns a PDF report.
+    WHAT: Returns a PDF report (rendered on first request, then cached).
     WHY: Users want downloadable reports with charts and statistics.
-    HOW: Use ReportLab to create a formatted PDF.
+    HOW: Use ReportLab to create a formatted PDF, serve it with FileResponse.
     
     URL: /api/datasets/<id>/download-pdf/
     
+    Supports conditional GET (ETag / Last-Modified -> 304 Not Modified).
+    
     Response:
         PDF file download
     """
@@ -346,4 +902,88 @@ def download_pdf_view(request, dataset_id):
             status=status.HTTP_404_NOT_FOUND
         )
     
+    if dataset.status != Dataset.STATUS_READY:
+        return Response(
+            {'error': 'Dataset is still being processed'},
+            status=status.HTTP_409_CONFLICT
+        )
+    
     return generate_pdf_report(dataset)
+
+
+class DatasetExportView(APIView):
+    """
+    Export a dataset's cleaned records.
+    
+    WHAT: Streams every equipment record as CSV, JSON Lines or Parquet.
+    WHY: Lets users take cleaned data into other tools, whatever the size.
+    HOW: StreamingHttpResponse over EquipmentData.iterator(), gzip-compressed
+         when the client sends Accept-Encoding: gzip (CSV and JSON Lines).
+    
+    A class-based view because DRF would otherwise treat ?format= as a
+    renderer override and answer 404.
+    
+    URL: /api/datasets/<id>/export/
+    
+    Query Parameters:
+        format: csv (default), jsonl or parquet (needs pyarrow on the server)
+    
+    Supports conditional GET (ETag / Last-Modified -> 304 Not Modified).
+    
+    Response:
+        File download (equipment_data_<id>.csv / .jsonl / .parquet)
+    """
+    
+    permission_classes = [IsAuthenticated]
+    content_negotiation_class = ExportContentNegotiation
+    
+    @method_decorator(condition(etag_func=export_etag, last_modified_func=dataset_last_modified))
+    def get(self, request, dataset_id):
+        dataset, error_response = get_ready_dataset(request, dataset_id)
+        if error_response:
+            return error_response
+        
+        export_format = request.query_params.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if export_format == 'parquet' and not parquet_available():
+            return Response(
+                {'error': 'Parquet export is not available on this server (pyarrow is not installed)'},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+        
+        content = EXPORT_WRITERS[export_format](dataset, settings.EXPORT_CHUNK_SIZE)
+        gzip = accepts_gzip(request, export_format)
+        if gzip:
+            content = compress_sequence(content)
+        
+        response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[export_format][0])
+        response['Content-Disposition'] = f'attachment; filename="{export_filename(dataset, export_format)}"'
+        if gzip:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+dataset_export_view = DatasetExportView.as_view()
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats_view(request):
+    """
+    Get dataset summary cache counters (staff only).
+    
+    URL: /api/cache-stats/
+    
+    Response:
+        {
+            "hits": 42,
+            "misses": 5,
+            "hit_rate": 0.8936
+        }
+    """
+    return Response(get_summary_cache_stats())
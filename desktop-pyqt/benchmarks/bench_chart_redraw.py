@@ -0,0 +1,109 @@
+"""
+Benchmark: dashboard chart redraw latency.
+
+WHAT: Compares the old figure.clear() rebuild with ChartRenderer's
+      in-place updates for 5, 50 and 500 equipment types.
+WHY: Every dataset switch used to rebuild and re-style the whole figure.
+HOW: Render offscreen with the Agg backend. Each iteration switches to a
+     dataset with new values and times update + full canvas draw (what
+     draw_idle() ends up doing on the next paint).
+
+Usage (from the desktop-pyqt/ directory):
+    python -m benchmarks.bench_chart_redraw
+    python -m benchmarks.bench_chart_redraw --types 5 50 --repeat 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ui.chart_renderer import ChartRenderer  # noqa: E402
+
+
+DEFAULT_TYPES = [5, 50, 500]
+
+
+def plot_bar_legacy(figure, labels, values):
+    """The original ChartWidget.plot_bar_chart (baseline)"""
+    figure.clear()
+    ax = figure.add_subplot(111)
+    ax.bar(labels, values, color='#3b82f6', edgecolor='#2563eb', linewidth=1.5)
+    ax.set_title('Equipment Type Distribution', fontsize=16, fontweight='bold', pad=20, color='#1f2937')
+    ax.set_xlabel('Equipment Type', fontsize=12, fontweight='600', color='#1f2937')
+    ax.set_ylabel('Count', fontsize=12, fontweight='600', color='#1f2937')
+    ax.grid(axis='y', alpha=0.2, linestyle='--')
+    ax.set_axisbelow(True)
+    plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_color('#e5e7eb')
+    ax.spines['bottom'].set_color('#e5e7eb')
+    ax.tick_params(colors='#6b7280', which='both')
+    figure.tight_layout()
+
+
+def make_datasets(types, count, seed=42):
+    """Return `count` (labels, values) pairs with the same equipment types"""
+    rng = np.random.default_rng(seed)
+    labels = [f'Type-{i}' for i in range(types)]
+    return [(labels, rng.integers(1, 100, size=types).tolist()) for _ in range(count)]
+
+
+def time_redraws(update, canvas, datasets):
+    """Median milliseconds for update + draw, after one warm-up switch"""
+    update(*datasets[0])
+    canvas.draw()
+    samples = []
+    for labels, values in datasets[1:]:
+        start = time.perf_counter()
+        update(labels, values)
+        canvas.draw()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--types', type=int, nargs='+', default=DEFAULT_TYPES,
+                        help='Equipment type counts to benchmark (default: 5 50 500)')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='Dataset switches per measurement (default: 20)')
+    args = parser.parse_args()
+
+    print(f"{'types':>6} | {'rebuild ms':>11} | {'in-place ms':>12} | {'new labels ms':>14} | {'speedup':>8}")
+    print('-' * 64)
+
+    for types in args.types:
+        datasets = make_datasets(types, args.repeat + 1)
+
+        figure = Figure(figsize=(10, 5), facecolor='white')
+        canvas = FigureCanvasAgg(figure)
+        legacy_ms = time_redraws(lambda l, v: plot_bar_legacy(figure, l, v), canvas, datasets)
+
+        figure = Figure(figsize=(10, 5), facecolor='white')
+        canvas = FigureCanvasAgg(figure)
+        renderer = ChartRenderer(figure)
+        inplace_ms = time_redraws(renderer.update_bar, canvas, datasets)
+
+        # Same number of types but different names: bars are reused,
+        # tick labels and layout are recomputed
+        renamed = [([f'{label}-{n}' for label in labels], values) for n, (labels, values) in enumerate(datasets)]
+        relabel_ms = time_redraws(renderer.update_bar, canvas, renamed)
+
+        print(f'{types:>6} | {legacy_ms:>11.1f} | {inplace_ms:>12.1f} | {relabel_ms:>14.1f} | {legacy_ms / inplace_ms:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -4,7 +4,8 @@ PHASE 3 IMPROVED - Professional UI/UX
 
 WHAT: Desktop version of the equipment visualizer
 WHY: Some users prefer desktop applications
-HOW: Uses PyQt5 for GUI and requests for API calls
+HOW: Uses PyQt5 for GUI and requests for API calls.
+     Network calls run on background workers (see workers.py).
 
 UX IMPROVEMENTS:
 ✅ Modern Qt stylesheets (matching web design)
@@ -28,19 +29,26 @@ NEW: UI Module with design tokens and modern login widget
 import sys
 import os
 import json
+import time
 import requests
 import configparser
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                               QHBoxLayout, QLabel, QLineEdit, QPushButton, 
-                              QFileDialog, QTableWidget, QTableWidgetItem, 
+                              QFileDialog, QTableView, 
                               QMessageBox, QTabWidget, QListWidget, QListWidgetItem,
-                              QTextEdit, QGroupBox, QGridLayout, QSpacerItem, QSizePolicy)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+                              QTextEdit, QGroupBox, QGridLayout, QSpacerItem, QSizePolicy,
+                              QProgressBar)
+from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 
+from multipart import MultipartFileEncoder
+from response_cache import ResponseCache, copy_file
+from ui.chart_renderer import ChartRenderer
+from ui.table_model import EquipmentTableModel, IndexProxyModel, decode_summary
+from workers import TaskManager
+
 # Import custom styles
 try:
     from styles import MAIN_STYLESHEET, LOGIN_STYLESHEET, get_stat_card_stylesheet, STAT_GRADIENTS, COLORS
@@ -73,6 +81,9 @@ def load_config():
 
 API_BASE_URL = load_config()
 
+# Bytes per read when streaming downloads to disk
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
 
 class APIClient:
     """
@@ -86,11 +97,27 @@ class APIClient:
     def __init__(self):
         self.token = None
         self.session = requests.Session()
+        self.cache = ResponseCache()
     
     def set_token(self, token):
         """Set authentication token"""
         self.token = token
         self.session.headers.update({'Authorization': f'Token {token}'})
+        self.cache.clear()
+    
+    def _get_json(self, url, decode=None):
+        """GET a JSON endpoint, reusing the cached body on 304 Not Modified"""
+        response = self.session.get(url, headers=self.cache.conditional_headers(url))
+        if response.status_code == 304:
+            data = self.cache.get(url)
+            if data is not None:
+                return data
+            # Another worker cleared the entry meanwhile - fetch the full body again
+            response = self.session.get(url)
+        response.raise_for_status()
+        data = decode(response.content) if decode else response.json()
+        self.cache.store(url, response, data)
+        return data
     
     def login(self, username, password):
         """Login user and get token"""
@@ -101,37 +128,120 @@ class APIClient:
         self.set_token(data['token'])
         return data
     
-    def upload_csv(self, file_path):
-        """Upload CSV file"""
+    @staticmethod
+    def _progress_reporter(task, label):
+        """Byte-count callback that reports to task at most once per percent"""
+        last_percent = [-1]
+        
+        def report(done, total):
+            task.check()
+            percent = int(done * 100 / total) if total else -1
+            if percent != last_percent[0]:
+                last_percent[0] = percent
+                mb_done, mb_total = done / 1048576, total / 1048576
+                if total:
+                    task.progress(f'{label} {mb_done:.1f} / {mb_total:.1f} MB', done / total)
+                else:
+                    # Streamed responses (exports) have no Content-Length
+                    task.progress(f'{label} {mb_done:.1f} MB', -1)
+        
+        return report
+    
+    def upload_csv(self, file_path, task=None):
+        """Upload CSV file (streamed from disk) and return the processed dataset"""
         url = f'{API_BASE_URL}/upload-csv/'
-        with open(file_path, 'rb') as f:
-            files = {'file': f}
-            response = self.session.post(url, files=files)
+        on_progress = self._progress_reporter(task, 'Uploading') if task else None
+        with MultipartFileEncoder('file', file_path, on_progress=on_progress) as body:
+            response = self.session.post(url, data=body, headers={'Content-Type': body.content_type})
         response.raise_for_status()
+        
+        # 202 Accepted: the backend processes the file in the background
+        if response.status_code == 202:
+            job = self.wait_for_job(response.json()['id'], task=task)
+            return job['dataset']
         return response.json()
     
-    def get_upload_history(self):
-        """Get upload history"""
-        url = f'{API_BASE_URL}/upload-history/'
+    def get_job(self, job_id):
+        """Get background upload job status"""
+        url = f'{API_BASE_URL}/jobs/{job_id}/'
         response = self.session.get(url)
         response.raise_for_status()
         return response.json()
     
+    def wait_for_job(self, job_id, poll_interval=1.0, task=None):
+        """Poll an upload job until it finishes; raise if it failed"""
+        while True:
+            if task:
+                task.check()
+            job = self.get_job(job_id)
+            if job['phase'] == 'done':
+                return job
+            if job['phase'] == 'failed':
+                raise RuntimeError(job['error'] or 'Processing failed')
+            if task:
+                task.progress(f"Processing ({job['phase']})", job['progress'])
+            time.sleep(poll_interval)
+    
+    def get_upload_history(self):
+        """Get upload history"""
+        url = f'{API_BASE_URL}/upload-history/'
+        return self._get_json(url)
+    
     def get_dataset_summary(self, dataset_id):
-        """Get dataset summary"""
+        """Get dataset summary (equipment_records decoded into column arrays)"""
         url = f'{API_BASE_URL}/datasets/{dataset_id}/summary/'
-        response = self.session.get(url)
-        response.raise_for_status()
-        return response.json()
+        return self._get_json(url, decode=decode_summary)
     
-    def download_pdf(self, dataset_id, save_path):
-        """Download PDF report"""
+    def download_pdf(self, dataset_id, save_path, task=None):
+        """Download PDF report (copied from the local cache if unchanged)"""
         url = f'{API_BASE_URL}/datasets/{dataset_id}/download-pdf/'
-        response = self.session.get(url)
-        response.raise_for_status()
-        with open(save_path, 'wb') as f:
-            f.write(response.content)
+        response = self.session.get(url, headers=self.cache.conditional_headers(url), stream=True)
+        if response.status_code == 304:
+            response.close()
+            if self.cache.copy_cached_file(url, save_path):
+                return save_path
+            # Cached copy is gone - fetch the full body again
+            response = self.session.get(url, stream=True)
+        
+        with response:
+            response.raise_for_status()
+            cached_path = self.cache.file_path(f'equipment_report_{dataset_id}.pdf')
+            self._stream_to_file(response, cached_path, task)
+        self.cache.store(url, response, cached_path)
+        if os.path.abspath(cached_path) != os.path.abspath(save_path):
+            copy_file(cached_path, save_path)
+        return save_path
+    
+    def export_dataset(self, dataset_id, save_path, export_format='csv', task=None):
+        """Stream a dataset's records (csv, jsonl or parquet) to save_path"""
+        url = f'{API_BASE_URL}/datasets/{dataset_id}/export/'
+        # requests asks for gzip and decompresses it while streaming
+        response = self.session.get(url, params={'format': export_format}, stream=True)
+        with response:
+            if response.status_code in (400, 501):
+                raise RuntimeError(response.json().get('error', 'Export failed'))
+            response.raise_for_status()
+            self._stream_to_file(response, save_path, task)
         return save_path
+    
+    def _stream_to_file(self, response, path, task=None):
+        """Write a streamed response body to path in chunks"""
+        total = int(response.headers.get('Content-Length') or 0)
+        on_progress = self._progress_reporter(task, 'Downloading') if task else None
+        tmp_path = f'{path}.part'
+        done = 0
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    done += len(chunk)
+                    if on_progress:
+                        on_progress(done, total)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
 
 
 class LoginWindow(QWidget):
@@ -295,13 +405,16 @@ class ChartWidget(QWidget):
     
     WHAT: Displays charts in the PyQt5 window
     WHY: Users need to see visual data
-    HOW: Embeds Matplotlib figure in Qt widget with professional styling
+    HOW: Embeds Matplotlib figure in Qt widget with professional styling.
+         ChartRenderer keeps the styled axes and updates them in place,
+         and the canvas repaints with draw_idle().
     """
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.figure = Figure(figsize=(10, 5), facecolor='white')
         self.canvas = FigureCanvas(self.figure)
+        self.renderer = ChartRenderer(self.figure)
         
         layout = QVBoxLayout()
         layout.setContentsMargins(0, 0, 0, 0)
@@ -310,68 +423,13 @@ class ChartWidget(QWidget):
     
     def plot_bar_chart(self, labels, values, title='Equipment Type Distribution'):
         """Plot a professional bar chart matching web design"""
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        
-        # Use primary blue color
-        bars = ax.bar(labels, values, color='#3b82f6', edgecolor='#2563eb', linewidth=1.5)
-        
-        # Styling
-        ax.set_title(title, fontsize=16, fontweight='bold', pad=20, color='#1f2937')
-        ax.set_xlabel('Equipment Type', fontsize=12, fontweight='600', color='#1f2937')
-        ax.set_ylabel('Count', fontsize=12, fontweight='600', color='#1f2937')
-        
-        # Grid for readability
-        ax.grid(axis='y', alpha=0.2, linestyle='--')
-        ax.set_axisbelow(True)
-        
-        # Rotate x labels
-        plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
-        
-        # Styling for axes
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['left'].set_color('#e5e7eb')
-        ax.spines['bottom'].set_color('#e5e7eb')
-        
-        # Tick colors
-        ax.tick_params(colors='#6b7280', which='both')
-        
-        self.figure.tight_layout()
-        self.canvas.draw()
+        self.renderer.update_bar(labels, values, title)
+        self.canvas.draw_idle()
     
     def plot_pie_chart(self, labels, values, title='Equipment Type Distribution'):
         """Plot a professional pie chart matching web design"""
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        
-        # Professional color palette
-        colors = ['#3b82f6', '#10b981', '#8b5cf6', '#f59e0b', '#ef4444', '#ec4899']
-        
-        wedges, texts, autotexts = ax.pie(
-            values, 
-            labels=labels, 
-            autopct='%1.1f%%',
-            startangle=90,
-            colors=colors,
-            wedgeprops={'edgecolor': 'white', 'linewidth': 2}
-        )
-        
-        # Style the text
-        for text in texts:
-            text.set_color('#1f2937')
-            text.set_fontsize(11)
-            text.set_fontweight('600')
-        
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontsize(10)
-            autotext.set_fontweight('bold')
-        
-        ax.set_title(title, fontsize=16, fontweight='bold', pad=20, color='#1f2937')
-        
-        self.figure.tight_layout()
-        self.canvas.draw()
+        self.renderer.update_pie(labels, values, title)
+        self.canvas.draw_idle()
 
 
 class MainWindow(QMainWindow):
@@ -388,6 +446,7 @@ class MainWindow(QMainWindow):
         self.api_client = api_client
         self.user_data = user_data
         self.current_dataset = None
+        self.tasks = TaskManager(self)
         self.init_ui()
     
     def init_ui(self):
@@ -539,6 +598,20 @@ class MainWindow(QMainWindow):
         self.upload_btn.setEnabled(False)
         layout.addWidget(self.upload_btn)
         
+        # Cancel button (only visible while an upload is running)
+        self.cancel_upload_btn = QPushButton('✖ Cancel Upload')
+        self.cancel_upload_btn.setObjectName('secondaryButton')
+        self.cancel_upload_btn.clicked.connect(lambda: self.tasks.cancel('upload'))
+        self.cancel_upload_btn.hide()
+        layout.addWidget(self.cancel_upload_btn)
+        
+        # Progress (bytes sent, then server-side processing)
+        self.upload_progress = QProgressBar()
+        self.upload_progress.setRange(0, 1000)
+        self.upload_progress.setTextVisible(False)
+        self.upload_progress.hide()
+        layout.addWidget(self.upload_progress)
+        
         # Status
         self.upload_status = QLabel('')
         self.upload_status.setAlignment(Qt.AlignCenter)
@@ -622,10 +695,24 @@ class MainWindow(QMainWindow):
         # Data table
         table_group = QGroupBox('🗂️ Equipment Records')
         table_layout = QVBoxLayout()
-        self.data_table = QTableWidget()
-        self.data_table.setColumnCount(5)
-        self.data_table.setHorizontalHeaderLabels(['Name', 'Type', 'Flowrate', 'Pressure', 'Temperature'])
+        
+        self.table_filter = QLineEdit()
+        self.table_filter.setPlaceholderText('🔍 Filter by name or type')
+        table_layout.addWidget(self.table_filter)
+        
+        # Model/view table: cells are built on demand, sorting and
+        # filtering only reorder row indices
+        self.table_model = EquipmentTableModel(self)
+        self.table_proxy = IndexProxyModel(self)
+        self.table_proxy.setSourceModel(self.table_model)
+        self.table_filter.textChanged.connect(self.table_proxy.set_filter_text)
+        
+        self.data_table = QTableView()
+        self.data_table.setModel(self.table_proxy)
+        self.data_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.data_table.setSortingEnabled(True)
         self.data_table.horizontalHeader().setStretchLastSection(True)
+        self.data_table.verticalHeader().setDefaultSectionSize(28)
         table_layout.addWidget(self.data_table)
         table_group.setLayout(table_layout)
         layout.addWidget(table_group)
@@ -672,6 +759,11 @@ class MainWindow(QMainWindow):
         pdf_btn.clicked.connect(self.download_selected_pdf)
         btn_layout.addWidget(pdf_btn)
         
+        export_btn = QPushButton('📤 Export Data')
+        export_btn.setMinimumHeight(40)
+        export_btn.clicked.connect(self.export_selected_dataset)
+        btn_layout.addWidget(export_btn)
+        
         btn_group.setLayout(btn_layout)
         layout.addWidget(btn_group)
         
@@ -694,37 +786,81 @@ class MainWindow(QMainWindow):
             self.file_path_label.setStyle(self.file_path_label.style())
             self.upload_btn.setEnabled(True)
     
+    def set_upload_status(self, text, style):
+        """Show a message in the upload tab status label"""
+        self.upload_status.setText(text)
+        self.upload_status.setObjectName(style)
+        self.upload_status.setStyle(self.upload_status.style())
+    
     def upload_file(self):
-        """Upload selected file"""
-        if not hasattr(self, 'selected_file'):
+        """Upload selected file on a background worker"""
+        if not hasattr(self, 'selected_file') or self.tasks.is_running('upload'):
             return
         
         self.upload_btn.setEnabled(False)
-        self.upload_status.setText('🔄 Uploading and processing...')
-        self.upload_status.setObjectName('infoLabel')
-        self.upload_status.setStyle(self.upload_status.style())
+        self.cancel_upload_btn.show()
+        self.upload_progress.setValue(0)
+        self.upload_progress.show()
+        self.set_upload_status('🔄 Uploading and processing...', 'infoLabel')
+        
+        file_path = self.selected_file
+        
+        def upload(task):
+            result = self.api_client.upload_csv(file_path, task=task)
+            task.check()
+            task.progress('Loading dataset', 1.0)
+            return result, self.api_client.get_dataset_summary(result['id'])
+        
+        self.tasks.start(
+            'upload',
+            upload,
+            on_success=self.on_upload_finished,
+            on_error=self.on_upload_failed,
+            on_progress=self.on_upload_progress,
+            on_cancelled=self.on_upload_cancelled
+        )
+    
+    def finish_upload(self):
+        """Restore the upload controls after an upload ends"""
+        self.upload_btn.setEnabled(True)
+        self.cancel_upload_btn.hide()
+        self.upload_progress.hide()
+    
+    def on_upload_progress(self, message, fraction):
+        """Show upload/processing progress"""
+        if fraction >= 0:
+            self.upload_progress.setRange(0, 1000)
+            self.upload_progress.setValue(int(fraction * 1000))
+            message = f'{message} ({fraction * 100:.0f}%)'
+        else:
+            self.upload_progress.setRange(0, 0)  # Busy indicator
+        self.set_upload_status(f'🔄 {message}...', 'infoLabel')
+    
+    def on_upload_finished(self, outcome):
+        """Show the uploaded dataset"""
+        result, summary = outcome
+        self.finish_upload()
+        self.set_upload_status(f'✅ Success! {result["total_equipment"]} equipment records processed.', 'successLabel')
         
-        try:
-            result = self.api_client.upload_csv(self.selected_file)
-            self.upload_status.setText(f'✅ Success! {result["total_equipment"]} equipment records processed.')
-            self.upload_status.setObjectName('successLabel')
-            self.upload_status.setStyle(self.upload_status.style())
-            
-            # Load the dataset
-            self.current_dataset = self.api_client.get_dataset_summary(result['id'])
-            self.update_dashboard()
-            
-            # Switch to dashboard tab
-            self.tabs.setCurrentIndex(1)
-            
-            # Refresh history
-            self.load_history()
-        except Exception as e:
-            self.upload_status.setText(f'⚠️ Error: {str(e)}')
-            self.upload_status.setObjectName('errorLabel')
-            self.upload_status.setStyle(self.upload_status.style())
-        finally:
-            self.upload_btn.setEnabled(True)
+        # Load the dataset
+        self.current_dataset = summary
+        self.update_dashboard()
+        
+        # Switch to dashboard tab
+        self.tabs.setCurrentIndex(1)
+        
+        # Refresh history
+        self.load_history()
+    
+    def on_upload_failed(self, error):
+        """Show an upload error"""
+        self.finish_upload()
+        self.set_upload_status(f'⚠️ Error: {str(error)}', 'errorLabel')
+    
+    def on_upload_cancelled(self):
+        """Confirm that the upload was cancelled"""
+        self.finish_upload()
+        self.set_upload_status('Upload cancelled', 'infoLabel')
     
     def update_dashboard(self):
         """Update dashboard with current dataset"""
@@ -743,37 +879,35 @@ class MainWindow(QMainWindow):
             self.bar_chart.plot_bar_chart(chart_data['labels'], chart_data['values'])
         
         # Update table
-        records = self.current_dataset.get('equipment_records', [])
-        self.data_table.setRowCount(len(records))
-        
-        for i, record in enumerate(records):
-            self.data_table.setItem(i, 0, QTableWidgetItem(record['equipment_name']))
-            self.data_table.setItem(i, 1, QTableWidgetItem(record['equipment_type']))
-            self.data_table.setItem(i, 2, QTableWidgetItem(str(record['flowrate'])))
-            self.data_table.setItem(i, 3, QTableWidgetItem(str(record['pressure'])))
-            self.data_table.setItem(i, 4, QTableWidgetItem(str(record['temperature'])))
+        self.table_model.set_columns(self.current_dataset.get('equipment_records'))
     
     def load_history(self):
-        """Load upload history"""
-        try:
-            history = self.api_client.get_upload_history()
-            self.history_list.clear()
+        """Load upload history on a background worker"""
+        self.tasks.start(
+            'history',
+            lambda task: self.api_client.get_upload_history(),
+            on_success=self.show_history,
+            on_error=lambda e: QMessageBox.critical(self, 'Error', f'⚠️ Failed to load history: {str(e)}'),
+            replace=True
+        )
+    
+    def show_history(self, history):
+        """Fill the history list"""
+        self.history_list.clear()
+        
+        for dataset in history:
+            # Format date
+            from datetime import datetime
+            try:
+                dt = datetime.fromisoformat(dataset['uploaded_at'].replace('Z', '+00:00'))
+                date_str = dt.strftime('%b %d, %Y %I:%M %p')
+            except:
+                date_str = dataset['uploaded_at']
             
-            for dataset in history:
-                # Format date
-                from datetime import datetime
-                try:
-                    dt = datetime.fromisoformat(dataset['uploaded_at'].replace('Z', '+00:00'))
-                    date_str = dt.strftime('%b %d, %Y %I:%M %p')
-                except:
-                    date_str = dataset['uploaded_at']
-                
-                item_text = f"📊 Dataset #{dataset['id']} • {date_str} • {dataset['total_equipment']} equipment"
-                item = QListWidgetItem(item_text)
-                item.setData(Qt.UserRole, dataset['id'])
-                self.history_list.addItem(item)
-        except Exception as e:
-            QMessageBox.critical(self, 'Error', f'⚠️ Failed to load history: {str(e)}')
+            item_text = f"📊 Dataset #{dataset['id']} • {date_str} • {dataset['total_equipment']} equipment"
+            item = QListWidgetItem(item_text)
+            item.setData(Qt.UserRole, dataset['id'])
+            self.history_list.addItem(item)
     
     def history_item_clicked(self, item):
         """Handle history item click"""
@@ -785,12 +919,21 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, 'Warning', '⚠️ Please select a dataset first')
             return
         
-        try:
-            self.current_dataset = self.api_client.get_dataset_summary(self.selected_dataset_id)
-            self.update_dashboard()
-            self.tabs.setCurrentIndex(1)
-        except Exception as e:
-            QMessageBox.critical(self, 'Error', f'⚠️ Failed to load dataset: {str(e)}')
+        # Only the last selected dataset matters - replace any pending load
+        dataset_id = self.selected_dataset_id
+        self.tasks.start(
+            'dataset',
+            lambda task: self.api_client.get_dataset_summary(dataset_id),
+            on_success=self.show_dataset,
+            on_error=lambda e: QMessageBox.critical(self, 'Error', f'⚠️ Failed to load dataset: {str(e)}'),
+            replace=True
+        )
+    
+    def show_dataset(self, summary):
+        """Show a loaded dataset on the dashboard"""
+        self.current_dataset = summary
+        self.update_dashboard()
+        self.tabs.setCurrentIndex(1)
     
     def download_selected_pdf(self):
         """Download PDF for selected dataset"""
@@ -798,19 +941,67 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, 'Warning', '⚠️ Please select a dataset first')
             return
         
+        dataset_id = self.selected_dataset_id
+        if self.tasks.is_running(f'pdf:{dataset_id}'):
+            QMessageBox.information(self, 'Download', 'ℹ️ This report is already downloading')
+            return
+        
         save_path, _ = QFileDialog.getSaveFileName(
             self, 
             'Save PDF', 
-            f'equipment_report_{self.selected_dataset_id}.pdf',
+            f'equipment_report_{dataset_id}.pdf',
             'PDF Files (*.pdf)'
         )
         
         if save_path:
-            try:
-                self.api_client.download_pdf(self.selected_dataset_id, save_path)
-                QMessageBox.information(self, 'Success', f'✅ PDF saved successfully!\n\nLocation: {save_path}')
-            except Exception as e:
-                QMessageBox.critical(self, 'Error', f'⚠️ Failed to download PDF: {str(e)}')
+            self.tasks.start(
+                f'pdf:{dataset_id}',
+                lambda task: self.api_client.download_pdf(dataset_id, save_path, task=task),
+                on_success=lambda path: QMessageBox.information(
+                    self, 'Success', f'✅ PDF saved successfully!\n\nLocation: {path}'
+                ),
+                on_error=lambda e: QMessageBox.critical(self, 'Error', f'⚠️ Failed to download PDF: {str(e)}')
+            )
+    
+    def export_selected_dataset(self):
+        """Export the selected dataset's records to a file"""
+        if not hasattr(self, 'selected_dataset_id'):
+            QMessageBox.warning(self, 'Warning', '⚠️ Please select a dataset first')
+            return
+        
+        dataset_id = self.selected_dataset_id
+        if self.tasks.is_running(f'export:{dataset_id}'):
+            QMessageBox.information(self, 'Export', 'ℹ️ This dataset is already exporting')
+            return
+        
+        filters = {
+            'CSV Files (*.csv)': 'csv',
+            'JSON Lines (*.jsonl)': 'jsonl',
+            'Parquet Files (*.parquet)': 'parquet',
+        }
+        save_path, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            'Export Data',
+            f'equipment_data_{dataset_id}.csv',
+            ';;'.join(filters)
+        )
+        
+        if save_path:
+            extension = os.path.splitext(save_path)[1].lstrip('.').lower()
+            export_format = extension if extension in filters.values() else filters.get(selected_filter, 'csv')
+            self.tasks.start(
+                f'export:{dataset_id}',
+                lambda task: self.api_client.export_dataset(dataset_id, save_path, export_format, task=task),
+                on_success=lambda path: QMessageBox.information(
+                    self, 'Success', f'✅ Data exported successfully!\n\nLocation: {path}'
+                ),
+                on_error=lambda e: QMessageBox.critical(self, 'Error', f'⚠️ Failed to export data: {str(e)}')
+            )
+    
+    def closeEvent(self, event):
+        """Stop background workers before the window goes away"""
+        self.tasks.shutdown()
+        super().closeEvent(event)
 
 
 def main():
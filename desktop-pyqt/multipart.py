@@ -0,0 +1,91 @@
+"""
+Streaming Multipart Upload Body
+
+WHAT: A file-like multipart/form-data body for uploading one file
+WHY: requests builds multipart bodies by reading the whole file into
+     memory, so a 500 MB CSV needed 500 MB of client RAM and the UI had
+     no way to show how much had been sent
+HOW: The body is three parts read in order: the form headers, the file
+     itself (read from disk in small chunks) and the closing boundary.
+     requests/http.client pull it through read(), and every read reports
+     the running byte count to a progress callback. __len__ gives the
+     exact size, so the request is sent with a Content-Length.
+
+Usage:
+    body = MultipartFileEncoder('file', path, on_progress=show_progress)
+    session.post(url, data=body, headers={'Content-Type': body.content_type})
+"""
+
+import io
+import os
+import uuid
+
+
+class MultipartFileEncoder:
+    """
+    Readable multipart/form-data body for a single file field
+    
+    Args:
+        field_name: Form field name (e.g. 'file')
+        file_path: Path of the file to send
+        content_type: MIME type of the file part
+        on_progress: Optional callback(bytes_sent, total_bytes)
+    """
+    
+    def __init__(self, field_name, file_path, content_type='text/csv', on_progress=None):
+        self.boundary = uuid.uuid4().hex
+        self.on_progress = on_progress
+        file_name = os.path.basename(file_path).replace('"', '')
+        
+        self.head = (
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="{field_name}"; filename="{file_name}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        ).encode('utf-8')
+        self.tail = f'\r\n--{self.boundary}--\r\n'.encode('utf-8')
+        self.file_size = os.path.getsize(file_path)
+        self.total = len(self.head) + self.file_size + len(self.tail)
+        
+        self.parts = [io.BytesIO(self.head), open(file_path, 'rb'), io.BytesIO(self.tail)]
+        self.sent = 0
+    
+    @property
+    def content_type(self):
+        return f'multipart/form-data; boundary={self.boundary}'
+    
+    def __len__(self):
+        # Bytes still to be read (requests uses this for Content-Length)
+        return self.total - self.sent
+    
+    def read(self, size=-1):
+        """Return up to size bytes of the body (everything left if size < 0)"""
+        if size is None or size < 0:
+            size = self.total - self.sent
+        
+        chunks = []
+        remaining = size
+        while remaining > 0 and self.parts:
+            chunk = self.parts[0].read(remaining)
+            if not chunk:
+                self.parts.pop(0).close()
+                continue
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        
+        data = b''.join(chunks)
+        self.sent += len(data)
+        if self.on_progress and data:
+            self.on_progress(self.sent, self.total)
+        return data
+    
+    def close(self):
+        """Close the underlying file"""
+        for part in self.parts:
+            part.close()
+        self.parts = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
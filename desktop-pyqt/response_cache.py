@@ -0,0 +1,118 @@
+"""
+HTTP Response Cache for the Desktop App
+
+WHAT: Remembers ETag / Last-Modified validators and response bodies
+WHY: Reopening a dataset or refreshing history should not re-download
+     data that has not changed on the server
+HOW: Before a GET, APIClient asks for conditional headers. If the server
+     answers 304 Not Modified, the cached body is reused. JSON bodies are
+     kept in memory; downloaded files (PDFs) are kept in a cache directory
+     private to this process (removed on exit), so other instances of the
+     app - other users, other servers - never overwrite them.
+     API calls run on several worker threads, so entries are only changed
+     under a lock.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+
+
+def copy_file(source, destination):
+    """Copy source to destination through a .part file, so readers never see half a file"""
+    tmp_path = f'{destination}.part'
+    try:
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, destination)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class CacheEntry:
+    """Validators and cached payload for one URL"""
+    
+    def __init__(self, etag=None, last_modified=None, payload=None):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.payload = payload
+
+
+class ResponseCache:
+    """
+    Local cache for conditional GET requests
+    
+    Usage:
+        headers = cache.conditional_headers(url)
+        response = session.get(url, headers=headers)
+        if response.status_code == 304:
+            data = cache.get(url)
+        else:
+            data = response.json()
+            cache.store(url, response, data)
+    """
+    
+    def __init__(self, cache_dir=None):
+        self.entries = {}
+        self.lock = threading.Lock()
+        # Created on first download unless given
+        self.cache_dir = cache_dir
+    
+    def conditional_headers(self, url):
+        """Return If-None-Match / If-Modified-Since headers for a cached URL"""
+        with self.lock:
+            entry = self.entries.get(url)
+        if entry is None:
+            return {}
+        
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+    
+    def get(self, url):
+        """Return the cached payload for a URL (None if not cached)"""
+        with self.lock:
+            entry = self.entries.get(url)
+        return entry.payload if entry else None
+    
+    def store(self, url, response, payload):
+        """Remember a response's validators and payload (ignored without validators)"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        with self.lock:
+            if not etag and not last_modified:
+                self.entries.pop(url, None)
+                return
+            self.entries[url] = CacheEntry(etag, last_modified, payload)
+    
+    def file_path(self, name):
+        """Path inside the cache directory for a downloaded file"""
+        with self.lock:
+            if self.cache_dir is None:
+                self.cache_dir = tempfile.mkdtemp(prefix='equipment-visualizer-')
+                atexit.register(shutil.rmtree, self.cache_dir, True)
+            else:
+                os.makedirs(self.cache_dir, exist_ok=True)
+        return os.path.join(self.cache_dir, name)
+    
+    def copy_cached_file(self, url, save_path):
+        """Copy a cached download to save_path; return False if it is missing"""
+        cached_path = self.get(url)
+        if not cached_path or not os.path.exists(cached_path):
+            with self.lock:
+                self.entries.pop(url, None)
+            return False
+        if os.path.abspath(cached_path) != os.path.abspath(save_path):
+            copy_file(cached_path, save_path)
+        return True
+    
+    def clear(self):
+        """Forget every cached response"""
+        with self.lock:
+            self.entries.clear()
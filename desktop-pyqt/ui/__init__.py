@@ -4,4 +4,4 @@ UI Components Module
 Organized collection of reusable UI widgets and styles
 """
 
-__all__ = ['ModernLoginWidget', 'style_tokens', 'mpl_style']
+__all__ = ['ModernLoginWidget', 'style_tokens', 'mpl_style', 'table_model', 'chart_renderer']
@@ -0,0 +1,199 @@
+"""
+Persistent Chart Renderer
+
+WHAT: Draws the equipment type bar and pie charts into a Matplotlib Figure
+WHY: Clearing the figure on every dataset switch re-created the axes,
+     re-styled every spine and tick and re-ran tight_layout before a full
+     redraw, which made switching datasets feel sluggish
+HOW: The axes are created and styled once. Switching datasets updates the
+     existing artists in place: bar heights and tick labels, wedge angles
+     and label positions. Artists are only re-created when the number of
+     equipment types changes, and the layout is only recomputed when the
+     labels change. No Qt imports, so it also runs on the Agg backend.
+
+Usage:
+    renderer = ChartRenderer(figure)
+    renderer.update_bar(['Pump', 'Valve'], [4, 7])
+    canvas.draw_idle()
+"""
+
+import math
+
+BAR_COLOR = '#3b82f6'
+BAR_EDGE_COLOR = '#2563eb'
+PIE_COLORS = ['#3b82f6', '#10b981', '#8b5cf6', '#f59e0b', '#ef4444', '#ec4899']
+TEXT_COLOR = '#1f2937'
+MUTED_COLOR = '#6b7280'
+SPINE_COLOR = '#e5e7eb'
+# Title style shared by the initial styling and every update
+DEFAULT_TITLE = 'Equipment Type Distribution'
+TITLE_STYLE = {'fontsize': 16, 'fontweight': 'bold', 'pad': 20, 'color': TEXT_COLOR}
+
+PIE_START_ANGLE = 90
+PIE_LABEL_DISTANCE = 1.1
+PIE_PCT_DISTANCE = 0.6
+
+
+class ChartRenderer:
+    """
+    Keeps styled bar and pie axes alive between datasets
+    
+    Only one of the two axes is visible at a time.
+    """
+    
+    def __init__(self, figure):
+        self.figure = figure
+        self.bar_ax = figure.add_subplot(111)
+        # Second axes in the same grid slot, so tight_layout places both
+        self.pie_ax = figure.add_subplot(111, label='pie')
+        self.bars = []
+        self.bar_labels = None
+        self.wedges = []
+        self.pie_texts = []
+        self.pie_autotexts = []
+        self.pie_labels = None
+        self.mode = None
+        self._style_bar_axes()
+        self._style_pie_axes()
+        self._show('bar')
+    
+    def _style_bar_axes(self):
+        ax = self.bar_ax
+        ax.set_title(DEFAULT_TITLE, **TITLE_STYLE)
+        ax.set_xlabel('Equipment Type', fontsize=12, fontweight='600', color=TEXT_COLOR)
+        ax.set_ylabel('Count', fontsize=12, fontweight='600', color=TEXT_COLOR)
+        
+        # Grid for readability
+        ax.grid(axis='y', alpha=0.2, linestyle='--')
+        ax.set_axisbelow(True)
+        
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        ax.spines['left'].set_color(SPINE_COLOR)
+        ax.spines['bottom'].set_color(SPINE_COLOR)
+        ax.tick_params(colors=MUTED_COLOR, which='both')
+    
+    def _style_pie_axes(self):
+        ax = self.pie_ax
+        ax.set_title(DEFAULT_TITLE, **TITLE_STYLE)
+        ax.set_aspect('equal')
+        ax.set_xlim(-1.25, 1.25)
+        ax.set_ylim(-1.25, 1.25)
+        ax.set_axis_off()
+    
+    def _show(self, mode):
+        if mode == self.mode:
+            return
+        self.mode = mode
+        self.bar_ax.set_visible(mode == 'bar')
+        self.pie_ax.set_visible(mode == 'pie')
+    
+    def _relayout(self):
+        """Recompute margins; only needed when tick labels change"""
+        self.figure.tight_layout()
+    
+    def update_bar(self, labels, values, title=None):
+        """
+        Show a bar chart of values per label
+        
+        Returns:
+            True if the layout was recomputed (labels changed)
+        """
+        self._show('bar')
+        ax = self.bar_ax
+        labels = [str(label) for label in labels]
+        values = [float(value) for value in values]
+        if title:
+            ax.set_title(title, **TITLE_STYLE)
+        
+        if len(self.bars) != len(values):
+            for bar in self.bars:
+                bar.remove()
+            self.bars = list(ax.bar(
+                range(len(values)), values,
+                color=BAR_COLOR, edgecolor=BAR_EDGE_COLOR, linewidth=1.5
+            ))
+        else:
+            for bar, value in zip(self.bars, values):
+                bar.set_height(value)
+        
+        ax.set_xlim(-0.6, len(values) - 0.4)
+        ax.set_ylim(0, max(values, default=0) * 1.05 or 1)
+        
+        if labels == self.bar_labels:
+            return False
+        self.bar_labels = labels
+        ax.set_xticks(range(len(labels)))
+        ax.set_xticklabels(labels, rotation=45, ha='right')
+        self._relayout()
+        return True
+    
+    def update_pie(self, labels, values, title=None):
+        """
+        Show a pie chart of values per label
+        
+        Returns:
+            True if the labels changed
+        """
+        self._show('pie')
+        ax = self.pie_ax
+        labels = [str(label) for label in labels]
+        values = [float(value) for value in values]
+        if title:
+            ax.set_title(title, **TITLE_STYLE)
+        
+        if len(self.wedges) != len(values):
+            for artist in self.wedges + self.pie_texts + self.pie_autotexts:
+                artist.remove()
+            # Placeholder sizes: real angles are set by _move_wedges below
+            count = max(len(values), 1)
+            self.wedges, self.pie_texts, self.pie_autotexts = ax.pie(
+                [1] * count,
+                labels=labels or [''],
+                autopct='%1.1f%%',
+                startangle=PIE_START_ANGLE,
+                colors=PIE_COLORS,
+                wedgeprops={'edgecolor': 'white', 'linewidth': 2},
+                labeldistance=PIE_LABEL_DISTANCE,
+                pctdistance=PIE_PCT_DISTANCE
+            )
+            for text in self.pie_texts:
+                text.set_color(TEXT_COLOR)
+                text.set_fontsize(11)
+                text.set_fontweight('600')
+            for autotext in self.pie_autotexts:
+                autotext.set_color('white')
+                autotext.set_fontsize(10)
+                autotext.set_fontweight('bold')
+            # ax.pie resets the limits and aspect
+            ax.set_xlim(-1.25, 1.25)
+            ax.set_ylim(-1.25, 1.25)
+        
+        total = sum(values)
+        for artist in self.wedges + self.pie_texts + self.pie_autotexts:
+            artist.set_visible(total > 0)
+        if total > 0:
+            self._move_wedges(labels, values, total)
+        
+        changed = labels != self.pie_labels
+        self.pie_labels = labels
+        return changed
+    
+    def _move_wedges(self, labels, values, total):
+        """Update wedge angles, labels and percentages in place"""
+        theta1 = PIE_START_ANGLE
+        for wedge, text, autotext, label, value in zip(
+            self.wedges, self.pie_texts, self.pie_autotexts, labels, values
+        ):
+            theta2 = theta1 + 360.0 * value / total
+            wedge.set_theta1(theta1)
+            wedge.set_theta2(theta2)
+            
+            mid = math.radians((theta1 + theta2) / 2)
+            x, y = math.cos(mid), math.sin(mid)
+            text.set_text(label)
+            text.set_position((PIE_LABEL_DISTANCE * x, PIE_LABEL_DISTANCE * y))
+            text.set_horizontalalignment('left' if x > 0 else 'right')
+            autotext.set_text(f'{100.0 * value / total:1.1f}%')
+            autotext.set_position((PIE_PCT_DISTANCE * x, PIE_PCT_DISTANCE * y))
+            theta1 = theta2
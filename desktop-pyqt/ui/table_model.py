@@ -0,0 +1,306 @@
+"""
+Equipment Records Table Model
+
+WHAT: Column-array storage and Qt model/view classes for equipment records
+WHY: Filling a QTableWidget creates five QTableWidgetItems per record, so a
+     100k-record dataset allocated half a million Qt objects before the
+     dashboard could show up
+HOW: Records are decoded from the summary JSON straight into NumPy column
+     arrays. EquipmentTableModel formats a cell only when the view asks
+     for it in data(), and IndexProxyModel sorts and filters by keeping an
+     array of row indices instead of touching the records.
+
+Usage:
+    summary = decode_summary(response.content)
+    model = EquipmentTableModel()
+    model.set_columns(summary['equipment_records'])
+    proxy = IndexProxyModel()
+    proxy.setSourceModel(model)
+    table_view.setModel(proxy)
+"""
+
+import json
+from array import array
+
+import numpy as np
+from PyQt5.QtCore import QAbstractProxyModel, QAbstractTableModel, QModelIndex, Qt
+
+HEADERS = ['Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+NUMERIC_FIELDS = ['flowrate', 'pressure', 'temperature']
+
+
+class EquipmentColumns:
+    """
+    Equipment records stored column by column
+    
+    names is a NumPy string array, types are stored as integer codes into
+    type_names, and the numeric fields are float64 arrays.
+    """
+    
+    def __init__(self, ids, names, type_codes, type_names, flowrate, pressure, temperature):
+        self.ids = ids
+        self.names = names
+        self.type_codes = type_codes
+        self.type_names = type_names
+        self.flowrate = flowrate
+        self.pressure = pressure
+        self.temperature = temperature
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    @classmethod
+    def empty(cls):
+        return RecordColumnsBuilder().build()
+    
+    @classmethod
+    def from_records(cls, records):
+        """Build columns from a list of record dicts"""
+        builder = RecordColumnsBuilder()
+        for record in records:
+            builder.hook(list(record.items()))
+        return builder.build()
+    
+    def numeric(self, field):
+        return getattr(self, field)
+
+
+class RecordColumnsBuilder:
+    """
+    Collects records into column buffers while JSON is being decoded
+    
+    Pass builder.hook as json.loads(object_pairs_hook=...). Objects that
+    look like equipment records are appended to the buffers and replaced
+    by None, so no per-record dict is ever built. Every other object is
+    returned as a normal dict.
+    """
+    
+    def __init__(self):
+        self.ids = array('q')
+        self.names = []
+        self.type_codes = array('i')
+        self.type_index = {}
+        self.flowrate = array('d')
+        self.pressure = array('d')
+        self.temperature = array('d')
+    
+    def hook(self, pairs):
+        for key, _ in pairs:
+            if key == 'equipment_name':
+                break
+        else:
+            return dict(pairs)
+        
+        record_id, name, eq_type = -1, '', ''
+        flowrate = pressure = temperature = float('nan')
+        for key, value in pairs:
+            if key == 'id':
+                record_id = value
+            elif key == 'equipment_name':
+                name = value
+            elif key == 'equipment_type':
+                eq_type = value
+            elif key == 'flowrate':
+                flowrate = value
+            elif key == 'pressure':
+                pressure = value
+            elif key == 'temperature':
+                temperature = value
+        
+        code = self.type_index.get(eq_type)
+        if code is None:
+            code = self.type_index[eq_type] = len(self.type_index)
+        
+        self.ids.append(record_id)
+        self.names.append(name)
+        self.type_codes.append(code)
+        self.flowrate.append(flowrate)
+        self.pressure.append(pressure)
+        self.temperature.append(temperature)
+        return None
+    
+    def build(self):
+        """Return the collected records as EquipmentColumns"""
+        return EquipmentColumns(
+            ids=np.frombuffer(self.ids, dtype=np.int64),
+            names=np.array(self.names, dtype=str),
+            type_codes=np.frombuffer(self.type_codes, dtype=np.int32),
+            type_names=list(self.type_index),
+            flowrate=np.frombuffer(self.flowrate, dtype=np.float64),
+            pressure=np.frombuffer(self.pressure, dtype=np.float64),
+            temperature=np.frombuffer(self.temperature, dtype=np.float64),
+        )
+
+
+def decode_summary(body):
+    """
+    Decode a dataset summary response in one pass
+    
+    Args:
+        body: Response bytes or text
+    
+    Returns:
+        Summary dict whose 'equipment_records' is an EquipmentColumns
+    """
+    builder = RecordColumnsBuilder()
+    data = json.loads(body, object_pairs_hook=builder.hook)
+    data['equipment_records'] = builder.build()
+    return data
+
+
+class EquipmentTableModel(QAbstractTableModel):
+    """Read-only table model that formats cells on demand"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.columns = EquipmentColumns.empty()
+    
+    def set_columns(self, columns):
+        """Replace the records shown (a list of dicts is also accepted)"""
+        if not isinstance(columns, EquipmentColumns):
+            columns = EquipmentColumns.from_records(columns or [])
+        self.beginResetModel()
+        self.columns = columns
+        self.endResetModel()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return str(self.columns.names[row])
+            if column == 1:
+                return self.columns.type_names[self.columns.type_codes[row]]
+            return str(float(self.columns.numeric(NUMERIC_FIELDS[column - 2])[row]))
+        
+        if role == Qt.TextAlignmentRole and column >= 2:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return str(section + 1)
+    
+    def sort_key(self, column):
+        """Array to sort rows by for a column"""
+        if column == 0:
+            return self.columns.names
+        if column == 1:
+            # Rank type codes by type name so the sort is alphabetical
+            ranks = np.argsort(np.argsort(np.array(self.columns.type_names, dtype=str)))
+            return ranks[self.columns.type_codes] if len(ranks) else self.columns.type_codes
+        return self.columns.numeric(NUMERIC_FIELDS[column - 2])
+    
+    def match_text(self, text):
+        """Boolean mask of rows whose name or type contains text (case-insensitive)"""
+        text = text.lower()
+        names = np.char.find(np.char.lower(self.columns.names), text) >= 0
+        type_hits = np.array([text in name.lower() for name in self.columns.type_names], dtype=bool)
+        if len(type_hits):
+            return names | type_hits[self.columns.type_codes]
+        return names
+
+
+class IndexProxyModel(QAbstractProxyModel):
+    """
+    Sorting and filtering proxy that only reorders row indices
+    
+    QSortFilterProxyModel calls back into Python for every comparison.
+    This proxy computes the visible rows with NumPy instead: a mask for
+    the filter and an argsort for the order.
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = np.arange(0)
+        self.source_to_proxy = None
+        self.filter_text = ''
+        self.sort_column = -1
+        self.sort_order = Qt.AscendingOrder
+    
+    def setSourceModel(self, model):
+        old = self.sourceModel()
+        if old is not None:
+            old.modelReset.disconnect(self.rebuild)
+        super().setSourceModel(model)
+        model.modelReset.connect(self.rebuild)
+        self.rebuild()
+    
+    def set_filter_text(self, text):
+        """Show only rows whose name or type contains text"""
+        self.filter_text = text.strip()
+        self.rebuild()
+    
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self.rebuild()
+    
+    def rebuild(self):
+        """Recompute the visible row indices"""
+        self.beginResetModel()
+        model = self.sourceModel()
+        count = model.rowCount() if model is not None else 0
+        
+        if self.filter_text and count:
+            rows = np.flatnonzero(model.match_text(self.filter_text))
+        else:
+            rows = np.arange(count)
+        
+        if self.sort_column >= 0 and len(rows):
+            order = np.argsort(model.sort_key(self.sort_column)[rows], kind='stable')
+            if self.sort_order == Qt.DescendingOrder:
+                order = order[::-1]
+            rows = rows[order]
+        
+        self.rows = rows
+        self.source_to_proxy = None
+        self.endResetModel()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        model = self.sourceModel()
+        return 0 if parent.isValid() or model is None else model.columnCount()
+    
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not (0 <= row < len(self.rows)) or not (0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+    
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+    
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        return self.sourceModel().index(int(self.rows[proxy_index.row()]), proxy_index.column())
+    
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        if self.source_to_proxy is None:
+            # Built lazily: only selection syncing needs the reverse mapping
+            self.source_to_proxy = np.full(self.sourceModel().rowCount(), -1, dtype=np.int64)
+            self.source_to_proxy[self.rows] = np.arange(len(self.rows))
+        row = int(self.source_to_proxy[source_index.row()])
+        return self.index(row, source_index.column()) if row >= 0 else QModelIndex()
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal:
+            return self.sourceModel().headerData(section, orientation, role)
+        if role == Qt.DisplayRole:
+            return str(section + 1)
+        return None
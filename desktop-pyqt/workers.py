@@ -0,0 +1,183 @@
+"""
+Background Workers for API Calls
+
+WHAT: Runs APIClient calls on worker threads and reports back with signals
+WHY: Uploads, downloads and summary requests used to run on the GUI thread,
+     freezing the window until the server answered
+HOW: Each call runs in an ApiWorker (QThread). Results, errors and progress
+     come back as Qt signals, which are delivered on the GUI thread.
+     TaskManager keys workers by resource ('upload', 'history', ...) so the
+     same resource is never requested twice at the same time, and lets the
+     window cancel work it no longer needs.
+
+Usage:
+    self.tasks = TaskManager(self)
+    self.tasks.start(
+        'history',
+        lambda task: self.api_client.get_upload_history(),
+        on_success=self.show_history,
+        on_error=self.show_error
+    )
+"""
+
+import threading
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task when it notices it has been cancelled"""
+
+
+class Task:
+    """
+    Handle passed to the function running in a worker
+    
+    Long-running calls use it to report progress and to stop early:
+        task.progress('Uploading', 0.4)
+        task.check()  # raises TaskCancelled after cancel()
+    """
+    
+    def __init__(self, worker):
+        self._worker = worker
+        self._cancelled = threading.Event()
+    
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+    
+    def cancel(self):
+        self._cancelled.set()
+    
+    def check(self):
+        """Raise TaskCancelled if the task was cancelled"""
+        if self._cancelled.is_set():
+            raise TaskCancelled()
+    
+    def progress(self, message, fraction=-1.0):
+        """Report progress (fraction in 0..1, or -1 when unknown)"""
+        if not self._cancelled.is_set():
+            self._worker.progress.emit(message, float(fraction))
+
+
+class ApiWorker(QThread):
+    """
+    Thread that runs one function and emits its outcome
+    
+    Exactly one of succeeded, failed or cancelled is emitted per run.
+    Results of a cancelled task are dropped even if the call completed.
+    """
+    
+    succeeded = pyqtSignal(object)     # Return value of the function
+    failed = pyqtSignal(object)        # Exception raised by the function
+    cancelled = pyqtSignal()
+    progress = pyqtSignal(str, float)  # Message, fraction (-1 = unknown)
+    
+    def __init__(self, func, parent=None):
+        super().__init__(parent)
+        self.func = func
+        self.task = Task(self)
+    
+    def cancel(self):
+        """Ask the task to stop; it exits at its next check()"""
+        self.task.cancel()
+    
+    def run(self):
+        try:
+            result = self.func(self.task)
+        except TaskCancelled:
+            self.cancelled.emit()
+            return
+        except Exception as e:
+            if self.task.cancelled:
+                self.cancelled.emit()
+            else:
+                self.failed.emit(e)
+            return
+        
+        if self.task.cancelled:
+            self.cancelled.emit()
+        else:
+            self.succeeded.emit(result)
+
+
+class TaskManager(QObject):
+    """
+    Starts workers and keeps at most one running per resource key
+    
+    start() while a key is busy is ignored, unless replace=True: then the
+    running task is cancelled and the new one starts once it has exited,
+    so requests for the same resource never overlap.
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.workers = {}
+        self.pending = {}
+    
+    def is_running(self, key):
+        return key in self.workers
+    
+    def start(self, key, func, on_success=None, on_error=None, on_progress=None,
+              on_cancelled=None, replace=False):
+        """
+        Run func(task) on a worker thread
+        
+        Args:
+            key: Resource key, e.g. 'upload' or 'pdf:42'
+            func: Callable taking a Task; its return value goes to on_success
+            on_success / on_error / on_progress / on_cancelled: Slots called
+                on the GUI thread
+            replace: Cancel a running task with the same key instead of
+                ignoring this request
+        
+        Returns:
+            The ApiWorker, or None if the request was ignored or queued
+        """
+        callbacks = (func, on_success, on_error, on_progress, on_cancelled)
+        if key in self.workers:
+            if not replace:
+                return None
+            self.pending[key] = callbacks
+            self.workers[key].cancel()
+            return None
+        
+        return self._launch(key, *callbacks)
+    
+    def _launch(self, key, func, on_success, on_error, on_progress, on_cancelled):
+        worker = ApiWorker(func, self)
+        if on_success:
+            worker.succeeded.connect(on_success)
+        if on_error:
+            worker.failed.connect(on_error)
+        if on_progress:
+            worker.progress.connect(on_progress)
+        if on_cancelled:
+            worker.cancelled.connect(on_cancelled)
+        worker.finished.connect(lambda: self._on_finished(key, worker))
+        
+        self.workers[key] = worker
+        worker.start()
+        return worker
+    
+    def _on_finished(self, key, worker):
+        if self.workers.get(key) is worker:
+            del self.workers[key]
+        worker.deleteLater()
+        
+        if key in self.pending:
+            self._launch(key, *self.pending.pop(key))
+    
+    def cancel(self, key):
+        """Cancel the task running for key (and any queued replacement)"""
+        self.pending.pop(key, None)
+        if key in self.workers:
+            self.workers[key].cancel()
+    
+    def shutdown(self, timeout_ms=5000):
+        """Cancel every task and wait for the threads to exit"""
+        self.pending.clear()
+        for worker in list(self.workers.values()):
+            worker.cancel()
+        for worker in list(self.workers.values()):
+            worker.wait(timeout_ms)
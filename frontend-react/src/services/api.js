@@ -112,9 +112,46 @@ export const uploadCSV = async (file) => {
     },
   });
   
+  // 202 Accepted: the backend processes the file in the background
+  if (response.status === 202) {
+    const job = await waitForJob(response.data.id);
+    return job.dataset;
+  }
+  
+  return response.data;
+};
+
+/**
+ * Get background upload job status
+ * @param {number} jobId - Job ID returned by uploadCSV
+ * @returns {Promise} Job with phase, rows_processed and eta_seconds
+ */
+export const getJob = async (jobId) => {
+  const response = await api.get(`/jobs/${jobId}/`);
   return response.data;
 };
 
+/**
+ * Poll an upload job until it finishes
+ * @param {number} jobId - Job ID
+ * @param {number} intervalMs - Delay between polls
+ * @returns {Promise} Finished job (rejects if processing failed)
+ */
+export const waitForJob = async (jobId, intervalMs = 1000) => {
+  for (;;) {
+    const job = await getJob(jobId);
+    if (job.phase === 'done') {
+      return job;
+    }
+    if (job.phase === 'failed') {
+      const error = new Error(job.error || 'Processing failed');
+      error.response = { data: { error: job.error } };
+      throw error;
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+};
+
 /**
  * Get upload history (last 5 datasets)
  * @returns {Promise} Array of datasets
@@ -134,6 +171,50 @@ export const getDatasetSummary = async (datasetId) => {
   return response.data;
 };
 
+/**
+ * Compare two datasets
+ * @param {number} baseId - Dataset to compare from
+ * @param {number} targetId - Dataset to compare to
+ * @param {Object} [options] - { sort: 'flowrate' | 'pressure' | 'temperature', limit }
+ * @returns {Promise} Summary, type distribution changes and per-equipment deltas
+ */
+export const compareDatasets = async (baseId, targetId, options = {}) => {
+  const response = await api.get('/datasets/compare/', {
+    params: { ids: `${baseId},${targetId}`, ...options },
+  });
+  return response.data;
+};
+
+/**
+ * Get histograms of flowrate, pressure and temperature
+ * @param {number} datasetId - Dataset ID
+ * @param {number} [bins] - Bins per column (server default when omitted)
+ * @returns {Promise} Bin edges and counts per column
+ */
+export const getDatasetHistograms = async (datasetId, bins) => {
+  const response = await api.get(`/datasets/${datasetId}/histogram/`, {
+    params: bins ? { bins } : {},
+  });
+  return response.data;
+};
+
+/**
+ * Get downsampled scatter points for two numeric columns
+ * @param {number} datasetId - Dataset ID
+ * @param {string} x - flowrate, pressure or temperature
+ * @param {string} y - flowrate, pressure or temperature
+ * @param {number} [maxPoints] - Maximum points (server default when omitted)
+ * @returns {Promise} Points as [x, y] pairs
+ */
+export const getDatasetScatter = async (datasetId, x = 'pressure', y = 'temperature', maxPoints) => {
+  const params = { x, y };
+  if (maxPoints) {
+    params.max_points = maxPoints;
+  }
+  const response = await api.get(`/datasets/${datasetId}/scatter/`, { params });
+  return response.data;
+};
+
 /**
  * Delete a dataset
  * @param {number} datasetId - Dataset ID
@@ -166,4 +247,28 @@ export const downloadPDF = async (datasetId) => {
   return response.data;
 };
 
+/**
+ * Export a dataset's cleaned records as a file download
+ * @param {number} datasetId - Dataset ID
+ * @param {string} format - 'csv', 'jsonl' or 'parquet'
+ * @returns {Promise} Blob of the exported file
+ */
+export const exportDataset = async (datasetId, format = 'csv') => {
+  const response = await api.get(`/datasets/${datasetId}/export/`, {
+    params: { format },
+    responseType: 'blob',
+  });
+  
+  const url = window.URL.createObjectURL(new Blob([response.data]));
+  const link = document.createElement('a');
+  link.href = url;
+  link.setAttribute('download', `equipment_data_${datasetId}.${format}`);
+  document.body.appendChild(link);
+  link.click();
+  link.remove();
+  window.URL.revokeObjectURL(url);
+  
+  return response.data;
+};
+
 export default api;